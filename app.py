@@ -6,10 +6,14 @@ from flask import Flask, render_template, request
 from flask_migrate import Migrate
 from dotenv import load_dotenv
 from config.base import config
-from config.database import DatabaseConfig
+from db_probe import database_probe
 from models.base import db
 from models import FeatureMap, FeatureLabel
-from routes_sqlalchemy import feature_list_sqlalchemy
+from http_cache import compress_response, conditional_page
+from routes_sqlalchemy import (
+    feature_list_sqlalchemy, feature_api_sqlalchemy, search_sqlalchemy, search_api_sqlalchemy,
+    branch_diff_sqlalchemy, branch_diff_api_sqlalchemy, feature_history_sqlalchemy, feature_history_api_sqlalchemy
+)
 
 # Load environment variables from .env file
 load_dotenv()
@@ -36,6 +40,19 @@ def log_request_info():
     except Exception as e:
         print(f"Error in request logging: {e}")
 
+def print_database_probe(db_results):
+    """Print the database connection probe results to the console"""
+    lines = ["=" * 60, "DATABASE CONNECTION PROBE", "=" * 60]
+    for db_name, result in db_results.items():
+        status_symbol = "✓" if result['status'] == 'connected' else "✗" if result['status'] == 'failed' else "○"
+        lines.append(f"{status_symbol} {db_name.upper()}: {result['status'].upper()}")
+        lines.append(f"  URL: {result['url']}")
+        lines.append(f"  Type: {result['type']}")
+        lines.append(f"  Message: {result['message']}")
+        lines.append("")
+    lines.append("=" * 60)
+    print("\n".join(lines))
+
 def create_app(config_name=None):
     app = Flask(__name__)
     
@@ -59,21 +76,10 @@ def create_app(config_name=None):
         except:
             return str(timestamp)
     
-    # Database connection probe
-    print("=" * 60)
-    print("DATABASE CONNECTION PROBE")
-    print("=" * 60)
-    
-    db_results = DatabaseConfig.probe_database_connections()
-    for db_name, result in db_results.items():
-        status_symbol = "✓" if result['status'] == 'connected' else "✗" if result['status'] == 'failed' else "○"
-        print(f"{status_symbol} {db_name.upper()}: {result['status'].upper()}")
-        print(f"  URL: {result['url']}")
-        print(f"  Type: {result['type']}")
-        print(f"  Message: {result['message']}")
-        print()
-    
-    print("=" * 60)
+    # Database connection probe (background thread; printed when it finishes)
+    database_probe.ttl = app.config.get('DB_PROBE_TTL', database_probe.ttl)
+    database_probe.timeout = app.config.get('DB_PROBE_TIMEOUT', database_probe.timeout)
+    database_probe.refresh_in_background(callback=print_database_probe)
     
     
     # Request logging - outputs to console and file
@@ -86,26 +92,35 @@ def create_app(config_name=None):
             f.write(f"{log_msg}\n")
         return response
     
+    # Compress HTML/JSON responses above the configured size
+    @app.after_request
+    def compress(response):
+        return compress_response(response, app.config)
+    
     @app.route('/')
     def hello():
         env = os.environ.get('FLASK_ENV', 'development')
         return render_template('index.html', env=env, config=app.config)
 
     @app.route('/about')
+    @conditional_page('templates/about.html')
     def about():
         return render_template('about.html', config=app.config)
     
     @app.route('/db-info')
     def db_info():
         env = os.environ.get('FLASK_ENV', 'development')
-        db_results = DatabaseConfig.probe_database_connections()
-        return render_template('db_info.html', env=env, config=app.config, db_results=db_results)
+        db_results = database_probe.get()
+        return render_template('db_info.html', env=env, config=app.config, db_results=db_results or {},
+                               probe_pending=db_results is None, probe_checked_at=database_probe.checked_at)
     
     @app.route('/sonic-switch')
+    @conditional_page('templates/sonic_switch.html')
     def sonic_switch():
         return render_template('sonic_switch.html', config=app.config)
     
     @app.route('/sonic-feature')
+    @conditional_page('templates/sonic_feature.html')
     def sonic_feature():
         return render_template('sonic_feature.html', config=app.config)
     
@@ -113,11 +128,48 @@ def create_app(config_name=None):
     def feature_list():
         return feature_list_sqlalchemy(app.config)
     
+    @app.route('/api/features')
+    def api_features():
+        """Feature matrix as streaming NDJSON"""
+        return feature_api_sqlalchemy()
+    
+    @app.route('/branch-diff')
+    def branch_diff():
+        """Features gained/lost between two branches"""
+        return branch_diff_sqlalchemy(app.config)
+    
+    @app.route('/api/branch-diff')
+    def api_branch_diff():
+        """Branch diff as JSON"""
+        return branch_diff_api_sqlalchemy(app.config)
+    
+    @app.route('/feature-history')
+    def feature_history():
+        """When a feature's branch support changed across snapshots"""
+        return feature_history_sqlalchemy(app.config)
+    
+    @app.route('/api/feature-history')
+    def api_feature_history():
+        """Feature history as JSON"""
+        return feature_history_api_sqlalchemy()
+    
+    @app.route('/search')
+    def search():
+        """Full-text search over features and test cases"""
+        return search_sqlalchemy(app.config)
+    
+    @app.route('/api/search')
+    def api_search():
+        """Full-text search as JSON"""
+        return search_api_sqlalchemy()
+    
     @app.route('/sonic-mgmt')
+    @conditional_page('templates/sonic_mgmt.html')
     def sonic_mgmt():
         return render_template('sonic_mgmt.html', config=app.config)
     
     @app.route('/ests')
+    @conditional_page('templates/ests.html')
     def ests():
         return render_template('ests.html', config=app.config)
     
@@ -179,6 +231,7 @@ def create_app(config_name=None):
                              config=app.config)
     
     @app.route('/readme')
+    @conditional_page('templates/readme.html', 'README.md', 'FEATURES.md', 'DEPLOY.md')
     def readme():
         import os
         
@@ -203,6 +256,7 @@ def create_app(config_name=None):
     
     @app.route('/schema')
     @app.route('/schema/<db_name>')
+    @conditional_page('templates/schema.html', 'schema_*.md')
     def schema_viewer(db_name=None):
         import os
         import glob
@@ -290,11 +344,13 @@ def create_app(config_name=None):
                              config=app.config)
     
     @app.route('/sai/api-explorer')
+    @conditional_page('templates/sai_api_explorer.html')
     def sai_api_explorer():
         """SAI API Explorer page"""
         return render_template('sai_api_explorer.html', config=app.config)
     
     @app.route('/sai/feature-mapping')
+    @conditional_page('templates/sai_feature_mapping.html')
     def sai_feature_mapping():
         """SAI Feature Mapping page"""
         return render_template('sai_feature_mapping.html', config=app.config)
@@ -305,6 +361,7 @@ def create_app(config_name=None):
         return render_template('sai_sample_report.html', config=app.config)
     
     @app.route('/sai/enhanced-report')
+    @conditional_page('templates/sai_enhanced_report.html')
     def sai_enhanced_report():
         """SAI Enhanced Line-by-Line Analysis Report"""
         return render_template('sai_enhanced_report.html', config=app.config)
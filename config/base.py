@@ -8,6 +8,24 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_RECORD_QUERIES = True
     
+    # Feature matrix cache (invalidated by imports)
+    FEATURE_CACHE_ENABLED = True
+    FEATURE_CACHE_TTL = 300  # seconds
+    FEATURE_CACHE_MAX_ENTRIES = 256
+    
+    # Response compression for HTML/JSON bodies of at least COMPRESS_MIN_SIZE bytes
+    COMPRESS_MIMETYPES = ['text/html', 'application/json']
+    COMPRESS_MIN_SIZE = 500
+    COMPRESS_LEVEL = 6  # gzip
+    COMPRESS_BR_LEVEL = 4  # brotli, when installed
+    
+    # Browser cache lifetime for pages that only change on deploy
+    PAGE_CACHE_MAX_AGE = 300  # seconds
+    
+    # Database connection probe (startup and /db-info), refreshed in the background
+    DB_PROBE_TTL = 60  # seconds
+    DB_PROBE_TIMEOUT = 3  # connect timeout per database, seconds
+    
     @staticmethod
     def init_app(app):
         pass
@@ -19,6 +37,7 @@ class DevelopmentConfig(Config):
         super().__init__()
         db_config = DatabaseConfig()
         self.SQLALCHEMY_DATABASE_URI = db_config.get_database_url('primary', 'development')
+        self.SQLALCHEMY_ENGINE_OPTIONS = db_config.engine_options(self.SQLALCHEMY_DATABASE_URI)
 
 class ProductionConfig(Config):
     DEBUG = False
@@ -27,6 +46,7 @@ class ProductionConfig(Config):
         super().__init__()
         db_config = DatabaseConfig()
         self.SQLALCHEMY_DATABASE_URI = db_config.get_database_url('primary', 'production')
+        self.SQLALCHEMY_ENGINE_OPTIONS = db_config.engine_options(self.SQLALCHEMY_DATABASE_URI)
 
 class TestingConfig(Config):
     TESTING = True
@@ -35,6 +55,7 @@ class TestingConfig(Config):
         super().__init__()
         db_config = DatabaseConfig()
         self.SQLALCHEMY_DATABASE_URI = db_config.get_database_url('primary', 'testing')
+        self.SQLALCHEMY_ENGINE_OPTIONS = db_config.engine_options(self.SQLALCHEMY_DATABASE_URI)
 
 config = {
     'development': DevelopmentConfig,
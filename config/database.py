@@ -1,11 +1,30 @@
 import os
-import psycopg2
-from urllib.parse import urlparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import NullPool
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Connection pool settings shared by the web app and all scripts
+# (override with environment variables of the same name)
+POOL_DEFAULTS = {
+    'DB_POOL_SIZE': 5,
+    'DB_MAX_OVERFLOW': 10,
+    'DB_POOL_TIMEOUT': 30,  # seconds to wait for a free pooled connection
+    'DB_POOL_RECYCLE': 1800,  # seconds before a connection is replaced
+    'DB_POOL_PRE_PING': True,  # test connections on checkout (drops dead ones)
+    'DB_CONNECT_TIMEOUT': 10,  # seconds
+    'DB_STATEMENT_TIMEOUT': 0  # milliseconds, 0 = no limit
+}
+
+# One engine (and pool) per database URL, shared by the whole process
+_engines = {}
+_engines_lock = threading.Lock()
+
 
 class DatabaseConfig:
     """Database configuration and connection management"""
@@ -38,82 +57,161 @@ class DatabaseConfig:
         return result
     
     @staticmethod
-    def test_postgresql_connection(db_url):
-        """Test PostgreSQL database connection"""
+    def is_postgresql(db_url):
+        """Whether db_url points at a PostgreSQL database"""
+        return db_url.startswith(('postgresql://', 'postgres://', 'postgresql+'))
+    
+    @staticmethod
+    def pool_settings():
+        """POOL_DEFAULTS with environment overrides applied"""
+        settings = {}
+        for name, default in POOL_DEFAULTS.items():
+            value = os.environ.get(name)
+            if value is None:
+                settings[name] = default
+            elif isinstance(default, bool):
+                settings[name] = value.strip().lower() in ('1', 'true', 'yes', 'on')
+            else:
+                settings[name] = int(value)
+        return settings
+    
+    @staticmethod
+    def engine_options(db_url):
+        """create_engine() keyword arguments for db_url
+        
+        Also used as SQLALCHEMY_ENGINE_OPTIONS, so the Flask-SQLAlchemy
+        engine of the web app and the importers is tuned the same way.
+        """
+        settings = DatabaseConfig.pool_settings()
+        options = {
+            'pool_pre_ping': settings['DB_POOL_PRE_PING'],
+            'pool_recycle': settings['DB_POOL_RECYCLE']
+        }
+        if DatabaseConfig.is_postgresql(db_url):
+            options.update({
+                'pool_size': settings['DB_POOL_SIZE'],
+                'max_overflow': settings['DB_MAX_OVERFLOW'],
+                'pool_timeout': settings['DB_POOL_TIMEOUT']
+            })
+            connect_args = {'connect_timeout': settings['DB_CONNECT_TIMEOUT']}
+            if settings['DB_STATEMENT_TIMEOUT']:
+                connect_args['options'] = f"-c statement_timeout={settings['DB_STATEMENT_TIMEOUT']}"
+            options['connect_args'] = connect_args
+        return options
+    
+    @staticmethod
+    def sqlalchemy_url(db_url):
+        """db_url with the postgres:// alias SQLAlchemy no longer accepts spelled out"""
+        if db_url.startswith('postgres://'):
+            return 'postgresql://' + db_url[len('postgres://'):]
+        return db_url
+    
+    @staticmethod
+    def engine_for_url(db_url):
+        """Pooled SQLAlchemy engine for db_url (created once per process)"""
+        db_url = DatabaseConfig.sqlalchemy_url(db_url)
+        
+        with _engines_lock:
+            engine = _engines.get(db_url)
+            if engine is None:
+                engine = create_engine(db_url, **DatabaseConfig.engine_options(db_url))
+                _engines[db_url] = engine
+            return engine
+    
+    @staticmethod
+    def get_engine(db_name='primary', env=None):
+        """Pooled SQLAlchemy engine for a database in an environment
+        
+        Scripts use engine.connect()/begin(), or engine.raw_connection()
+        for DB-API work (psycopg2 cursors); closing a raw connection
+        returns it to the pool.
+        """
+        env = env or os.environ.get('FLASK_ENV', 'development')
+        return DatabaseConfig.engine_for_url(DatabaseConfig.get_database_url(db_name, env))
+    
+    @staticmethod
+    def dispose_engines():
+        """Close every pooled connection (e.g. before forking workers)"""
+        with _engines_lock:
+            for engine in _engines.values():
+                engine.dispose()
+            _engines.clear()
+    
+    @staticmethod
+    def test_postgresql_connection(db_url, timeout=None):
+        """Test PostgreSQL database connection
+        
+        With a timeout (seconds), a one-off unpooled connection is made with
+        that connect timeout instead of the pool's DB_CONNECT_TIMEOUT.
+        """
+        if not DatabaseConfig.is_postgresql(db_url):
+            return False, f"Not a PostgreSQL URL: {db_url.split('://')[0]}"
+        
+        engine = None
         try:
-            # Parse the database URL
-            parsed = urlparse(db_url)
-            
-            if parsed.scheme not in ['postgresql', 'postgres']:
-                return False, f"Not a PostgreSQL URL: {parsed.scheme}"
-            
-            # Extract connection parameters
-            host = parsed.hostname
-            port = parsed.port or 5432
-            database = parsed.path.lstrip('/')
-            username = parsed.username
-            password = parsed.password
-            
-            # Test connection
-            conn = psycopg2.connect(
-                host=host,
-                port=port,
-                database=database,
-                user=username,
-                password=password,
-                connect_timeout=10
-            )
+            if timeout is None:
+                engine = DatabaseConfig.engine_for_url(db_url)
+            else:
+                connect_args = dict(DatabaseConfig.engine_options(db_url)['connect_args'], connect_timeout=timeout)
+                engine = create_engine(DatabaseConfig.sqlalchemy_url(db_url), poolclass=NullPool,
+                                       connect_args=connect_args)
             
             # Test basic query
-            cursor = conn.cursor()
-            cursor.execute("SELECT version();")
-            version = cursor.fetchone()[0]
-            cursor.close()
-            conn.close()
+            with engine.connect() as connection:
+                version = connection.execute(text("SELECT version();")).scalar()
             
             return True, f"Connected successfully. PostgreSQL version: {version}"
             
-        except psycopg2.OperationalError as e:
-            return False, f"Connection failed: {str(e)}"
+        except OperationalError as e:
+            return False, f"Connection failed: {str(e.orig)}"
         except Exception as e:
             return False, f"Unexpected error: {str(e)}"
+        finally:
+            if engine is not None and timeout is not None:
+                engine.dispose()
     
     @staticmethod
-    def probe_database_connections():
-        """Probe all database connections and return status"""
-        env = os.environ.get('FLASK_ENV', 'development')
-        configs = DatabaseConfig.get_database_configs()
-        results = {}
-        
-        for db_name, db_url in configs.items():
-            if db_url.startswith('postgresql://') or db_url.startswith('postgres://'):
-                success, message = DatabaseConfig.test_postgresql_connection(db_url)
-                results[db_name] = {
-                    'url': db_url,
-                    'status': 'connected' if success else 'failed',
-                    'message': message,
-                    'type': 'postgresql'
-                }
-            elif db_url.startswith('sqlite://'):
-                results[db_name] = {
-                    'url': db_url,
-                    'status': 'available',
-                    'message': 'SQLite database (file-based)',
-                    'type': 'sqlite'
-                }
-            elif db_url.startswith('redis://'):
-                results[db_name] = {
-                    'url': db_url,
-                    'status': 'not_tested',
-                    'message': 'Redis connection (not tested)',
-                    'type': 'redis'
-                }
-            else:
-                results[db_name] = {
-                    'url': db_url,
-                    'status': 'unknown',
-                    'message': 'Unknown database type',
-                    'type': 'unknown'
-                }
+    def probe_database(db_url, timeout=None):
+        """Probe one database URL and return its status"""
+        if DatabaseConfig.is_postgresql(db_url):
+            success, message = DatabaseConfig.test_postgresql_connection(db_url, timeout)
+            return {
+                'url': db_url,
+                'status': 'connected' if success else 'failed',
+                'message': message,
+                'type': 'postgresql'
+            }
+        elif db_url.startswith('sqlite://'):
+            return {
+                'url': db_url,
+                'status': 'available',
+                'message': 'SQLite database (file-based)',
+                'type': 'sqlite'
+            }
+        elif db_url.startswith('redis://'):
+            return {
+                'url': db_url,
+                'status': 'not_tested',
+                'message': 'Redis connection (not tested)',
+                'type': 'redis'
+            }
+        else:
+            return {
+                'url': db_url,
+                'status': 'unknown',
+                'message': 'Unknown database type',
+                'type': 'unknown'
+            }
+    
+    @staticmethod
+    def probe_database_connections(timeout=None):
+        """Probe all database connections concurrently and return status
         
-        return results
\ No newline at end of file
+        Each database is probed in its own thread, so the whole probe takes
+        as long as the slowest database (at most about timeout seconds).
+        """
+        configs = DatabaseConfig.get_database_configs()
+        with ThreadPoolExecutor(max_workers=len(configs), thread_name_prefix='db-probe') as pool:
+            futures = {db_name: pool.submit(DatabaseConfig.probe_database, db_url, timeout)
+                       for db_name, db_url in configs.items()}
+            return {db_name: future.result() for db_name, future in futures.items()}
\ No newline at end of file
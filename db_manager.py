@@ -10,7 +10,9 @@ import click
 from flask import Flask
 from flask.cli import with_appcontext
 from models.base import db
-from models import FeatureMap, FeatureLabel
+from models import (
+    FeatureMap, FeatureLabel, Branch, FeatureBranchStatus, FeatureFacet, ImportGeneration, ImportLedger
+)
 from config.base import config
 
 
@@ -25,6 +27,7 @@ def create_app():
     # Get database URI
     db_config = config[config_name]()
     app.config['SQLALCHEMY_DATABASE_URI'] = db_config.SQLALCHEMY_DATABASE_URI
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = db_config.SQLALCHEMY_ENGINE_OPTIONS
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     
     # Initialize extensions
@@ -54,6 +57,8 @@ def init_db(env):
         try:
             # Create all tables
             db.create_all()
+            Branch.ensure_defaults()
+            db.session.commit()
             click.echo("✅ Database tables created successfully!")
             
             # Show created tables
@@ -134,7 +139,8 @@ def reset_db(env):
 
 @cli.command()
 @click.option('--env', default='development', help='Environment (development/production/testing)')
-def show_stats(env):
+@click.option('--ledger-limit', default=5, help='Number of import ledger entries to show')
+def show_stats(env, ledger_limit):
     """Show database statistics"""
     click.echo(f"📊 Database statistics for {env} environment...")
     
@@ -167,6 +173,19 @@ def show_stats(env):
             click.echo(f"   Edgecore: {ec_count}")
             click.echo(f"   Unknown: {unknown_count}")
             
+            # Show the most recent imports from the ledger
+            click.echo(f"📒 Import ledger:")
+            entries = []
+            if db.inspect(db.engine).has_table(ImportLedger.__tablename__):
+                entries = ImportLedger.query.order_by(ImportLedger.id.desc()).limit(ledger_limit).all()
+            if not entries:
+                click.echo("   No imports recorded")
+            for entry in entries:
+                duration = f"{entry.duration_seconds:.1f}s" if entry.duration_seconds is not None else '-'
+                click.echo(f"   #{entry.id} {entry.imported_at:%Y-%m-%d %H:%M} {entry.name}: "
+                           f"{os.path.basename(entry.file_path)} ({entry.row_count} rows, {duration}, "
+                           f"{entry.file_size} bytes, sha256 {entry.file_sha256[:12]})")
+            
         except Exception as e:
             click.echo(f"❌ Error getting statistics: {e}")
             return 1
@@ -174,6 +193,44 @@ def show_stats(env):
     return 0
 
 
+@cli.command()
+@click.option('--env', default='development', help='Environment (development/production/testing)')
+def sync_branches(env):
+    """Backfill s_branch and s_feature_branch_status from s_feature_map
+    
+    Also rebuilds the filter facets and bumps the import generation, so
+    cached feature lists, branch diffs and ETags follow the new statuses.
+    """
+    click.echo(f"🌿 Syncing branch support table for {env} environment...")
+    
+    # Set environment
+    os.environ['FLASK_ENV'] = env
+    
+    app = create_app()
+    
+    with app.app_context():
+        try:
+            for model in (Branch, FeatureBranchStatus, FeatureFacet, ImportGeneration):
+                model.__table__.create(db.engine, checkfirst=True)
+            
+            added = Branch.ensure_defaults()
+            written = FeatureBranchStatus.rebuild()
+            facet_count = FeatureFacet.rebuild()
+            generation = ImportGeneration.bump(ImportGeneration.FEATURES)
+            db.session.commit()
+            
+            click.echo(f"✅ Registered {added} new branches")
+            click.echo(f"✅ Wrote {written} branch status rows")
+            click.echo(f"✅ Rebuilt {facet_count} filter facets (import generation {generation})")
+            
+        except Exception as e:
+            click.echo(f"❌ Error syncing branches: {e}")
+            db.session.rollback()
+            return 1
+    
+    return 0
+
+
 @cli.command()
 @click.option('--env', default='development', help='Environment (development/production/testing)')
 @click.option('--limit', default=10, help='Number of features to show')
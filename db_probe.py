@@ -0,0 +1,71 @@
+"""
+Cached database connection probe
+
+Probes run in a background thread, all databases concurrently with a
+short connect timeout, so neither startup nor /db-info waits on an
+unreachable host. /db-info serves the last results from memory and
+starts a background refresh once they are older than the TTL.
+"""
+import threading
+import time
+from config.database import DatabaseConfig
+
+
+class DatabaseProbe:
+    """Latest probe results, refreshed by at most one background thread"""
+    
+    def __init__(self, ttl=60, timeout=3):
+        self.ttl = ttl
+        self.timeout = timeout
+        self.results = None
+        self.checked_at = None  # time.time() of the last finished probe
+        self._refreshing = None  # running refresh thread
+        self._lock = threading.Lock()
+    
+    def refresh(self):
+        """Probe every database now and store the results"""
+        results = DatabaseConfig.probe_database_connections(self.timeout)
+        with self._lock:
+            self.results = results
+            self.checked_at = time.time()
+        return results
+    
+    def refresh_in_background(self, callback=None):
+        """Start a refresh thread unless one is running; callback(results) runs when it finishes"""
+        def run():
+            try:
+                results = self.refresh()
+            finally:
+                with self._lock:
+                    self._refreshing = None
+            if callback:
+                callback(results)
+        
+        with self._lock:
+            if self._refreshing is not None:
+                return False
+            self._refreshing = threading.Thread(target=run, name='db-probe', daemon=True)
+            self._refreshing.start()
+        return True
+    
+    def is_stale(self):
+        """Whether the results are missing or older than the TTL"""
+        return self.checked_at is None or time.time() - self.checked_at >= self.ttl
+    
+    def get(self):
+        """Cached results (None until the first probe finishes), refreshed in the background when stale"""
+        with self._lock:
+            results = self.results
+        if self.is_stale():
+            self.refresh_in_background()
+        return results
+    
+    def wait(self, timeout=None):
+        """Wait for a running refresh to finish"""
+        thread = self._refreshing
+        if thread is not None:
+            thread.join(timeout)
+
+
+# Shared by all requests in this process; configured from app config in create_app
+database_probe = DatabaseProbe()
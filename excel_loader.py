@@ -0,0 +1,168 @@
+"""
+Shared Excel loading for the importers
+
+- Uses the calamine engine when python-calamine is installed, openpyxl
+  (which pandas already opens read-only) otherwise
+- Reads only the columns an importer maps
+- Caches every parsed sheet next to the source file in .excel_cache/,
+  keyed by the file's SHA-256, the sheet, the column set and the engine.
+  The cache is Parquet and needs pyarrow: without it (or for a sheet
+  Parquet can't hold) sheets are parsed every time. A cache hit skips
+  XLSX parsing entirely; caches of older versions of the file are
+  removed when a new one is written. Pickle is never used, since loading
+  one from a directory anyone can write to would run arbitrary code.
+- load_sheets() parses several sheets in a process pool and reports
+  progress per finished sheet
+"""
+import glob
+import hashlib
+import json
+import os
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+try:
+    import python_calamine  # noqa: F401  (used through pandas engine='calamine')
+    ENGINE = 'calamine'
+except ImportError:
+    ENGINE = 'openpyxl'
+
+try:
+    import pyarrow  # noqa: F401  (used through DataFrame.to_parquet)
+    HAS_PARQUET = True
+except ImportError:
+    HAS_PARQUET = False
+
+CACHE_DIR_NAME = '.excel_cache'
+
+# Length of the file hash prefix used in cache file names
+HASH_PREFIX = 16
+
+
+def file_sha256(filepath):
+    """SHA-256 of a file, read in 1 MiB chunks"""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_prefix(filepath, file_hash):
+    """Path prefix of all cache files for this version of filepath"""
+    directory = os.path.join(os.path.dirname(os.path.abspath(filepath)), CACHE_DIR_NAME)
+    return os.path.join(directory, f"{os.path.basename(filepath)}.{file_hash[:HASH_PREFIX]}")
+
+
+def sheet_cache_key(sheet_name, columns):
+    """Stable key for a (sheet, column set, engine) combination"""
+    wanted = '\x1f'.join(sorted(columns)) if columns is not None else '*'
+    return hashlib.sha1(f"{sheet_name}\x00{wanted}\x00{ENGINE}".encode('utf-8')).hexdigest()[:HASH_PREFIX]
+
+
+def prune_stale_caches(filepath, file_hash):
+    """Remove cache files written for other versions of filepath"""
+    current = cache_prefix(filepath, file_hash)
+    pattern = os.path.join(os.path.dirname(current), f"{glob.escape(os.path.basename(filepath))}.*")
+    for path in glob.glob(pattern):
+        if not path.startswith(current + '.'):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def write_cache(path, write):
+    """Run write(path) atomically; a cache that can't be written is not an error"""
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write(tmp_path)
+        os.replace(tmp_path, path)
+        return True
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
+
+
+def sheet_names(filepath, file_hash=None, use_cache=True):
+    """Sheet names of a workbook (cached like the sheets themselves)"""
+    file_hash = file_hash or file_sha256(filepath)
+    path = f"{cache_prefix(filepath, file_hash)}.sheets.json"
+    if use_cache and os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+
+    with pd.ExcelFile(filepath, engine=ENGINE) as workbook:
+        names = list(workbook.sheet_names)
+
+    if use_cache:
+        def write(tmp_path):
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(names, f, ensure_ascii=False)
+        prune_stale_caches(filepath, file_hash)
+        write_cache(path, write)
+    return names
+
+
+def load_sheet(filepath, sheet_name=0, columns=None, file_hash=None, use_cache=True):
+    """Read one sheet, restricted to columns (names; missing ones are ignored)
+
+    Returns (df, from_cache).
+    """
+    file_hash = file_hash or file_sha256(filepath)
+    prefix = f"{cache_prefix(filepath, file_hash)}.{sheet_cache_key(sheet_name, columns)}"
+
+    use_cache = use_cache and HAS_PARQUET
+    if use_cache and os.path.exists(f"{prefix}.parquet"):
+        return pd.read_parquet(f"{prefix}.parquet"), True
+
+    wanted = set(columns) if columns is not None else None
+    df = pd.read_excel(filepath, sheet_name=sheet_name, engine=ENGINE,
+                       usecols=(lambda column: column in wanted) if wanted is not None else None)
+
+    if use_cache:
+        prune_stale_caches(filepath, file_hash)
+        # Parquet can't hold every object column (mixed types); such sheets stay uncached
+        write_cache(f"{prefix}.parquet", lambda path: df.to_parquet(path))
+    return df, False
+
+
+def load_sheet_task(filepath, sheet_name, columns, file_hash, use_cache, transform):
+    """load_sheet plus transform(df, sheet_name) (runs in a worker process)"""
+    df, from_cache = load_sheet(filepath, sheet_name, columns, file_hash, use_cache)
+    return (transform(df, sheet_name) if transform else df), from_cache
+
+
+def load_sheets(filepath, sheets, columns=None, file_hash=None, use_cache=True,
+                workers=None, transform=None, progress=None):
+    """Read several sheets of a workbook in parallel worker processes
+
+    transform(df, sheet_name), if given, also runs in the worker and its
+    result replaces the DataFrame; it must be a module-level function.
+    progress(done, total, sheet_name, result, from_cache) is called in
+    this process as each sheet finishes. A single sheet or workers=1 is
+    read in this process. Returns {sheet_name: (result, from_cache)}.
+    """
+    file_hash = file_hash or file_sha256(filepath)
+    sheets = list(dict.fromkeys(sheets))
+    results = {}
+
+    def finished(sheet_name, result, from_cache):
+        results[sheet_name] = (result, from_cache)
+        if progress:
+            progress(len(results), len(sheets), sheet_name, result, from_cache)
+
+    if len(sheets) == 1 or workers == 1:
+        for sheet_name in sheets:
+            finished(sheet_name, *load_sheet_task(filepath, sheet_name, columns, file_hash, use_cache, transform))
+        return results
+
+    with ProcessPoolExecutor(max_workers=min(workers or os.cpu_count() or 1, len(sheets))) as pool:
+        futures = {pool.submit(load_sheet_task, filepath, sheet_name, columns, file_hash, use_cache, transform): sheet_name
+                   for sheet_name in sheets}
+        for future in as_completed(futures):
+            finished(futures[future], *future.result())
+    return results
+
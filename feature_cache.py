@@ -0,0 +1,91 @@
+"""
+In-process cache for the feature matrix
+
+Entries expire after a TTL, the least recently used entry is evicted once
+the cache is full, and everything is dropped when the import generation
+stored in the database moves on.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """Thread-safe LRU cache with per-entry TTL and generation invalidation"""
+    
+    def __init__(self, maxsize=256, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.generation = None
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+    
+    def sync_generation(self, generation):
+        """Drop every entry if the data generation changed since the last call"""
+        with self._lock:
+            if generation != self.generation:
+                self._data.clear()
+                self.generation = generation
+    
+    def get(self, key):
+        """Return the cached value for key, or None if missing or expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+            
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def set(self, key, value):
+        """Store value under key, evicting the least recently used entries"""
+        if self.maxsize <= 0:
+            return
+        
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def clear(self):
+        """Remove all entries and forget the generation"""
+        with self._lock:
+            self._data.clear()
+            self.generation = None
+    
+    def stats(self):
+        """Return cache statistics"""
+        with self._lock:
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'generation': self.generation,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+
+# Shared by all requests in this process; sized from app config on first use
+feature_matrix_cache = TTLCache()
+
+
+def get_feature_cache(app_config):
+    """Return the feature matrix cache, or None if caching is disabled"""
+    if not app_config.get('FEATURE_CACHE_ENABLED', True):
+        return None
+    
+    feature_matrix_cache.maxsize = app_config.get('FEATURE_CACHE_MAX_ENTRIES', feature_matrix_cache.maxsize)
+    feature_matrix_cache.ttl = app_config.get('FEATURE_CACHE_TTL', feature_matrix_cache.ttl)
+    return feature_matrix_cache
@@ -5,31 +5,121 @@ Reads EC SONiC Feature Excel files and imports data using SQLAlchemy ORM
 """
 import os
 import sys
+import contextlib
+import csv
+import hashlib
+import io
+import json
+import time
 import pandas as pd
 import re
 import click
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from dotenv import load_dotenv
+from sqlalchemy import bindparam, delete, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
 from models.base import db
-from models import FeatureMap, FeatureLabel
+from models import (
+    FeatureMap, FeatureLabel, Branch, FeatureBranchStatus, FeatureFacet, FeatureSnapshot, FeatureHistory,
+    ImportGeneration, ImportLedger
+)
 from config.base import config
+import excel_loader
+import import_progress
+import search_index
+import table_swap
 
 # Load environment variables
 load_dotenv()
 
 
+# Rows per executemany batch in bulk mode
+DEFAULT_BATCH_SIZE = 1000
+
+# Cell values treated as empty (compared upper-cased)
+NULL_VALUES = ('NAN', 'NONE', 'NULL', 'N/A')
+
+# Shorthand used in the branch support columns
+SUPPORT_VALUE_MAP = {
+    'O': 'Support',
+    'X': 'Not Support',
+    'D': 'Under Development'
+}
+
+# s_feature_map field -> Excel column
+TEXT_COLUMNS = {
+    'category': 'Category',
+    'feature_n1': 'Feature N1',
+    'ec_proprietary': 'EC Proprietary',
+    'component': 'Component'
+}
+SUPPORT_COLUMNS = {
+    'ec_sonic_2111': 'EC_SONiC_2111',
+    'ec_sonic_2211': 'EC_SONiC_2211',
+    'ec_202211_fabric': 'EC_202211_Fabric',
+    'ec_sonic_2311_x': 'EC SONiC 2311.X',
+    'ec_sonic_2311_n': 'EC SONiC 2311.N',
+    'vs_202311': 'VS_202311',
+    'vs_202311_fabric': 'VS_202311_Fabric'
+}
+
+# Columns read from the feature_map sheet
+EXCEL_COLUMNS = ('Feature_Key', *TEXT_COLUMNS.values(), *SUPPORT_COLUMNS.values(), 'Labels')
+
+# s_feature_map fields written by the importer, in column order
+FEATURE_FIELDS = ('feature_key', 'category', 'feature_n1', *SUPPORT_COLUMNS, 'ec_proprietary', 'component')
+
+# Support values the app knows (after mapping O/X/D)
+KNOWN_SUPPORT_VALUES = tuple(SUPPORT_VALUE_MAP.values())
+
+# Validation issues that stop an import (duplicates only with allow_duplicates off)
+DUPLICATE_ISSUES = ('duplicate_key', 'key_collision')
+
+# Sheets imported by default
+DEFAULT_SHEETS = ('feature_map',)
+
+# Directories searched for dated snapshots in history mode (first wins per date)
+SNAPSHOT_DIRS = ('data', os.path.join('data', 'archieve'))
+SNAPSHOT_PATTERN = re.compile(r'^EC_SONiC_Feature\.(\d{8})\.xlsx$')
+
+
 class SQLAlchemyFeatureImporter:
     """Import EC SONiC features from Excel using SQLAlchemy ORM"""
     
-    def __init__(self, env='development'):
+    def __init__(self, env='development', bulk=False, incremental=False, swap=False,
+                 batch_size=DEFAULT_BATCH_SIZE, force=False, sheets=DEFAULT_SHEETS, workers=None,
+                 verbose=False, log_format='text', allow_duplicates=False, report_path=None):
         self.env = env
         self.app = None
+        self.bulk = bulk
+        self.incremental = incremental
+        self.swap = swap
+        self.force = force
+        self.batch_size = batch_size
+        self.sheets = list(sheets)
+        self.workers = workers
+        self.verbose = verbose
+        self.log_format = log_format
+        self.log_stream = None  # JSON log records (default: stdout)
+        self.allow_duplicates = allow_duplicates
+        self.report_path = report_path
+        self.sheet_branches = []  # (branch_id, excel_column) of registry-only branches
+        self.changed_keys = None  # features whose branch statuses changed (incremental); None = all
         self.stats = {
             'features_processed': 0,
             'features_inserted': 0,
             'features_updated': 0,
+            'features_unchanged': 0,
+            'features_deleted': 0,
             'labels_processed': 0,
             'labels_inserted': 0,
+            'labels_deleted': 0,
+            'snapshots_loaded': 0,
+            'history_versions': 0,
+            'elapsed_seconds': None,
+            'skipped': None,
+            'validation': None,
             'errors': []
         }
     
@@ -45,6 +135,7 @@ class SQLAlchemyFeatureImporter:
         # Get database URI
         db_config = config[self.env]()
         app.config['SQLALCHEMY_DATABASE_URI'] = db_config.SQLALCHEMY_DATABASE_URI
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = db_config.SQLALCHEMY_ENGINE_OPTIONS
         app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
         
         # Initialize extensions
@@ -91,29 +182,45 @@ class SQLAlchemyFeatureImporter:
         click.echo(f"📅 Using file: {latest_file} (date: {feature_files[0][1]})")
         return latest_file
     
-    def read_excel_data(self, filepath):
-        """Read and validate Excel data"""
+    def read_excel_data(self, filepath, file_hash=None):
+        """Read and validate Excel data (several sheets are parsed in parallel)"""
         try:
             click.echo(f"📖 Reading Excel file: {filepath}")
+            if len(self.sheets) > 1:
+                click.echo(f"⚡ Parsing {len(self.sheets)} sheets with up to {self.workers or os.cpu_count()} workers")
             
-            # Read the feature_map sheet
-            df = pd.read_excel(filepath, sheet_name='feature_map')
-            click.echo(f"📊 Loaded {len(df)} rows from feature_map sheet")
+            # Read the mapped columns of each sheet (cached by file hash)
+            columns = (*EXCEL_COLUMNS, *(excel_column for _, excel_column in self.sheet_branches))
+            sheets = excel_loader.load_sheets(filepath, self.sheets, columns, file_hash,
+                                              workers=self.workers, progress=self.report_sheet)
             
             # Validate required columns
             required_columns = ['Feature_Key', 'Category', 'Feature N1']
-            missing_columns = [col for col in required_columns if col not in df.columns]
-            
-            if missing_columns:
-                click.echo(f"❌ Missing required columns: {missing_columns}")
-                return None
+            frames = []
+            for sheet_name in self.sheets:
+                df, _ = sheets[sheet_name]
+                missing_columns = [col for col in required_columns if col not in df.columns]
+                
+                if missing_columns:
+                    click.echo(f"❌ Missing required columns: {missing_columns}" +
+                               (f" in sheet '{sheet_name}'" if len(self.sheets) > 1 else ""))
+                    return None
+                frames.append(df)
             
-            return df
+            # Rows stay in sheet order; keys repeated across sheets are duplicates like any other.
+            # The (sheet, row) index lets validation point at the source row.
+            return frames[0] if len(frames) == 1 else pd.concat(frames, keys=self.sheets)
             
         except Exception as e:
             click.echo(f"❌ Error reading Excel file: {e}")
             return None
     
+    def report_sheet(self, done, total, sheet_name, df, from_cache):
+        """Progress line for a parsed sheet"""
+        source = "parsed-sheet cache" if from_cache else f"{sheet_name} sheet"
+        counter = f"[{done}/{total}] " if total > 1 else ""
+        click.echo(f"📊 {counter}Loaded {len(df)} rows from {source}")
+    
     def clean_value(self, value):
         """Clean and normalize cell values"""
         if pd.isna(value):
@@ -123,7 +230,7 @@ class SQLAlchemyFeatureImporter:
         cleaned = str(value).strip()
         
         # Return None for empty strings and NAN values
-        if cleaned == '' or cleaned.upper() in ['NAN', 'NONE', 'NULL', 'N/A']:
+        if cleaned == '' or cleaned.upper() in NULL_VALUES:
             return None
             
         return cleaned
@@ -135,17 +242,8 @@ class SQLAlchemyFeatureImporter:
         if not cleaned_value:
             return None
         
-        # Convert to uppercase for mapping
-        upper_value = cleaned_value.upper()
-        
-        # Map the values
-        value_mapping = {
-            'O': 'Support',
-            'X': 'Not Support', 
-            'D': 'Under Development'
-        }
-        
-        return value_mapping.get(upper_value, cleaned_value)
+        # Map the values (case-insensitive)
+        return SUPPORT_VALUE_MAP.get(cleaned_value.upper(), cleaned_value)
     
     def generate_feature_key(self, category, feature_name):
         """Generate feature key if missing"""
@@ -161,6 +259,206 @@ class SQLAlchemyFeatureImporter:
         
         return key.upper()
     
+    def clean_column(self, df, column):
+        """Column-wise clean_value: stripped strings, None for empty/NAN-like cells"""
+        if column not in df.columns:
+            return pd.Series([None] * len(df), index=df.index, dtype=object)
+        
+        raw = df[column]
+        values = raw.astype(object).astype(str).str.strip()
+        empty = raw.isna() | values.eq('') | values.str.upper().isin(NULL_VALUES)
+        return values.where(~empty, None)
+    
+    def map_support_column(self, values):
+        """Column-wise map_support_value over an already cleaned column"""
+        mapped = values.str.upper().map(SUPPORT_VALUE_MAP)
+        return mapped.where(mapped.notna(), values)
+    
+    def generate_feature_keys(self, category, feature_n1):
+        """Column-wise generate_feature_key (None where either part is missing)"""
+        keys = (category + '_' + feature_n1) \
+            .str.replace(r'[^\w\-]', '_', regex=True) \
+            .str.replace(r'_+', '_', regex=True) \
+            .str.strip('_') \
+            .str.upper()
+        return keys.where(category.notna() & feature_n1.notna(), None)
+    
+    def normalize_columns(self, df):
+        """Cleaned s_feature_map columns of the sheet, keyed by field
+        
+        Returns (columns, generated): generated marks rows whose
+        feature_key was built from category and feature_n1.
+        """
+        columns = {field: self.clean_column(df, column) for field, column in TEXT_COLUMNS.items()}
+        for field, column in SUPPORT_COLUMNS.items():
+            columns[field] = self.map_support_column(self.clean_column(df, column))
+        
+        # Generate feature_key where it is missing
+        feature_key = self.clean_column(df, 'Feature_Key')
+        generated = self.generate_feature_keys(columns['category'], columns['feature_n1'])
+        columns['feature_key'] = feature_key.where(feature_key.notna(), generated)
+        return columns, feature_key.isna() & generated.notna()
+    
+    def has_feature_key(self, columns):
+        """Rows with a usable feature_key"""
+        return columns['feature_key'].notna() & columns['feature_key'].ne('')
+    
+    def normalize_features(self, df):
+        """Normalize the whole sheet column by column
+        
+        Vectorized equivalent of calling process_feature_row on every row.
+        Returns a list of (feature_data, labels) tuples in sheet order;
+        rows without a usable feature_key are reported and skipped.
+        """
+        df = df.reset_index(drop=True)
+        columns, _ = self.normalize_columns(df)
+        valid = self.has_feature_key(columns)
+        
+        for index in df.index[~valid]:
+            click.echo(f"⚠️  Skipping row: Cannot generate feature_key from "
+                       f"category='{columns['category'][index]}', feature_n1='{columns['feature_n1'][index]}'")
+        
+        features = pd.DataFrame(columns)[list(FEATURE_FIELDS)][valid]
+        
+        # Split comma-separated labels into one row per label
+        labels = self.clean_column(df, 'Labels').str.split(',').explode().str.strip()
+        labels = labels[labels.notna() & labels.ne('')]
+        labels_by_row = {}
+        for index, label in zip(labels.index.tolist(), labels.tolist()):
+            labels_by_row.setdefault(index, []).append(label)
+        
+        # Build the row dicts from plain lists (much cheaper than to_dict('records'))
+        values = zip(*(features[field].tolist() for field in FEATURE_FIELDS))
+        return [(dict(zip(FEATURE_FIELDS, row_values)), labels_by_row.get(index, []))
+                for index, row_values in zip(features.index.tolist(), values)]
+    
+    def collect_branch_statuses(self, df):
+        """Statuses of the registry-only branches whose column is in the sheet
+        
+        Returns {branch_id: [(feature_key, status), ...]}; like the feature
+        rows, the first row of a duplicated key wins.
+        """
+        df = df.reset_index(drop=True)
+        columns, _ = self.normalize_columns(df)
+        keys = columns['feature_key']
+        first = self.has_feature_key(columns) & ~keys.duplicated()
+        
+        statuses = {}
+        for branch_id, excel_column in self.sheet_branches:
+            if excel_column not in df.columns:
+                continue
+            values = self.map_support_column(self.clean_column(df, excel_column))
+            present = first & values.notna()
+            statuses[branch_id] = list(zip(keys[present].tolist(), values[present].tolist()))
+        return statuses
+    
+    def row_location(self, label):
+        """Sheet and Excel row number (header is row 1) of a DataFrame index label"""
+        sheet_name, index = label if isinstance(label, tuple) else (self.sheets[0], label)
+        return {'sheet': sheet_name, 'row': int(index) + 2}
+    
+    def validate_features(self, df):
+        """Check the whole sheet in one pass before anything is written
+        
+        Finds rows without a usable key, duplicate keys (keys generated
+        from category/feature_n1 that collide are reported as
+        key_collision), support values other than O/X/D and their long
+        forms, and values longer than their s_feature_map/s_feature_label
+        column. Returns a JSON-serializable report; duplicates and
+        over-long values are errors unless allow_duplicates downgrades the
+        duplicates to warnings.
+        """
+        locations = df.index
+        df = df.reset_index(drop=True)
+        columns, generated = self.normalize_columns(df)
+        has_key = self.has_feature_key(columns)
+        excel_columns = dict(TEXT_COLUMNS, **SUPPORT_COLUMNS, feature_key='Feature_Key')
+        issues = []
+        
+        def add(kind, position, column, value, message):
+            severity = 'warning'
+            if kind == 'value_too_long' or (kind in DUPLICATE_ISSUES and not self.allow_duplicates):
+                severity = 'error'
+            issues.append(dict(self.row_location(locations[position]), severity=severity, type=kind,
+                               column=column, feature_key=columns['feature_key'][position],
+                               value=value, message=message))
+        
+        for position in df.index[~has_key]:
+            add('missing_key', position, 'Feature_Key', None,
+                "no Feature_Key and no Category/Feature N1 to generate one; row is skipped")
+        
+        keys = columns['feature_key'][has_key]
+        first_positions = {}
+        for position, key in keys[keys.duplicated(keep=False)].items():
+            first = first_positions.setdefault(key, position)
+            if first != position:
+                kind = 'key_collision' if generated[position] or generated[first] else 'duplicate_key'
+                add(kind, position, 'Feature_Key', key,
+                    f"same key as row {self.row_location(locations[first])['row']}")
+        
+        for field in SUPPORT_COLUMNS:
+            values = columns[field]
+            for position, value in values[has_key & values.notna() & ~values.isin(KNOWN_SUPPORT_VALUES)].items():
+                add('unknown_support_value', position, excel_columns[field], value,
+                    f"not one of O/X/D or {', '.join(KNOWN_SUPPORT_VALUES)}; stored as is")
+        
+        for field in FEATURE_FIELDS:
+            limit = getattr(FeatureMap.__table__.c[field].type, 'length', None)
+            if limit:
+                values = columns[field]
+                for position, value in values[has_key & (values.str.len() > limit)].items():
+                    add('value_too_long', position, excel_columns[field], value,
+                        f"{len(value)} characters, column holds {limit}")
+        
+        label_limit = FeatureLabel.__table__.c.label.type.length
+        labels = self.clean_column(df, 'Labels').str.split(',').explode().str.strip()
+        for position, label in labels[labels.str.len() > label_limit].items():
+            if has_key[position]:
+                add('value_too_long', position, 'Labels', label, f"label has {len(label)} characters, column holds {label_limit}")
+        
+        issues.sort(key=lambda issue: (self.sheets.index(issue['sheet']), issue['row']))
+        errors = sum(1 for issue in issues if issue['severity'] == 'error')
+        counts = {}
+        for issue in issues:
+            counts[issue['type']] = counts.get(issue['type'], 0) + 1
+        return {
+            'valid': errors == 0,
+            'rows': len(df),
+            'errors': errors,
+            'warnings': len(issues) - errors,
+            'counts': counts,
+            'issues': issues
+        }
+    
+    def check_features(self, df):
+        """Validate df and report the result; True if the import may go ahead"""
+        click.echo(f"🔍 Validating {len(df)} rows...")
+        report = self.validate_features(df)
+        self.stats['validation'] = {key: report[key] for key in ('errors', 'warnings', 'counts')}
+        
+        if self.report_path:
+            with open(self.report_path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            click.echo(f"📝 Validation report written to {self.report_path}")
+        if self.log_format == 'json':
+            import_progress.emit_record(dict(event='validation', **report), self.log_stream)
+        
+        # Errors first; the report file keeps row order
+        shown = sorted(report['issues'], key=lambda issue: issue['severity'] != 'error')
+        for issue in shown[:10]:
+            where = f"'{issue['sheet']}' row {issue['row']}" if len(self.sheets) > 1 else f"row {issue['row']}"
+            icon = '❌' if issue['severity'] == 'error' else '⚠️ '
+            click.echo(f"   {icon} {where} [{issue['type']}] {issue['column']}={issue['value']!r}: {issue['message']}")
+        if len(report['issues']) > 10:
+            click.echo(f"   ... and {len(report['issues']) - 10} more issues")
+        
+        if not report['valid']:
+            click.echo(f"❌ Validation failed: {report['errors']} errors, {report['warnings']} warnings. "
+                       f"Nothing was written.")
+            return False
+        click.echo(f"✅ Validation passed ({report['warnings']} warnings)")
+        return True
+    
     def process_feature_row(self, row):
         """Process a single feature row and return normalized data"""
         # Get and clean feature_key
@@ -212,15 +510,17 @@ class SQLAlchemyFeatureImporter:
             label_count = FeatureLabel.query.count()
             feature_count = FeatureMap.query.count()
             
-            # Delete all labels first (due to foreign key constraint)
+            # Delete all labels and branch statuses first (due to foreign key constraints)
             FeatureLabel.query.delete()
             click.echo(f"   ✅ Cleared {label_count} records from s_feature_label")
+            FeatureBranchStatus.query.delete()
             
             # Delete all features
             FeatureMap.query.delete()
             click.echo(f"   ✅ Cleared {feature_count} records from s_feature_map")
             
-            # Commit the deletions
+            # Commit the deletions (and invalidate cached feature pages)
+            self.mark_data_changed()
             db.session.commit()
             click.echo("   ✅ Old data cleared successfully")
             
@@ -231,6 +531,480 @@ class SQLAlchemyFeatureImporter:
             db.session.rollback()
             return False
     
+    def start_progress(self, phase, total, record_rows=import_progress.DEFAULT_RECORD_ROWS):
+        """Progress reporter in this importer's output mode"""
+        return import_progress.ImportProgress(phase, total, self.log_format, self.verbose,
+                                              record_rows=record_rows, log_stream=self.log_stream)
+    
+    def import_rows(self, df):
+        """Insert features one row at a time through the ORM
+        
+        Duplicate keys (only possible with allow_duplicates) are skipped like
+        in bulk mode. Any other failing row aborts the import: rolling back
+        the session would silently drop every row before it.
+        """
+        self.stats['features_processed'] += len(df)
+        
+        rows = self.normalize_features(df)
+        progress = self.start_progress(FeatureMap.__tablename__, len(rows))
+        seen = set()
+        for feature_data, labels in rows:
+            progress.update()
+            if feature_data['feature_key'] in seen:
+                self.stats['errors'].append(f"Feature {feature_data['feature_key']}: duplicate key, skipped")
+                continue
+            seen.add(feature_data['feature_key'])
+            
+            try:
+                # Create feature object
+                feature = FeatureMap(**feature_data)
+                db.session.add(feature)
+                db.session.flush()  # Get the ID
+                
+                # Add labels
+                for label in dict.fromkeys(labels):
+                    feature_label = FeatureLabel(
+                        feature_key=feature.feature_key,
+                        label=label
+                    )
+                    db.session.add(feature_label)
+                    self.stats['labels_inserted'] += 1
+                
+                self.stats['features_inserted'] += 1
+                self.stats['labels_processed'] += len(labels)
+                
+                if self.verbose:
+                    click.echo(f"✅ Feature processed: {feature.feature_key} ({len(labels)} labels)")
+                
+            except Exception as e:
+                progress.finish()
+                self.stats['errors'].append(f"Feature {feature_data['feature_key']}: {e}")
+                click.echo(f"❌ Error processing feature {feature_data['feature_key']}: {e}")
+                click.echo("❌ Import aborted, rows of this import rolled back")
+                db.session.rollback()
+                return False
+        
+        progress.finish()
+        return True
+    
+    def collect_feature_rows(self, df, skip_keys=()):
+        """Normalize all rows into feature and label row dicts for bulk mode
+        
+        Duplicate feature keys (and keys in skip_keys, i.e. already in the
+        database) are reported as errors and skipped instead of failing
+        the whole batch.
+        """
+        feature_rows, label_rows = [], []
+        seen = set(skip_keys)
+        now = datetime.utcnow()
+        
+        self.stats['features_processed'] += len(df)
+        
+        for feature_data, labels in self.normalize_features(df):
+            feature_key = feature_data['feature_key']
+            if feature_key in seen:
+                self.stats['errors'].append(f"Feature {feature_key}: duplicate key, skipped")
+                continue
+            seen.add(feature_key)
+            
+            feature_rows.append(dict(feature_data, created_at=now))
+            for label in dict.fromkeys(labels):
+                label_rows.append({'feature_key': feature_key, 'label': label, 'created_at': now})
+            self.stats['labels_processed'] += len(labels)
+        
+        return feature_rows, label_rows
+    
+    def copy_rows(self, connection, table, rows):
+        """Stream rows into table with PostgreSQL COPY (in the session's transaction)"""
+        columns = list(rows[0].keys())
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([row[column] for column in columns])
+        buffer.seek(0)
+        
+        cursor = connection.connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer
+            )
+        finally:
+            cursor.close()
+    
+    def bulk_insert(self, table, rows):
+        """Write rows with COPY on PostgreSQL/psycopg2, else executemany batches"""
+        if not rows:
+            return
+        
+        connection = db.session.connection()
+        progress = self.start_progress(table.name, len(rows), record_rows=self.batch_size)
+        if connection.dialect.name == 'postgresql' and connection.dialect.driver == 'psycopg2':
+            self.copy_rows(connection, table, rows)
+            progress.update(len(rows))
+        else:
+            statement = insert(table)
+            for start in range(0, len(rows), self.batch_size):
+                batch = rows[start:start + self.batch_size]
+                connection.execute(statement, batch)
+                progress.update(len(batch))
+        progress.finish()
+    
+    def bulk_import_rows(self, df, append=False):
+        """Insert every feature and label row in a few round trips"""
+        skip_keys = set()
+        if append:
+            skip_keys = {key for (key,) in db.session.query(FeatureMap.feature_key)}
+        
+        feature_rows, label_rows = self.collect_feature_rows(df, skip_keys)
+        click.echo(f"📦 Bulk inserting {len(feature_rows)} features and {len(label_rows)} labels "
+                   f"(batch size {self.batch_size})...")
+        
+        try:
+            self.bulk_insert(FeatureMap.__table__, feature_rows)
+            self.bulk_insert(FeatureLabel.__table__, label_rows)
+        except Exception as e:
+            self.stats['errors'].append(f"Bulk insert: {e}")
+            click.echo(f"❌ Bulk insert failed: {e}")
+            db.session.rollback()
+            return False
+        
+        self.stats['features_inserted'] += len(feature_rows)
+        self.stats['labels_inserted'] += len(label_rows)
+        return True
+    
+    def feature_hash(self, feature_data):
+        """Content hash of a feature row's fields (labels are diffed separately)"""
+        payload = '\x1f'.join('\x00' if feature_data[field] is None else str(feature_data[field])
+                               for field in FEATURE_FIELDS)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def upsert_statement(self, connection):
+        """INSERT ... ON CONFLICT (feature_key) DO UPDATE for PostgreSQL/SQLite"""
+        dialect_insert = postgresql.insert if connection.dialect.name == 'postgresql' else sqlite.insert
+        statement = dialect_insert(FeatureMap.__table__)
+        return statement.on_conflict_do_update(
+            index_elements=['feature_key'],
+            set_={field: statement.excluded[field] for field in FEATURE_FIELDS if field != 'feature_key'}
+        )
+    
+    def incremental_import_rows(self, df, sheet_statuses=None):
+        """Write only the differences between the sheet and the database
+        
+        New keys are inserted and changed ones (by content hash) updated in
+        one upsert; keys missing from the sheet are deleted and label sets
+        are diffed per feature. Unchanged rows are not touched, and
+        changed_keys is set to the features whose branch statuses need
+        rebuilding (upserted rows and registry-only branch changes).
+        """
+        feature_table = FeatureMap.__table__
+        label_table = FeatureLabel.__table__
+        feature_rows, label_rows = self.collect_feature_rows(df)
+        
+        try:
+            connection = db.session.connection()
+            existing = {
+                row.feature_key: self.feature_hash(row._mapping)
+                for row in connection.execute(select(*[feature_table.c[field] for field in FEATURE_FIELDS]))
+            }
+            existing_labels = set(connection.execute(select(label_table.c.feature_key, label_table.c.label)).all())
+            existing_statuses = set()
+            if sheet_statuses:
+                status_table = FeatureBranchStatus.__table__
+                existing_statuses = set(connection.execute(
+                    select(status_table.c.feature_key, status_table.c.branch_id, status_table.c.status)
+                    .where(status_table.c.branch_id.in_(list(sheet_statuses)))
+                ).all())
+            
+            upserts = []
+            for row in feature_rows:
+                previous = existing.get(row['feature_key'])
+                if previous is None:
+                    self.stats['features_inserted'] += 1
+                elif previous != self.feature_hash(row):
+                    self.stats['features_updated'] += 1
+                else:
+                    self.stats['features_unchanged'] += 1
+                    continue
+                upserts.append(row)
+            
+            incoming_keys = {row['feature_key'] for row in feature_rows}
+            removed_keys = [key for key in existing if key not in incoming_keys]
+            
+            wanted_labels = {(row['feature_key'], row['label']): row for row in label_rows}
+            label_inserts = [row for pair, row in wanted_labels.items() if pair not in existing_labels]
+            label_deletes = [{'b_feature_key': key, 'b_label': label}
+                             for key, label in existing_labels if (key, label) not in wanted_labels]
+            
+            wanted_statuses = {(key, branch_id, status) for branch_id, statuses in (sheet_statuses or {}).items()
+                               for key, status in statuses}
+            changed_keys = {row['feature_key'] for row in upserts}
+            changed_keys.update(key for key, _, _ in existing_statuses ^ wanted_statuses)
+            changed_keys.difference_update(removed_keys)
+            
+            click.echo(f"🔁 Incremental: {self.stats['features_inserted']} new, "
+                       f"{self.stats['features_updated']} changed, {len(removed_keys)} removed, "
+                       f"{self.stats['features_unchanged']} unchanged features; "
+                       f"+{len(label_inserts)}/-{len(label_deletes)} labels")
+            
+            # Children first (foreign keys), then features, then new labels
+            if label_deletes:
+                connection.execute(
+                    delete(label_table).where(label_table.c.feature_key == bindparam('b_feature_key'),
+                                              label_table.c.label == bindparam('b_label')),
+                    label_deletes
+                )
+            for start in range(0, len(removed_keys), self.batch_size):
+                batch = removed_keys[start:start + self.batch_size]
+                connection.execute(delete(FeatureBranchStatus.__table__)
+                                   .where(FeatureBranchStatus.__table__.c.feature_key.in_(batch)))
+                connection.execute(delete(feature_table).where(feature_table.c.feature_key.in_(batch)))
+            
+            statement = self.upsert_statement(connection)
+            for start in range(0, len(upserts), self.batch_size):
+                connection.execute(statement, upserts[start:start + self.batch_size])
+            for start in range(0, len(label_inserts), self.batch_size):
+                connection.execute(insert(label_table), label_inserts[start:start + self.batch_size])
+        except Exception as e:
+            self.stats['errors'].append(f"Incremental import: {e}")
+            click.echo(f"❌ Incremental import failed: {e}")
+            db.session.rollback()
+            return False
+        
+        self.stats['features_deleted'] += len(removed_keys)
+        self.stats['labels_inserted'] += len(label_inserts)
+        self.stats['labels_deleted'] += len(label_deletes)
+        self.changed_keys = sorted(changed_keys)
+        return True
+    
+    def swap_import_rows(self, df, sheet_statuses=None):
+        """Load staging tables, validate them and swap them in atomically
+        
+        The live tables stay fully readable until the swap transaction,
+        which only renames tables (plus the small facet rebuild and the
+        generation bump) and so takes milliseconds regardless of size.
+        """
+        feature_rows, label_rows = self.collect_feature_rows(df)
+        
+        try:
+            connection = db.session.connection()
+            staging = table_swap.create_staging_tables(connection)
+            click.echo(f"📦 Loading {len(feature_rows)} features and {len(label_rows)} labels into staging tables...")
+            self.bulk_insert(staging[FeatureMap.__tablename__], feature_rows)
+            self.bulk_insert(staging[FeatureLabel.__tablename__], label_rows)
+            status_count = FeatureBranchStatus.rebuild(staging[FeatureMap.__tablename__],
+                                                       staging[FeatureBranchStatus.__tablename__],
+                                                       sheet_statuses)
+            status_count += table_swap.copy_registry_statuses(connection, staging, skip_branch_ids=sheet_statuses)
+            table_swap.create_staging_indexes(connection, staging)
+            
+            problems = table_swap.validate_staging(connection, staging, {
+                FeatureMap.__tablename__: len(feature_rows),
+                FeatureLabel.__tablename__: len(label_rows),
+                FeatureBranchStatus.__tablename__: status_count,
+            })
+            if problems:
+                for problem in problems:
+                    self.stats['errors'].append(f"Staging validation: {problem}")
+                    click.echo(f"❌ Staging validation failed: {problem}")
+                db.session.rollback()
+                table_swap.drop_staging_tables(db.session.connection())
+                db.session.commit()
+                return False
+            db.session.commit()
+            click.echo(f"✅ Staging tables validated ({status_count} branch status rows)")
+            
+            # Swap transaction: the generation bump is its first write, which
+            # also makes pysqlite open the transaction before the DDL
+            started = time.perf_counter()
+            ImportGeneration.bump(ImportGeneration.FEATURES)
+            db.session.flush()
+            table_swap.swap_staging_tables(db.session.connection(), staging)
+            facet_count = FeatureFacet.rebuild()
+            db.session.commit()
+            click.echo(f"🔀 Swapped in new tables in {(time.perf_counter() - started) * 1000:.0f} ms "
+                       f"({facet_count} filter facets)")
+        except Exception as e:
+            self.stats['errors'].append(f"Swap import: {e}")
+            click.echo(f"❌ Swap import failed: {e}")
+            db.session.rollback()
+            table_swap.drop_staging_tables(db.session.connection())
+            db.session.commit()
+            return False
+        
+        self.stats['features_inserted'] += len(feature_rows)
+        self.stats['labels_inserted'] += len(label_rows)
+        return True
+    
+    def mark_data_changed(self, sheet_statuses=None, feature_keys=None):
+        """Rebuild derived tables and bump the import generation (caller commits)
+        
+        sheet_statuses (see collect_branch_statuses) replaces the rows of
+        the registry-only branches read from this import's sheet;
+        feature_keys limits the branch status rebuild to those features.
+        """
+        status_count = FeatureBranchStatus.rebuild(sheet_statuses=sheet_statuses, feature_keys=feature_keys)
+        click.echo(f"🌿 Rebuilt {status_count} branch status rows")
+        facet_count = FeatureFacet.rebuild()
+        click.echo(f"📊 Rebuilt {facet_count} filter facets")
+        return ImportGeneration.bump(ImportGeneration.FEATURES)
+    
+    def has_changes(self):
+        """Whether this import wrote anything (an incremental run may be a no-op)"""
+        written = ('features_inserted', 'features_updated', 'features_deleted', 'labels_inserted', 'labels_deleted')
+        return any(self.stats[key] for key in written) or bool(self.changed_keys)
+    
+    def file_fingerprint(self, filepath):
+        """Size, mtime and SHA-256 of the source file (ImportLedger fields)"""
+        stat = os.stat(filepath)
+        return {
+            'file_path': os.path.abspath(filepath),
+            'file_size': stat.st_size,
+            'file_mtime': datetime.utcfromtimestamp(stat.st_mtime),
+            'file_sha256': excel_loader.file_sha256(filepath)
+        }
+    
+    def sheet_hash(self, df):
+        """Hash of the parsed sheet (same for a re-saved file with equal contents)"""
+        digest = hashlib.sha256('\x1f'.join(str(column) for column in df.columns).encode('utf-8'))
+        digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+        return digest.hexdigest()
+    
+    def is_unchanged(self, latest, field, value):
+        """True (and reported) if the last import read the same sheets and has the same fingerprint field"""
+        if self.force or latest is None or getattr(latest, field) != value:
+            return False
+        if (latest.sheet_names or ','.join(DEFAULT_SHEETS)) != ','.join(self.sheets):
+            return False
+        
+        what = 'file' if field == 'file_sha256' else 'sheet contents'
+        self.stats['skipped'] = (f"{what} unchanged since import #{latest.id} "
+                                 f"({latest.file_path}, {latest.imported_at:%Y-%m-%d %H:%M})")
+        click.echo(f"⏭️  Skipping import: {self.stats['skipped']}. Use --force to re-import.")
+        return True
+    
+    def find_feature_snapshots(self, directories=SNAPSHOT_DIRS):
+        """All dated feature files as [(date, path)], oldest first
+        
+        When the same date exists in several directories the first
+        directory wins (data/ before data/archieve/).
+        """
+        snapshots = {}
+        for directory in directories:
+            if not os.path.isdir(directory):
+                continue
+            for filename in sorted(os.listdir(directory)):
+                match = SNAPSHOT_PATTERN.match(filename)
+                if match:
+                    snapshot_date = datetime.strptime(match.group(1), '%Y%m%d').date()
+                    snapshots.setdefault(snapshot_date, os.path.join(directory, filename))
+        return sorted(snapshots.items())
+    
+    def build_history(self, snapshots):
+        """Collapse normalized snapshots into validity-ranged versions
+        
+        snapshots is [(date, normalized rows)] in date order. A feature
+        keeps one version while its content (fields and labels) is
+        unchanged; a change or a removal closes it with valid_to set to
+        the snapshot date. Returns the s_feature_history row dicts.
+        """
+        versions, current = [], {}
+        for snapshot_date, rows in snapshots:
+            seen = set()
+            for feature_data, labels in rows:
+                feature_key = feature_data['feature_key']
+                if feature_key in seen:
+                    self.stats['errors'].append(f"Feature {feature_key}: duplicate key in {snapshot_date}, skipped")
+                    continue
+                seen.add(feature_key)
+                
+                label_text = ', '.join(sorted(set(labels))) or None
+                content_hash = hashlib.sha256(
+                    f"{self.feature_hash(feature_data)}\x1f{label_text or ''}".encode('utf-8')
+                ).hexdigest()
+                version = current.get(feature_key)
+                if version is not None and version['content_hash'] == content_hash:
+                    continue
+                if version is not None:
+                    version['valid_to'] = snapshot_date
+                    versions.append(version)
+                current[feature_key] = dict(feature_data, labels=label_text, content_hash=content_hash,
+                                            valid_from=snapshot_date, valid_to=None)
+            
+            for feature_key in [key for key in current if key not in seen]:
+                version = current.pop(feature_key)
+                version['valid_to'] = snapshot_date
+                versions.append(version)
+        
+        versions.extend(current.values())
+        return versions
+    
+    def import_history(self, directories=SNAPSHOT_DIRS, workers=None):
+        """Load every dated snapshot into s_feature_history
+        
+        Snapshots are parsed and normalized in parallel worker processes;
+        the versioned tables are then rebuilt in one transaction.
+        """
+        click.echo("🚀 Starting EC SONiC Feature history import")
+        click.echo("=" * 60)
+        
+        snapshots = self.find_feature_snapshots(directories)
+        if not snapshots:
+            click.echo("❌ No EC SONiC Feature snapshots found")
+            return False
+        click.echo(f"📚 Found {len(snapshots)} snapshots ({snapshots[0][0]} to {snapshots[-1][0]})")
+        
+        started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(load_snapshot, [path for _, path in snapshots]))
+        
+        loaded = []
+        for (snapshot_date, path), (file_hash, rows, error) in zip(snapshots, results):
+            if rows is None:
+                self.stats['errors'].append(f"Snapshot {path}: {error}")
+                click.echo(f"⚠️  Skipping {path}: {error}")
+                continue
+            click.echo(f"📖 {snapshot_date}: {len(rows)} features from {path}")
+            loaded.append((snapshot_date, path, file_hash, rows))
+        click.echo(f"⚡ Parsed {len(loaded)} snapshots in {time.perf_counter() - started:.2f}s")
+        if not loaded:
+            return False
+        
+        versions = self.build_history([(snapshot_date, rows) for snapshot_date, _, _, rows in loaded])
+        now = datetime.utcnow()
+        snapshot_rows = [{
+            'snapshot_date': snapshot_date,
+            'file_path': os.path.abspath(path),
+            'file_sha256': file_hash,
+            'feature_count': len(rows),
+            'imported_at': now
+        } for snapshot_date, path, file_hash, rows in loaded]
+        
+        app = self.create_app()
+        with app.app_context():
+            for model in (FeatureSnapshot, FeatureHistory):
+                model.__table__.create(db.engine, checkfirst=True)
+            
+            try:
+                db.session.execute(delete(FeatureHistory.__table__))
+                db.session.execute(delete(FeatureSnapshot.__table__))
+                self.bulk_insert(FeatureSnapshot.__table__, snapshot_rows)
+                self.bulk_insert(FeatureHistory.__table__, versions)
+                # Cached pages and ETags follow the generation
+                ImportGeneration.bump(ImportGeneration.FEATURES)
+                db.session.commit()
+            except Exception as e:
+                self.stats['errors'].append(f"History import: {e}")
+                click.echo(f"❌ History import failed: {e}")
+                db.session.rollback()
+                return False
+        
+        self.stats['snapshots_loaded'] = len(loaded)
+        self.stats['features_processed'] = sum(len(rows) for _, _, _, rows in loaded)
+        self.stats['history_versions'] = len(versions)
+        self.stats['elapsed_seconds'] = time.perf_counter() - started
+        click.echo(f"\n✅ Stored {len(versions)} feature versions from {len(loaded)} snapshots")
+        return True
+    
     def import_features(self, filepath, clear_data=True):
         """Main import process"""
         click.echo("🚀 Starting SQLAlchemy EC SONiC Feature import process")
@@ -238,64 +1012,91 @@ class SQLAlchemyFeatureImporter:
         
         # Create app and push context
         app = self.create_app()
+        import_started = time.perf_counter()
         
         with app.app_context():
+            # Make sure the derived tables used by the web app exist
+            for model in (ImportGeneration, ImportLedger, FeatureFacet, Branch, FeatureBranchStatus):
+                model.__table__.create(db.engine, checkfirst=True)
+            if Branch.ensure_defaults():
+                db.session.commit()
+            self.sheet_branches = [(branch.branch_id, branch.excel_column) for branch in Branch.sheet_branches()]
+            
+            # Skip files that were already imported (unless forced)
+            fingerprint = self.file_fingerprint(filepath)
+            latest = ImportLedger.latest(ImportGeneration.FEATURES)
+            if self.is_unchanged(latest, 'file_sha256', fingerprint['file_sha256']):
+                return True
+            
+            # Read Excel data (before clearing, so a bad file leaves the tables alone)
+            df = self.read_excel_data(filepath, fingerprint['file_sha256'])
+            if df is None:
+                return False
+            
+            sheet_hash = self.sheet_hash(df)
+            if self.is_unchanged(latest, 'sheet_hash', sheet_hash):
+                return True
+            
+            # Validate the whole sheet before anything is written
+            if not self.check_features(df):
+                return False
+            sheet_statuses = self.collect_branch_statuses(df)
+            
             # Clear existing data first (if requested)
-            if clear_data:
+            if self.incremental:
+                click.echo("🔁 Incremental mode - only changed rows will be written")
+            elif self.swap:
+                click.echo("🔀 Swap mode - loading into staging tables, live tables stay untouched")
+            elif clear_data:
                 if not self.clear_existing_data():
                     click.echo("❌ Failed to clear existing data. Aborting import.")
                     return False
             else:
                 click.echo("⚠️  Skipping data clearing - will append to existing data")
             
-            # Read Excel data
-            df = self.read_excel_data(filepath)
-            if df is None:
-                return False
-            
             # Process each row
             click.echo(f"\n📝 Processing {len(df)} feature rows...")
+            started = time.perf_counter()
             
-            for index, row in df.iterrows():
-                self.stats['features_processed'] += 1
-                
-                # Process the row
-                result = self.process_feature_row(row)
-                if result is None:
-                    continue
-                
-                feature_data, labels = result
-                
-                try:
-                    # Create feature object
-                    feature = FeatureMap(**feature_data)
-                    db.session.add(feature)
-                    db.session.flush()  # Get the ID
-                    
-                    self.stats['features_inserted'] += 1
-                    
-                    # Add labels
-                    for label in labels:
-                        feature_label = FeatureLabel(
-                            feature_key=feature.feature_key,
-                            label=label
-                        )
-                        db.session.add(feature_label)
-                        self.stats['labels_inserted'] += 1
-                    
-                    self.stats['labels_processed'] += len(labels)
-                    
-                    click.echo(f"✅ Feature processed: {feature.feature_key} ({len(labels)} labels)")
-                    
-                except Exception as e:
-                    self.stats['errors'].append(f"Feature {feature_data['feature_key']}: {e}")
-                    click.echo(f"❌ Error processing feature {feature_data['feature_key']}: {e}")
-                    db.session.rollback()
-                    continue
+            if self.incremental:
+                if not self.incremental_import_rows(df, sheet_statuses):
+                    return False
+            elif self.swap:
+                if not self.swap_import_rows(df, sheet_statuses):
+                    return False
+            elif self.bulk:
+                if not self.bulk_import_rows(df, append=not clear_data):
+                    return False
+            else:
+                if not self.import_rows(df):
+                    return False
             
-            # Commit all changes
+            # Commit all changes together with the refreshed facets and
+            # generation, which tells the web app to drop its cached pages
             try:
+                unchanged = self.incremental and not self.has_changes()
+                if self.swap:
+                    # Derived tables and the generation were updated by the swap
+                    table_swap.validate_foreign_keys(db.session.connection())
+                    generation = ImportGeneration.current(ImportGeneration.FEATURES)
+                elif unchanged:
+                    # Nothing was written: derived tables, search index and cached pages are current
+                    click.echo("⏸️  No changes - derived tables and import generation left as they are")
+                    generation = ImportGeneration.current(ImportGeneration.FEATURES)
+                else:
+                    generation = self.mark_data_changed(sheet_statuses, self.changed_keys)
+                if not unchanged:
+                    search_stats = search_index.refresh_feature_documents(db.session.connection())
+                    click.echo(f"🔎 Search index: {search_stats['inserted']} added, "
+                               f"{search_stats['updated']} updated, {search_stats['deleted']} removed")
+                db.session.add(ImportLedger(name=ImportGeneration.FEATURES, sheet_hash=sheet_hash,
+                                            sheet_names=','.join(self.sheets),
+                                            row_count=len(df),
+                                            duration_seconds=time.perf_counter() - import_started,
+                                            **fingerprint))
                 db.session.commit()
+                self.stats['elapsed_seconds'] = time.perf_counter() - started
+                click.echo(f"🔢 Import generation: {generation}")
                 click.echo("\n✅ All changes committed to database")
                 return True
             except Exception as e:
@@ -303,17 +1104,53 @@ class SQLAlchemyFeatureImporter:
                 db.session.rollback()
                 return False
     
+    def log_summary(self, success):
+        """Final JSON log record with the import statistics"""
+        record = {key: value for key, value in self.stats.items() if key != 'errors'}
+        import_progress.emit_record(dict(event='summary', success=success, **record,
+                                         errors=len(self.stats['errors']),
+                                         error_details=self.stats['errors'][:10]), self.log_stream)
+    
     def print_summary(self):
         """Print import summary"""
         click.echo("\n📊 Import Summary")
         click.echo("=" * 60)
+        if self.stats['skipped']:
+            click.echo(f"⏭️  Skipped: {self.stats['skipped']}")
+            return
+        
+        if self.stats['snapshots_loaded']:
+            click.echo(f"📚 Snapshots loaded: {self.stats['snapshots_loaded']}")
+            click.echo(f"📝 Feature rows read: {self.stats['features_processed']}")
+            click.echo(f"🕰️  History versions: {self.stats['history_versions']}")
+            click.echo(f"❌ Errors: {len(self.stats['errors'])}")
+            if self.stats['elapsed_seconds']:
+                click.echo(f"⏱️  Total time: {self.stats['elapsed_seconds']:.2f}s")
+            self.print_errors()
+            return
+        
         click.echo(f"📝 Features processed: {self.stats['features_processed']}")
         click.echo(f"➕ Features inserted: {self.stats['features_inserted']}")
         click.echo(f"🔄 Features updated: {self.stats['features_updated']}")
+        if self.incremental:
+            click.echo(f"⏸️  Features unchanged: {self.stats['features_unchanged']}")
+            click.echo(f"🗑️  Features deleted: {self.stats['features_deleted']}")
         click.echo(f"🏷️  Labels processed: {self.stats['labels_processed']}")
         click.echo(f"➕ Labels inserted: {self.stats['labels_inserted']}")
+        if self.incremental:
+            click.echo(f"🗑️  Labels deleted: {self.stats['labels_deleted']}")
         click.echo(f"❌ Errors: {len(self.stats['errors'])}")
         
+        elapsed = self.stats['elapsed_seconds']
+        if elapsed:
+            rows = sum(self.stats[key] for key in ('features_inserted', 'features_updated', 'features_deleted',
+                                                   'labels_inserted', 'labels_deleted'))
+            click.echo(f"⏱️  Write time: {elapsed:.2f}s ({rows / elapsed:,.0f} rows/sec)")
+        
+        self.print_errors()
+    
+    def print_errors(self):
+        """Print the first error details"""
         if self.stats['errors']:
             click.echo(f"\n⚠️  Error Details:")
             for error in self.stats['errors'][:10]:  # Show first 10 errors
@@ -322,19 +1159,90 @@ class SQLAlchemyFeatureImporter:
                 click.echo(f"   ... and {len(self.stats['errors']) - 10} more errors")
 
 
+def load_snapshot(filepath):
+    """Parse and normalize one snapshot file (runs in a worker process)
+    
+    Returns (file_sha256, normalized rows, error); rows is None when the
+    file can't be used.
+    """
+    importer = SQLAlchemyFeatureImporter()
+    try:
+        file_hash = excel_loader.file_sha256(filepath)
+        # Keep per-file output out of the parent's log; failures are reported there
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            df = importer.read_excel_data(filepath, file_hash)
+            rows = importer.normalize_features(df) if df is not None else None
+    except Exception as e:
+        return None, None, str(e)
+    
+    if rows is None:
+        failures = [line for line in output.getvalue().splitlines() if line.startswith('❌')]
+        return file_hash, None, failures[-1].lstrip('❌ ') if failures else 'unreadable file'
+    return file_hash, rows, None
+
+
 @click.command()
 @click.option('--env', default='development', help='Environment (development/production/testing)')
 @click.option('--date', help='Specific date in YYYYMMDD format (e.g., 20250626)')
 @click.option('--file', help='Specific Excel file path')
 @click.option('--dry-run', is_flag=True, help='Preview data without importing')
 @click.option('--no-clear', is_flag=True, help='Do not clear existing data before import')
-def main(env, date, file, dry_run, no_clear):
+@click.option('--bulk', is_flag=True, help='Insert all rows in batches (COPY on PostgreSQL) instead of row by row')
+@click.option('--incremental', is_flag=True, help='Only insert/update/delete rows that changed (implies --no-clear)')
+@click.option('--swap', is_flag=True, help='Load into staging tables and swap them in atomically')
+@click.option('--force', is_flag=True, help='Re-import even if the ledger shows this file was already imported')
+@click.option('--batch-size', default=DEFAULT_BATCH_SIZE, show_default=True, help='Rows per batch in bulk/incremental/swap mode')
+@click.option('--history', is_flag=True, help='Load every dated snapshot in data/ and data/archieve/ into the feature history')
+@click.option('--sheet', 'sheets', multiple=True, help='Sheet to import, repeat for several (default: feature_map)')
+@click.option('--workers', type=int, help='Worker processes for parsing sheets/snapshots (default: CPU count)')
+@click.option('--allow-duplicates', is_flag=True, help='Import files with duplicate/colliding keys (first row wins)')
+@click.option('--report', 'report_path', type=click.Path(dir_okay=False), help='Write the validation report (JSON) to this file')
+@click.option('--verbose', '-v', is_flag=True, help='Print a line per row instead of a progress bar')
+@click.option('--log-format', type=click.Choice(import_progress.LOG_FORMATS), default='text', show_default=True,
+              help='json: one JSON record per written batch and a summary on stdout, other output on stderr')
+@click.pass_context
+def main(ctx, env, date, file, dry_run, no_clear, bulk, incremental, swap, force, batch_size, history, sheets, workers,
+         allow_duplicates, report_path, verbose, log_format):
     """Import EC SONiC features from Excel to database using SQLAlchemy"""
     
+    if incremental and swap:
+        click.echo("❌ --incremental and --swap cannot be combined")
+        ctx.exit(1)
+    
     # Create importer
-    importer = SQLAlchemyFeatureImporter(env)
+    importer = SQLAlchemyFeatureImporter(env, bulk=bulk, incremental=incremental, swap=swap,
+                                         batch_size=batch_size, force=force,
+                                         sheets=sheets or DEFAULT_SHEETS, workers=workers,
+                                         allow_duplicates=allow_duplicates, report_path=report_path,
+                                         verbose=verbose, log_format=log_format)
+    
+    # JSON records keep stdout; everything else goes to stderr
+    output = contextlib.nullcontext()
+    if log_format == 'json':
+        importer.log_stream = sys.stdout
+        output = contextlib.redirect_stdout(sys.stderr)
     
+    with output:
+        exit_code = run_import(importer, date, file, dry_run, no_clear, history)
+    
+    # A click command's return value is discarded; exit with the code explicitly
+    ctx.exit(exit_code)
+
+
+def run_import(importer, date, file, dry_run, no_clear, history):
+    """Run the import selected on the command line; returns the exit code"""
     try:
+        if history:
+            success = importer.import_history(workers=importer.workers)
+            if importer.log_format == 'json':
+                importer.log_summary(success)
+            if success:
+                importer.print_summary()
+                click.echo("\n🎉 History import completed successfully!")
+                return 0
+            click.echo("\n💥 History import failed!")
+            return 1
+        
         # Find Excel file
         if file:
             excel_file = file
@@ -349,11 +1257,13 @@ def main(env, date, file, dry_run, no_clear):
             click.echo("🔍 DRY RUN MODE - No data will be imported")
             df = importer.read_excel_data(excel_file)
             if df is not None:
-                click.echo(f"✅ Would process {len(df)} feature rows")
+                valid = importer.check_features(df)
+                click.echo(f"✅ Would process {len(df)} feature rows" if valid else
+                           f"❌ Import would fail validation")
                 
                 # Preview first few rows
                 click.echo("\n📋 Preview of first 3 rows:")
-                for index, row in df.head(3).iterrows():
+                for index, (_, row) in enumerate(df.head(3).iterrows()):
                     result = importer.process_feature_row(row)
                     if result:
                         feature_data, labels = result
@@ -366,11 +1276,14 @@ def main(env, date, file, dry_run, no_clear):
                         if labels:
                             click.echo(f"      Labels: {', '.join(labels)}")
                         click.echo()
-            return 0
+                return 0 if valid else 1
+            return 1
         else:
             # Import features
             clear_data = not no_clear
             success = importer.import_features(excel_file, clear_data)
+            if importer.log_format == 'json':
+                importer.log_summary(success)
             
             if success:
                 importer.print_summary()
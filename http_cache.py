@@ -0,0 +1,106 @@
+"""
+Response compression and conditional GET helpers
+"""
+import glob
+import gzip
+import hashlib
+import os
+from datetime import datetime, timezone
+from functools import wraps
+from flask import current_app, make_response, request
+from werkzeug.http import is_resource_modified
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+
+def compress_response(response, app_config):
+    """Compress an HTML/JSON response with brotli or gzip if it is large enough
+
+    Streamed and passthrough responses (e.g. /api/features, static files)
+    are left alone. Strong ETags are weakened, since the compressed body is
+    a different byte sequence for the same representation.
+    """
+    response.vary.add('Accept-Encoding')
+
+    if (response.status_code < 200 or response.status_code in (204, 206, 304)
+            or response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in app_config.get('COMPRESS_MIMETYPES', ())):
+        return response
+
+    data = response.get_data()
+    if len(data) < app_config.get('COMPRESS_MIN_SIZE', 500):
+        return response
+
+    encodings = ['br', 'gzip'] if brotli is not None else ['gzip']
+    encoding = request.accept_encodings.best_match(encodings)
+    if encoding == 'br':
+        compressed = brotli.compress(data, quality=app_config.get('COMPRESS_BR_LEVEL', 4))
+    elif encoding == 'gzip':
+        compressed = gzip.compress(data, compresslevel=app_config.get('COMPRESS_LEVEL', 6))
+    else:
+        return response
+
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+
+    return response
+
+
+def resolve_source_files(patterns):
+    """Expand the template/data file patterns a page is rendered from"""
+    files = []
+    for pattern in patterns:
+        if pattern.startswith('templates/'):
+            pattern = os.path.join(current_app.root_path, pattern)
+        files.extend(sorted(glob.glob(pattern)))
+    return files
+
+
+def conditional_page(*source_files):
+    """Serve a page with ETag/Last-Modified derived from its source files
+
+    source_files are glob patterns: templates are resolved against the app
+    root, data files (README.md, schema_*.md) against the working directory
+    like the views themselves. templates/base.html is always included.
+    When the client already has the current version, a 304 is returned
+    without rendering the page.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped(*args, **kwargs):
+            files = resolve_source_files(('templates/base.html',) + source_files)
+            stats = [(path, os.stat(path)) for path in files]
+
+            fingerprint = '|'.join(
+                [request.path, request.query_string.decode('latin-1')] +
+                [f"{path}:{stat.st_size}:{stat.st_mtime_ns}" for path, stat in stats]
+            )
+            etag = hashlib.sha1(fingerprint.encode('utf-8')).hexdigest()
+            last_modified = None
+            if stats:
+                newest = max(stat.st_mtime for _, stat in stats)
+                last_modified = datetime.fromtimestamp(int(newest), tz=timezone.utc)
+
+            max_age = current_app.config.get('PAGE_CACHE_MAX_AGE', 0)
+
+            if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+                response = make_response('', 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+
+            response.set_etag(etag, weak=True)
+            if last_modified:
+                response.last_modified = last_modified
+            response.cache_control.public = True
+            response.cache_control.max_age = max_age
+            return response
+        return wrapped
+    return decorator
@@ -0,0 +1,124 @@
+"""
+Progress reporting for the importers
+
+- text (default): a progress bar with rows, rows/sec and ETA on stderr,
+  redrawn in place at most every TTY_INTERVAL seconds on a terminal, or
+  written as a plain line every LOG_INTERVAL seconds when redirected
+- json: one JSON record per written batch on the log stream (stdout);
+  the importers send their human-readable output to stderr in this mode
+- verbose: no bar; the importers print their per-row lines instead
+"""
+import json
+import sys
+import time
+
+LOG_FORMATS = ('text', 'json')
+
+TTY_INTERVAL = 0.2
+LOG_INTERVAL = 5.0
+BAR_WIDTH = 30
+
+# Rows per JSON record when rows are reported one at a time
+DEFAULT_RECORD_ROWS = 1000
+
+
+def format_duration(seconds):
+    """Seconds as m:ss (or h:mm:ss)"""
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+
+def emit_record(record, stream=None):
+    """Write one JSON log record (one line)"""
+    stream = stream or sys.stdout
+    stream.write(json.dumps(record, default=str, ensure_ascii=False) + '\n')
+    stream.flush()
+
+
+class ImportProgress:
+    """Progress of one import phase (e.g. writing one table)"""
+
+    def __init__(self, phase, total, log_format='text', verbose=False,
+                 record_rows=DEFAULT_RECORD_ROWS, log_stream=None, bar_stream=None):
+        self.phase = phase
+        self.total = total
+        self.log_format = log_format
+        self.verbose = verbose
+        self.record_rows = record_rows
+        self.log_stream = log_stream
+        self.bar_stream = bar_stream or sys.stderr
+        self.is_tty = hasattr(self.bar_stream, 'isatty') and self.bar_stream.isatty()
+        self.done = 0
+        self.batches = 0
+        self.pending = 0
+        self.started = time.perf_counter()
+        self.last_draw = None
+
+    def rate(self, now=None):
+        """Rows per second so far"""
+        elapsed = (now or time.perf_counter()) - self.started
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+    def eta(self, now=None):
+        """Estimated seconds left (None until there is a rate)"""
+        rate = self.rate(now)
+        return max(self.total - self.done, 0) / rate if rate else None
+
+    def update(self, count=1):
+        """Record count more rows written (one row or one batch)"""
+        self.done += count
+        self.pending += count
+        now = time.perf_counter()
+
+        if self.log_format == 'json':
+            if self.pending >= self.record_rows or self.done >= self.total:
+                self.emit_batch(now)
+            return
+        if self.verbose:
+            return
+
+        interval = TTY_INTERVAL if self.is_tty else LOG_INTERVAL
+        if self.last_draw is None or now - self.last_draw >= interval or self.done >= self.total:
+            self.draw(now)
+
+    def emit_batch(self, now):
+        """JSON record for the rows since the last record"""
+        self.batches += 1
+        eta = self.eta(now)
+        emit_record({
+            'event': 'batch',
+            'phase': self.phase,
+            'batch': self.batches,
+            'rows': self.pending,
+            'done': self.done,
+            'total': self.total,
+            'elapsed_seconds': round(now - self.started, 3),
+            'rows_per_sec': round(self.rate(now), 1),
+            'eta_seconds': round(eta, 1) if eta is not None else None
+        }, self.log_stream)
+        self.pending = 0
+
+    def draw(self, now):
+        """Redraw the bar (terminal) or write a progress line (log file)"""
+        self.last_draw = now
+        fraction = min(self.done / self.total, 1.0) if self.total else 1.0
+        filled = int(BAR_WIDTH * fraction)
+        eta = self.eta(now)
+        line = (f"{self.phase} [{'#' * filled}{'.' * (BAR_WIDTH - filled)}] "
+                f"{self.done}/{self.total} rows {self.rate(now):,.0f} rows/s "
+                f"ETA {format_duration(eta) if eta is not None else '--:--'}")
+        if self.is_tty:
+            self.bar_stream.write(f"\r{line}\033[K")
+        else:
+            self.bar_stream.write(f"{line}\n")
+        self.bar_stream.flush()
+
+    def finish(self):
+        """Flush pending JSON rows and end the bar line"""
+        if self.log_format == 'json':
+            if self.pending:
+                self.emit_batch(time.perf_counter())
+        elif self.is_tty and self.last_draw is not None:
+            self.bar_stream.write("\n")
+            self.bar_stream.flush()
@@ -0,0 +1,152 @@
+"""create feature schema
+
+Creates the feature tables that are still missing, so `flask db upgrade`
+works on an empty database, on a database from before migrations existed
+(only s_feature_map / s_feature_label) and on one built with
+db.create_all(): the feature map and labels, the import generation and
+ledger, the branch registry and normalized branch statuses, the filter
+facets and the feature history.
+
+Revision ID: 1c5e8a2f7b90
+Revises:
+Create Date: 2026-10-18 04:05:41.208334
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1c5e8a2f7b90'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+BRANCH_COLUMNS = (
+    'ec_sonic_2111', 'ec_sonic_2211', 'ec_202211_fabric',
+    'ec_sonic_2311_x', 'ec_sonic_2311_n', 'vs_202311', 'vs_202311_fabric'
+)
+
+# Tables added after s_feature_map / s_feature_label, dropped again on downgrade
+DERIVED_TABLES = (
+    's_import_generation', 's_import_ledger', 's_branch', 's_feature_branch_status',
+    's_feature_facet', 's_feature_snapshot', 's_feature_history'
+)
+
+
+def branch_columns():
+    return [sa.Column(column_name, sa.String(50)) for column_name in BRANCH_COLUMNS]
+
+
+def upgrade():
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 's_feature_map' not in existing:
+        op.create_table(
+            's_feature_map',
+            sa.Column('feature_key', sa.String(255), primary_key=True),
+            sa.Column('category', sa.String(100)),
+            sa.Column('feature_n1', sa.Text()),
+            *branch_columns(),
+            sa.Column('ec_proprietary', sa.String(20)),
+            sa.Column('component', sa.String(100)),
+            sa.Column('created_at', sa.DateTime()),
+        )
+
+    if 's_feature_label' not in existing:
+        op.create_table(
+            's_feature_label',
+            sa.Column('feature_key', sa.String(255), sa.ForeignKey('s_feature_map.feature_key'), primary_key=True),
+            sa.Column('label', sa.String(100), primary_key=True),
+            sa.Column('created_at', sa.DateTime()),
+        )
+
+    if 's_import_generation' not in existing:
+        op.create_table(
+            's_import_generation',
+            sa.Column('name', sa.String(50), primary_key=True),
+            sa.Column('generation', sa.Integer(), nullable=False),
+            sa.Column('updated_at', sa.DateTime()),
+        )
+
+    if 's_import_ledger' not in existing:
+        op.create_table(
+            's_import_ledger',
+            sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column('name', sa.String(50), nullable=False),
+            sa.Column('file_path', sa.Text(), nullable=False),
+            sa.Column('file_size', sa.BigInteger()),
+            sa.Column('file_mtime', sa.DateTime()),
+            sa.Column('file_sha256', sa.String(64), nullable=False),
+            sa.Column('sheet_hash', sa.String(64)),
+            sa.Column('sheet_names', sa.Text()),
+            sa.Column('row_count', sa.Integer()),
+            sa.Column('duration_seconds', sa.Float()),
+            sa.Column('imported_at', sa.DateTime()),
+        )
+        op.create_index('ix_s_import_ledger_name', 's_import_ledger', ['name'])
+
+    if 's_branch' not in existing:
+        op.create_table(
+            's_branch',
+            sa.Column('branch_id', sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column('name', sa.String(50), nullable=False, unique=True),
+            sa.Column('display_name', sa.String(100)),
+            sa.Column('excel_column', sa.String(100)),
+            sa.Column('sort_order', sa.Integer()),
+            sa.Column('created_at', sa.DateTime()),
+        )
+
+    if 's_feature_branch_status' not in existing:
+        op.create_table(
+            's_feature_branch_status',
+            sa.Column('feature_key', sa.String(255), sa.ForeignKey('s_feature_map.feature_key'), primary_key=True),
+            sa.Column('branch_id', sa.Integer(), sa.ForeignKey('s_branch.branch_id'), primary_key=True),
+            sa.Column('status', sa.String(50), nullable=False),
+        )
+        op.create_index('ix_s_feature_branch_status_branch_status', 's_feature_branch_status',
+                        ['branch_id', 'status', 'feature_key'])
+        op.create_index('ix_s_feature_branch_status_status', 's_feature_branch_status',
+                        ['status', 'branch_id', 'feature_key'])
+
+    if 's_feature_facet' not in existing:
+        op.create_table(
+            's_feature_facet',
+            sa.Column('facet', sa.String(50), primary_key=True),
+            sa.Column('value', sa.String(100), primary_key=True),
+            sa.Column('feature_count', sa.Integer(), nullable=False),
+            sa.Column('created_at', sa.DateTime()),
+        )
+
+    if 's_feature_snapshot' not in existing:
+        op.create_table(
+            's_feature_snapshot',
+            sa.Column('snapshot_date', sa.Date(), primary_key=True),
+            sa.Column('file_path', sa.Text(), nullable=False),
+            sa.Column('file_sha256', sa.String(64)),
+            sa.Column('feature_count', sa.Integer()),
+            sa.Column('imported_at', sa.DateTime()),
+        )
+
+    if 's_feature_history' not in existing:
+        op.create_table(
+            's_feature_history',
+            sa.Column('feature_key', sa.String(255), primary_key=True),
+            sa.Column('valid_from', sa.Date(), primary_key=True),
+            sa.Column('valid_to', sa.Date()),
+            sa.Column('category', sa.String(100)),
+            sa.Column('feature_n1', sa.Text()),
+            *branch_columns(),
+            sa.Column('ec_proprietary', sa.String(20)),
+            sa.Column('component', sa.String(100)),
+            sa.Column('labels', sa.Text()),
+            sa.Column('content_hash', sa.String(64), nullable=False),
+        )
+        op.create_index('ix_s_feature_history_valid_from_valid_to', 's_feature_history',
+                        ['valid_from', 'valid_to'])
+
+
+def downgrade():
+    # s_feature_map / s_feature_label predate migrations and are kept
+    for table_name in reversed(DERIVED_TABLES):
+        op.drop_table(table_name, if_exists=True)
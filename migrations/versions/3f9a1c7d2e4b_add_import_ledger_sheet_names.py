@@ -0,0 +1,43 @@
+"""add import ledger sheet names
+
+Records which sheets an import read, so a file re-imported with a
+different sheet selection is not skipped as unchanged. Ledgers created by
+1c5e8a2f7b90 or db.create_all() already have the column.
+
+Revision ID: 3f9a1c7d2e4b
+Revises: 6107c2c02504
+Create Date: 2026-10-18 04:45:12.503118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9a1c7d2e4b'
+down_revision = '6107c2c02504'
+branch_labels = None
+depends_on = None
+
+
+def ledger_columns():
+    inspector = sa.inspect(op.get_bind())
+    if 's_import_ledger' not in inspector.get_table_names():
+        return None
+    return {column['name'] for column in inspector.get_columns('s_import_ledger')}
+
+
+def upgrade():
+    columns = ledger_columns()
+    if columns is None or 'sheet_names' in columns:
+        return
+    with op.batch_alter_table('s_import_ledger') as batch_op:
+        batch_op.add_column(sa.Column('sheet_names', sa.Text(), nullable=True))
+
+
+def downgrade():
+    columns = ledger_columns()
+    if columns is None or 'sheet_names' not in columns:
+        return
+    with op.batch_alter_table('s_import_ledger') as batch_op:
+        batch_op.drop_column('sheet_names')
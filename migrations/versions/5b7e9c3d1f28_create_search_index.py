@@ -0,0 +1,29 @@
+"""create search index
+
+Creates s_search_document and its text index (a generated tsvector column
+with a GIN index on PostgreSQL, an FTS5 table kept in sync by triggers on
+SQLite) with the same IF NOT EXISTS DDL the importers and db.create_all()
+run, so /search works on a freshly upgraded database.
+
+Revision ID: 5b7e9c3d1f28
+Revises: 8d2b4e6f1a37
+Create Date: 2026-10-18 10:03:26.118540
+
+"""
+from alembic import op
+import search_index
+
+
+# revision identifiers, used by Alembic.
+revision = '5b7e9c3d1f28'
+down_revision = '8d2b4e6f1a37'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    search_index.ensure_search_index(op.get_bind())
+
+
+def downgrade():
+    search_index.drop_search_index(op.get_bind())
@@ -0,0 +1,33 @@
+"""add feature filter indexes
+
+Indexes for the /feature-list filters on s_feature_map / s_feature_label:
+a label-first index on s_feature_label (the PK starts with feature_key)
+and a functional lower(ec_proprietary) index for the source filter. The
+branch and support filters are served by s_feature_branch_status.
+
+Revision ID: 6107c2c02504
+Revises: 1c5e8a2f7b90
+Create Date: 2026-10-18 04:10:02.316659
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6107c2c02504'
+down_revision = '1c5e8a2f7b90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_s_feature_label_label_feature_key', 's_feature_label',
+                    ['label', 'feature_key'], if_not_exists=True)
+    op.create_index('ix_s_feature_map_lower_ec_proprietary', 's_feature_map',
+                    [sa.text('lower(ec_proprietary)')], if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_s_feature_map_lower_ec_proprietary', table_name='s_feature_map', if_exists=True)
+    op.drop_index('ix_s_feature_label_label_feature_key', table_name='s_feature_label', if_exists=True)
@@ -0,0 +1,72 @@
+"""backfill branch statuses
+
+The branch and support filters, the branch facets and /branch-diff read
+s_feature_branch_status, which 1c5e8a2f7b90 creates empty. Registers the
+default branches in s_branch and copies each legacy branch column of
+s_feature_map into s_feature_branch_status, so an upgraded database
+answers those queries before its next import. Rows that already exist
+(db.create_all() databases that were imported into) are left alone.
+
+Revision ID: 8d2b4e6f1a37
+Revises: 3f9a1c7d2e4b
+Create Date: 2026-10-18 09:12:37.640219
+
+"""
+from datetime import datetime
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d2b4e6f1a37'
+down_revision = '3f9a1c7d2e4b'
+branch_labels = None
+depends_on = None
+
+# Branch.DEFAULT_BRANCHES at the time of this migration: (name, display_name, excel_column)
+DEFAULT_BRANCHES = (
+    ('ec_sonic_2111', 'EC 2111', 'EC_SONiC_2111'),
+    ('ec_sonic_2211', 'EC 2211', 'EC_SONiC_2211'),
+    ('ec_202211_fabric', 'EC 202211 Fabric', 'EC_202211_Fabric'),
+    ('ec_sonic_2311_x', 'EC 2311-X', 'EC SONiC 2311.X'),
+    ('ec_sonic_2311_n', 'EC 2311-N', 'EC SONiC 2311.N'),
+    ('vs_202311', 'VS 202311', 'VS_202311'),
+    ('vs_202311_fabric', 'VS 202311 Fabric', 'VS_202311_Fabric'),
+)
+
+branch_table = sa.table(
+    's_branch',
+    sa.column('name', sa.String),
+    sa.column('display_name', sa.String),
+    sa.column('excel_column', sa.String),
+    sa.column('sort_order', sa.Integer),
+    sa.column('created_at', sa.DateTime),
+)
+
+
+def upgrade():
+    bind = op.get_bind()
+    registered = {name for (name,) in bind.execute(sa.select(branch_table.c.name))}
+    now = datetime.utcnow()
+    missing = [{'name': name, 'display_name': display_name, 'excel_column': excel_column,
+                'sort_order': sort_order, 'created_at': now}
+               for sort_order, (name, display_name, excel_column) in enumerate(DEFAULT_BRANCHES)
+               if name not in registered]
+    if missing:
+        op.bulk_insert(branch_table, missing)
+
+    # One INSERT ... SELECT per legacy branch column
+    for name, _, _ in DEFAULT_BRANCHES:
+        bind.execute(sa.text(
+            f"INSERT INTO s_feature_branch_status (feature_key, branch_id, status) "
+            f"SELECT m.feature_key, b.branch_id, m.{name} "
+            f"FROM s_feature_map m JOIN s_branch b ON b.name = :name "
+            f"WHERE m.{name} IS NOT NULL AND NOT EXISTS ("
+            f"SELECT 1 FROM s_feature_branch_status s "
+            f"WHERE s.feature_key = m.feature_key AND s.branch_id = b.branch_id)"
+        ), {'name': name})
+
+
+def downgrade():
+    # The backfilled rows are ordinary data; 1c5e8a2f7b90 drops the tables
+    pass
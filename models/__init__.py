@@ -1,3 +1,13 @@
+import search_index
+from .base import db
 from .sonic_feature import FeatureMap, FeatureLabel
+from .branch import Branch, FeatureBranchStatus
+from .feature_facet import FeatureFacet
+from .feature_history import FeatureSnapshot, FeatureHistory
+from .import_state import ImportGeneration, ImportLedger
 
-__all__ = ['FeatureMap', 'FeatureLabel']
\ No newline at end of file
+__all__ = ['FeatureMap', 'FeatureLabel', 'Branch', 'FeatureBranchStatus', 'FeatureFacet',
+           'FeatureSnapshot', 'FeatureHistory', 'ImportGeneration', 'ImportLedger']
+
+# db.create_all() / drop_all() also create / drop the full-text search index
+search_index.register_with(db.metadata)
@@ -0,0 +1,173 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, delete, insert, literal, select
+from sqlalchemy.orm import relationship
+from .base import db
+from .sonic_feature import FeatureMap
+
+
+class Branch(db.Model):
+    """Branch registry - one row per SONiC branch tracked in the feature matrix
+    
+    The default branches mirror FeatureMap columns. Any other registered
+    branch with an excel_column is read from that sheet column by the
+    feature importer and stored only in s_feature_branch_status; the
+    /feature-list branch and support filters and the facets cover both.
+    """
+    __tablename__ = 's_branch'
+    
+    branch_id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String(50), unique=True, nullable=False)  # e.g. 'ec_sonic_2111'
+    display_name = Column(String(100))  # e.g. 'EC 2111'
+    excel_column = Column(String(100))  # header in the feature_map sheet
+    sort_order = Column(Integer, default=0)
+    
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Relationship to per-feature statuses
+    statuses = relationship("FeatureBranchStatus", back_populates="branch", cascade="all, delete-orphan")
+    
+    # Branches backed by a FeatureMap column: (name, display_name, excel_column)
+    DEFAULT_BRANCHES = (
+        ('ec_sonic_2111', 'EC 2111', 'EC_SONiC_2111'),
+        ('ec_sonic_2211', 'EC 2211', 'EC_SONiC_2211'),
+        ('ec_202211_fabric', 'EC 202211 Fabric', 'EC_202211_Fabric'),
+        ('ec_sonic_2311_x', 'EC 2311-X', 'EC SONiC 2311.X'),
+        ('ec_sonic_2311_n', 'EC 2311-N', 'EC SONiC 2311.N'),
+        ('vs_202311', 'VS 202311', 'VS_202311'),
+        ('vs_202311_fabric', 'VS 202311 Fabric', 'VS_202311_Fabric'),
+    )
+    
+    # Column-backed branches left out of the "any branch has status X" filter
+    SUPPORT_FILTER_EXCLUDED = tuple(name for name in FeatureMap.BRANCH_COLUMNS
+                                    if name not in FeatureMap.SUPPORT_FILTER_COLUMNS)
+    
+    def __repr__(self):
+        return f"<Branch {self.name}>"
+    
+    @classmethod
+    def ensure_defaults(cls):
+        """Register any missing default branches (caller commits)"""
+        existing = {name for (name,) in db.session.query(cls.name).all()}
+        added = 0
+        for sort_order, (name, display_name, excel_column) in enumerate(cls.DEFAULT_BRANCHES):
+            if name not in existing:
+                db.session.add(cls(name=name, display_name=display_name,
+                                   excel_column=excel_column, sort_order=sort_order))
+                added += 1
+        return added
+    
+    @classmethod
+    def filter_branches(cls):
+        """Branches offered by the branch filter and matched by the support filter"""
+        return cls.query.filter(cls.name.notin_(cls.SUPPORT_FILTER_EXCLUDED)) \
+                        .order_by(cls.sort_order, cls.name).all()
+    
+    @classmethod
+    def sheet_branches(cls):
+        """Registered branches without a FeatureMap column, read from their excel_column"""
+        return cls.query.filter(cls.name.notin_(FeatureMap.BRANCH_COLUMNS), cls.excel_column.isnot(None)) \
+                        .order_by(cls.sort_order, cls.name).all()
+    
+    def to_dict(self):
+        """Convert to dictionary for API responses"""
+        return {
+            'branch_id': self.branch_id,
+            'name': self.name,
+            'display_name': self.display_name,
+            'excel_column': self.excel_column,
+            'sort_order': self.sort_order
+        }
+
+
+class FeatureBranchStatus(db.Model):
+    """Normalized (feature_key, branch_id, status) support matrix
+    
+    Mirrors the wide branch columns of s_feature_map so that "branch Y has
+    status X" and "any branch has status X" are index lookups. Branches
+    without a FeatureMap column (new releases) live only here, filled from
+    their Branch.excel_column by the feature importer.
+    """
+    __tablename__ = 's_feature_branch_status'
+    __table_args__ = (
+        Index('ix_s_feature_branch_status_branch_status', 'branch_id', 'status', 'feature_key'),
+        Index('ix_s_feature_branch_status_status', 'status', 'branch_id', 'feature_key'),
+    )
+    
+    feature_key = Column(String(255), ForeignKey('s_feature_map.feature_key'), primary_key=True)
+    branch_id = Column(Integer, ForeignKey('s_branch.branch_id'), primary_key=True)
+    status = Column(String(50), nullable=False)
+    
+    # Features per DELETE / INSERT ... SELECT when rebuilding only some keys
+    REBUILD_BATCH_SIZE = 500
+    
+    # Relationships
+    feature = relationship("FeatureMap", back_populates="branch_statuses")
+    branch = relationship("Branch", back_populates="statuses")
+    
+    def __repr__(self):
+        return f"<FeatureBranchStatus {self.feature_key}:{self.branch_id}={self.status}>"
+    
+    @classmethod
+    def rebuild(cls, feature_table=None, status_table=None, sheet_statuses=None, feature_keys=None):
+        """Re-derive rows for column-backed branches from s_feature_map
+        
+        Uses one INSERT ... SELECT per branch inside the caller's
+        transaction. sheet_statuses ({branch_id: [(feature_key, status)]},
+        read by the importer for registry-only branches) replaces the rows
+        of those branches; other registry-only branches are left untouched.
+        feature_keys limits the rewrite to those features (incremental
+        imports); by default every feature is rebuilt.
+        feature_table / status_table default to the live tables (the
+        shadow-table import passes its staging copies).
+        Returns the number of rows written.
+        """
+        feature_table = FeatureMap.__table__ if feature_table is None else feature_table
+        status_table = cls.__table__ if status_table is None else status_table
+        sheet_statuses = sheet_statuses or {}
+        
+        branches = Branch.query.filter(Branch.name.in_(FeatureMap.BRANCH_COLUMNS)).all()
+        branch_ids = [branch.branch_id for branch in branches] + list(sheet_statuses)
+        if feature_keys is None:
+            key_batches = [None]
+        else:
+            feature_keys = list(feature_keys)
+            key_batches = [feature_keys[start:start + cls.REBUILD_BATCH_SIZE]
+                           for start in range(0, len(feature_keys), cls.REBUILD_BATCH_SIZE)]
+        
+        written = 0
+        for keys in key_batches:
+            stale = delete(status_table).where(status_table.c.branch_id.in_(branch_ids))
+            if keys is not None:
+                stale = stale.where(status_table.c.feature_key.in_(keys))
+            if branch_ids:
+                db.session.execute(stale)
+            
+            for branch in branches:
+                column = feature_table.c[branch.name]
+                rows = select(feature_table.c.feature_key, literal(branch.branch_id), column) \
+                    .where(column.isnot(None))
+                if keys is not None:
+                    rows = rows.where(feature_table.c.feature_key.in_(keys))
+                result = db.session.execute(
+                    insert(status_table).from_select(['feature_key', 'branch_id', 'status'], rows)
+                )
+                written += max(result.rowcount or 0, 0)
+            
+            wanted = None if keys is None else set(keys)
+            sheet_rows = [{'feature_key': feature_key, 'branch_id': branch_id, 'status': status}
+                          for branch_id, statuses in sheet_statuses.items()
+                          for feature_key, status in statuses
+                          if wanted is None or feature_key in wanted]
+            if sheet_rows:
+                db.session.execute(insert(status_table), sheet_rows)
+            written += len(sheet_rows)
+        return written
+    
+    def to_dict(self):
+        """Convert to dictionary for API responses"""
+        return {
+            'feature_key': self.feature_key,
+            'branch_id': self.branch_id,
+            'status': self.status
+        }
@@ -0,0 +1,106 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, func, select, union
+from .base import db
+from .sonic_feature import FeatureMap, FeatureLabel
+from .branch import Branch, FeatureBranchStatus
+
+
+class FeatureFacet(db.Model):
+    """Precomputed feature counts for the /feature-list filter bar
+    
+    Rebuilt by the feature importer in the same transaction as the data (after
+    s_feature_branch_status), so the filter bar never has to scan
+    s_feature_label or s_feature_map.
+    
+    facet values:
+        'label'           - value is a label
+        'branch:<name>'   - value is a support status on that registered branch
+        'support'         - value is a status found on any support filter branch
+                            or in ec_proprietary
+        'source'          - value is upper(ec_proprietary)
+    """
+    __tablename__ = 's_feature_facet'
+    
+    facet = Column(String(50), primary_key=True)
+    value = Column(String(100), primary_key=True)
+    feature_count = Column(Integer, nullable=False, default=0)
+    
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    LABEL = 'label'
+    SUPPORT = 'support'
+    SOURCE = 'source'
+    
+    def __repr__(self):
+        return f"<FeatureFacet {self.facet}:{self.value}={self.feature_count}>"
+    
+    @staticmethod
+    def branch_facet(branch_name):
+        """Facet name for the status counts of one branch"""
+        return f"branch:{branch_name}"
+    
+    @classmethod
+    def rebuild(cls):
+        """Recompute every facet from s_feature_map / s_feature_label / s_feature_branch_status
+        
+        Runs inside the caller's transaction; returns the number of facet rows.
+        """
+        db.session.query(cls).delete()
+        
+        rows = []
+        
+        # Label -> number of features carrying it
+        label_counts = db.session.query(FeatureLabel.label, func.count(func.distinct(FeatureLabel.feature_key))) \
+                                 .group_by(FeatureLabel.label).all()
+        rows.extend((cls.LABEL, label, count) for label, count in label_counts)
+        
+        # Per-branch status counts, for column-backed and registry-only branches alike
+        status_counts = db.session.query(Branch.name, FeatureBranchStatus.status, func.count()) \
+                                  .join(FeatureBranchStatus, FeatureBranchStatus.branch_id == Branch.branch_id) \
+                                  .group_by(Branch.name, FeatureBranchStatus.status).all()
+        rows.extend((cls.branch_facet(name), status, count) for name, status, count in status_counts)
+        
+        # Features where any support filter branch (or ec_proprietary) has a
+        # given status - the same rows the support filter matches
+        status_pairs = union(
+            select(FeatureBranchStatus.feature_key, FeatureBranchStatus.status)
+            .join(Branch, Branch.branch_id == FeatureBranchStatus.branch_id)
+            .where(Branch.name.notin_(Branch.SUPPORT_FILTER_EXCLUDED)),
+            select(FeatureMap.feature_key, FeatureMap.ec_proprietary.label('status'))
+            .where(FeatureMap.ec_proprietary.isnot(None))
+        ).subquery()
+        support_counts = db.session.execute(
+            select(status_pairs.c.status, func.count()).group_by(status_pairs.c.status)
+        ).all()
+        rows.extend((cls.SUPPORT, status, count) for status, count in support_counts)
+        
+        # Source (ec_proprietary) counts, matched case-insensitively like the filter
+        source = func.upper(FeatureMap.ec_proprietary)
+        source_counts = db.session.query(source, func.count()) \
+                                  .filter(FeatureMap.ec_proprietary.isnot(None)) \
+                                  .group_by(source).all()
+        rows.extend((cls.SOURCE, value, count) for value, count in source_counts)
+        
+        db.session.add_all([
+            cls(facet=facet, value=value, feature_count=count)
+            for facet, value, count in rows
+        ])
+        return len(rows)
+    
+    @classmethod
+    def load(cls):
+        """Return {facet: {value: feature_count}} for every stored facet"""
+        facets = {}
+        for row in db.session.query(cls.facet, cls.value, cls.feature_count) \
+                             .order_by(cls.facet, cls.value).all():
+            facets.setdefault(row.facet, {})[row.value] = row.feature_count
+        return facets
+    
+    def to_dict(self):
+        """Convert to dictionary for API responses"""
+        return {
+            'facet': self.facet,
+            'value': self.value,
+            'feature_count': self.feature_count
+        }
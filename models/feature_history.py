@@ -0,0 +1,96 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Date, DateTime, Text, Index, case, func
+from .base import db
+from .sonic_feature import FeatureMap
+
+
+class FeatureSnapshot(db.Model):
+    """Dated EC SONiC Feature files loaded into the feature history"""
+    __tablename__ = 's_feature_snapshot'
+
+    snapshot_date = Column(Date, primary_key=True)
+    file_path = Column(Text, nullable=False)
+    file_sha256 = Column(String(64))
+    feature_count = Column(Integer)
+
+    # Timestamps
+    imported_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<FeatureSnapshot {self.snapshot_date}>"
+
+    def to_dict(self):
+        """Convert to dictionary for API responses"""
+        return {
+            'snapshot_date': self.snapshot_date.isoformat() if self.snapshot_date else None,
+            'file_path': self.file_path,
+            'file_sha256': self.file_sha256,
+            'feature_count': self.feature_count,
+            'imported_at': self.imported_at.isoformat() if self.imported_at else None
+        }
+
+
+class FeatureHistory(db.Model):
+    """Versioned feature rows across snapshots
+
+    A row is valid from the snapshot where it first appeared with this
+    content until valid_to (exclusive; NULL while still current), so an
+    unchanged feature is stored once however many snapshots contain it.
+    """
+    __tablename__ = 's_feature_history'
+    __table_args__ = (
+        # "What did the matrix look like on date D" scans by validity range
+        Index('ix_s_feature_history_valid_from_valid_to', 'valid_from', 'valid_to'),
+    )
+
+    feature_key = Column(String(255), primary_key=True)
+    valid_from = Column(Date, primary_key=True)
+    valid_to = Column(Date)
+
+    category = Column(String(100))
+    feature_n1 = Column(Text)
+
+    # Branch support status columns (same as FeatureMap)
+    ec_sonic_2111 = Column(String(50))
+    ec_sonic_2211 = Column(String(50))
+    ec_202211_fabric = Column(String(50))
+    ec_sonic_2311_x = Column(String(50))
+    ec_sonic_2311_n = Column(String(50))
+    vs_202311 = Column(String(50))
+    vs_202311_fabric = Column(String(50))
+
+    ec_proprietary = Column(String(20))
+    component = Column(String(100))
+    labels = Column(Text)  # sorted, comma-separated
+    content_hash = Column(String(64), nullable=False)
+
+    def __repr__(self):
+        return f"<FeatureHistory {self.feature_key}@{self.valid_from}>"
+
+    @classmethod
+    def first_status_dates(cls, feature_key, status='Support'):
+        """Earliest valid_from per branch column where the feature had status
+
+        One query over the (feature_key, valid_from) primary key; returns
+        {branch column: date or None}.
+        """
+        columns = [
+            func.min(case((getattr(cls, column_name) == status, cls.valid_from))).label(column_name)
+            for column_name in FeatureMap.BRANCH_COLUMNS
+        ]
+        row = db.session.query(*columns).filter(cls.feature_key == feature_key).one()
+        return dict(row._mapping)
+
+    def to_dict(self):
+        """Convert to dictionary for API responses"""
+        return {
+            'feature_key': self.feature_key,
+            'valid_from': self.valid_from.isoformat() if self.valid_from else None,
+            'valid_to': self.valid_to.isoformat() if self.valid_to else None,
+            'category': self.category,
+            'feature_description': self.feature_n1,
+            'branches': {column_name: getattr(self, column_name) for column_name in FeatureMap.BRANCH_COLUMNS},
+            'ec_proprietary': self.ec_proprietary,
+            'component': self.component,
+            'labels': self.labels.split(', ') if self.labels else []
+        }
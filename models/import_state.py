@@ -0,0 +1,92 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, BigInteger, Float, String, Text, DateTime
+from .base import db
+
+
+class ImportGeneration(db.Model):
+    """Import generation counters - bumped whenever an importer commits new data"""
+    __tablename__ = 's_import_generation'
+    
+    name = Column(String(50), primary_key=True)  # e.g. 'features'
+    generation = Column(Integer, nullable=False, default=0)
+    
+    # Timestamps
+    updated_at = Column(DateTime, default=datetime.utcnow)
+    
+    FEATURES = 'features'
+    
+    def __repr__(self):
+        return f"<ImportGeneration {self.name}={self.generation}>"
+    
+    @classmethod
+    def current(cls, name):
+        """Return the current generation for name (0 if never imported)"""
+        row = db.session.get(cls, name)
+        return row.generation if row else 0
+    
+    @classmethod
+    def bump(cls, name):
+        """Increment the generation for name in the current transaction"""
+        row = db.session.query(cls).filter_by(name=name).with_for_update().first()
+        if row is None:
+            row = cls(name=name, generation=0)
+            db.session.add(row)
+        row.generation += 1
+        row.updated_at = datetime.utcnow()
+        return row.generation
+    
+    def to_dict(self):
+        """Convert to dictionary for API responses"""
+        return {
+            'name': self.name,
+            'generation': self.generation,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+
+
+class ImportLedger(db.Model):
+    """Import ledger - one row per committed import with its source fingerprint"""
+    __tablename__ = 's_import_ledger'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String(50), nullable=False, index=True)  # same names as ImportGeneration
+    
+    # Source file fingerprint
+    file_path = Column(Text, nullable=False)
+    file_size = Column(BigInteger)
+    file_mtime = Column(DateTime)
+    file_sha256 = Column(String(64), nullable=False)
+    sheet_hash = Column(String(64))  # hash of the parsed sheet contents
+    sheet_names = Column(Text)  # comma-separated sheets imported (NULL: feature_map only)
+    
+    # Import result
+    row_count = Column(Integer)
+    duration_seconds = Column(Float)
+    
+    # Timestamps
+    imported_at = Column(DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<ImportLedger {self.name}#{self.id} {self.file_path}>"
+    
+    @classmethod
+    def latest(cls, name):
+        """Most recent ledger entry for name (None if never imported)"""
+        return cls.query.filter_by(name=name).order_by(cls.id.desc()).first()
+    
+    def to_dict(self):
+        """Convert to dictionary for API responses"""
+        return {
+            'id': self.id,
+            'name': self.name,
+            'file_path': self.file_path,
+            'file_size': self.file_size,
+            'file_mtime': self.file_mtime.isoformat() if self.file_mtime else None,
+            'file_sha256': self.file_sha256,
+            'sheet_hash': self.sheet_hash,
+            'sheet_names': self.sheet_names,
+            'row_count': self.row_count,
+            'duration_seconds': self.duration_seconds,
+            'imported_at': self.imported_at.isoformat() if self.imported_at else None
+        }
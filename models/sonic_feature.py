@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Index, func
 from sqlalchemy.orm import relationship
 from .base import db
 
@@ -8,6 +8,18 @@ class FeatureMap(db.Model):
     """EC SONiC Feature Map - stores feature support across different branches"""
     __tablename__ = 's_feature_map'
     
+    # Branch support status columns, in display order
+    BRANCH_COLUMNS = (
+        'ec_sonic_2111', 'ec_sonic_2211', 'ec_202211_fabric',
+        'ec_sonic_2311_x', 'ec_sonic_2311_n', 'vs_202311', 'vs_202311_fabric'
+    )
+    
+    # Columns checked by the "any branch has status X" filter
+    SUPPORT_FILTER_COLUMNS = (
+        'ec_sonic_2111', 'ec_sonic_2211', 'ec_sonic_2311_x',
+        'ec_sonic_2311_n', 'vs_202311', 'ec_proprietary'
+    )
+    
     feature_key = Column(String(255), primary_key=True)
     category = Column(String(100))
     feature_n1 = Column(Text)  # Feature description
@@ -31,6 +43,9 @@ class FeatureMap(db.Model):
     # Relationship to labels
     labels = relationship("FeatureLabel", back_populates="feature", cascade="all, delete-orphan")
     
+    # Normalized copy of the branch columns (see FeatureBranchStatus)
+    branch_statuses = relationship("FeatureBranchStatus", back_populates="feature", cascade="all, delete-orphan")
+    
     def __repr__(self):
         return f"<FeatureMap {self.feature_key}>"
     
@@ -59,6 +74,10 @@ class FeatureMap(db.Model):
 class FeatureLabel(db.Model):
     """Feature Labels - many-to-many relationship with features"""
     __tablename__ = 's_feature_label'
+    __table_args__ = (
+        # The PK is (feature_key, label); the label filter needs label first
+        Index('ix_s_feature_label_label_feature_key', 'label', 'feature_key'),
+    )
     
     feature_key = Column(String(255), ForeignKey('s_feature_map.feature_key'), primary_key=True)
     label = Column(String(100), primary_key=True)
@@ -80,4 +99,8 @@ class FeatureLabel(db.Model):
             'feature_key': self.feature_key,
             'label': self.label,
             'created_at': self.created_at.isoformat() if self.created_at else None
-        }
\ No newline at end of file
+        }
+
+
+# Case-insensitive source filter (lower(ec_proprietary) = 'community' / 'ec')
+Index('ix_s_feature_map_lower_ec_proprietary', func.lower(FeatureMap.ec_proprietary))
@@ -1,10 +1,262 @@
 """
 SQLAlchemy-based routes for feature management
 """
-from flask import request, render_template
-from sqlalchemy import and_, or_
+import base64
+import binascii
+import hashlib
+import json
+import re
+from flask import Response, jsonify, request, render_template, stream_with_context, url_for
+from markupsafe import Markup, escape
+from sqlalchemy import and_, or_, func, select
+from sqlalchemy.orm import aliased, selectinload
 from models.base import db
-from models import FeatureMap, FeatureLabel
+from models import (
+    FeatureMap, FeatureLabel, Branch, FeatureBranchStatus, FeatureFacet, FeatureSnapshot, FeatureHistory,
+    ImportGeneration
+)
+from feature_cache import get_feature_cache
+import search_index
+
+# Keyset pagination settings for the feature matrix
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+# Rows fetched per round trip when streaming /api/features
+API_STREAM_BATCH_SIZE = 500
+
+# Results per page for full-text search
+SEARCH_PAGE_SIZE = 20
+
+
+def encode_cursor(feature_key):
+    """Encode a feature_key into an opaque URL-safe pagination cursor"""
+    return base64.urlsafe_b64encode(feature_key.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decode a pagination cursor back into a feature_key (None if invalid)"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        return base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8')
+    except (binascii.Error, UnicodeError, ValueError):
+        return None
+
+
+def get_page_size(value):
+    """Parse the page_size query parameter and clamp it to the allowed range"""
+    try:
+        page_size = int(value)
+    except (TypeError, ValueError):
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(page_size, MAX_PAGE_SIZE))
+
+
+def apply_feature_filters(query, label_filter='', branch_filter='', support_filter='', source_filter=''):
+    """Apply the feature matrix filters (label/branch/support/source) to a FeatureMap query"""
+    # Apply label filter
+    if label_filter:
+        query = query.join(FeatureLabel).filter(FeatureLabel.label == label_filter)
+    
+    # Apply source filter (lower() matches the functional index)
+    if source_filter:
+        if source_filter == 'community':
+            query = query.filter(func.lower(FeatureMap.ec_proprietary) == 'community')
+        elif source_filter == 'edgecore':
+            query = query.filter(func.lower(FeatureMap.ec_proprietary) == 'ec')
+    
+    # Apply branch filter (specific branch must have 'Support' status),
+    # served by the (branch_id, status) index on s_feature_branch_status
+    if branch_filter:
+        supported = select(FeatureBranchStatus.feature_key) \
+            .join(Branch, Branch.branch_id == FeatureBranchStatus.branch_id) \
+            .where(Branch.name == branch_filter, FeatureBranchStatus.status == 'Support')
+        query = query.filter(FeatureMap.feature_key.in_(supported))
+    
+    # Apply support status filter (any registered branch but the fabric
+    # builds has this status), served by the (status, branch_id) index
+    if support_filter:
+        with_status = select(FeatureBranchStatus.feature_key) \
+            .join(Branch, Branch.branch_id == FeatureBranchStatus.branch_id) \
+            .where(FeatureBranchStatus.status == support_filter,
+                   Branch.name.notin_(Branch.SUPPORT_FILTER_EXCLUDED))
+        branch_conditions = [
+            FeatureMap.feature_key.in_(with_status),
+            FeatureMap.ec_proprietary == support_filter
+        ]
+        query = query.filter(or_(*branch_conditions))
+    
+    return query
+
+
+def paginate_features(query, page_size, after_key=None, before_key=None):
+    """Fetch one keyset page of features ordered by feature_key
+    
+    Returns (features, has_prev, has_next). Only page_size + 1 rows are
+    read from the database to detect whether another page exists.
+    """
+    if before_key is not None:
+        # Walk backwards from the cursor, then restore ascending order
+        rows = query.filter(FeatureMap.feature_key < before_key) \
+                    .order_by(FeatureMap.feature_key.desc()) \
+                    .limit(page_size + 1).all()
+        has_prev = len(rows) > page_size
+        features = list(reversed(rows[:page_size]))
+        return features, has_prev, True
+    
+    if after_key is not None:
+        query = query.filter(FeatureMap.feature_key > after_key)
+    
+    rows = query.order_by(FeatureMap.feature_key).limit(page_size + 1).all()
+    has_next = len(rows) > page_size
+    return rows[:page_size], after_key is not None, has_next
+
+
+def load_feature_labels(feature_keys):
+    """Load labels for many features in a single IN query
+    
+    Reading feature.labels would lazy-load s_feature_label once per feature;
+    this returns {feature_key: [label, ...]} for the given keys instead.
+    """
+    labels_by_key = {}
+    if not feature_keys:
+        return labels_by_key
+    
+    rows = db.session.query(FeatureLabel.feature_key, FeatureLabel.label) \
+                     .filter(FeatureLabel.feature_key.in_(feature_keys)) \
+                     .order_by(FeatureLabel.feature_key, FeatureLabel.label).all()
+    for feature_key, label in rows:
+        labels_by_key.setdefault(feature_key, []).append(label)
+    return labels_by_key
+
+
+def normalize_filters(label_filter='', branch_filter='', support_filter='', source_filter=''):
+    """Normalize raw filter parameters into a hashable (label, branch, support, source) tuple
+    
+    Unknown sources are dropped, since apply_feature_filters ignores them
+    anyway; equivalent requests therefore share a cache entry. Branch names
+    are looked up in the s_branch registry, so only their shape is checked.
+    """
+    label_filter = (label_filter or '').strip()
+    branch_filter = (branch_filter or '').strip()
+    support_filter = (support_filter or '').strip()
+    source_filter = (source_filter or '').strip().lower()
+    
+    if not re.fullmatch(r'\w+', branch_filter):
+        branch_filter = ''
+    if source_filter not in ('community', 'edgecore'):
+        source_filter = ''
+    
+    return label_filter, branch_filter, support_filter, source_filter
+
+
+def get_filter_facets():
+    """Return {facet: {value: count}} for the filter bar
+    
+    Served from the s_feature_facet table written by the importer. If it
+    has not been populated yet, fall back to the distinct label list
+    (without counts) so the dropdown still works.
+    """
+    try:
+        facets = FeatureFacet.load()
+    except Exception:
+        db.session.rollback()
+        facets = {}
+    
+    if not facets.get(FeatureFacet.LABEL):
+        all_labels = db.session.query(FeatureLabel.label).distinct().order_by(FeatureLabel.label).all()
+        facets[FeatureFacet.LABEL] = {label[0]: None for label in all_labels}
+    
+    return facets
+
+
+def get_filter_branches():
+    """Return [{name, display_name}] for the branch filter dropdown
+    
+    Read from the s_branch registry, so newly registered branches show up
+    after their first import; falls back to the default branches before
+    the registry exists.
+    """
+    try:
+        branches = [{'name': branch.name, 'display_name': branch.display_name or branch.name}
+                    for branch in Branch.filter_branches()]
+    except Exception:
+        db.session.rollback()
+        branches = []
+    
+    if not branches:
+        branches = [{'name': name, 'display_name': display_name}
+                    for name, display_name, _ in Branch.DEFAULT_BRANCHES
+                    if name not in Branch.SUPPORT_FILTER_EXCLUDED]
+    return branches
+
+
+def load_feature_page(filters, page_size, after_key=None, before_key=None):
+    """Run the filtered matrix query for one page and return template-ready data"""
+    query = apply_feature_filters(FeatureMap.query, *filters)
+    
+    # Total matches come from a COUNT instead of loading every row
+    total_count = query.order_by(None).count()
+    
+    # Execute query and get one page of features
+    features, has_prev, has_next = paginate_features(query, page_size, after_key, before_key)
+    
+    # Load labels for the whole page with one batched query
+    labels_by_key = load_feature_labels([feature.feature_key for feature in features])
+    
+    # Convert features to format expected by template
+    features_data = []
+    for feature in features:
+        feature_dict = {
+            'feature_key': feature.feature_key,
+            'feature_description': feature.feature_n1,
+            'labels': labels_by_key.get(feature.feature_key, []),
+            'branches': {
+                'ec_sonic_2111': feature.ec_sonic_2111,
+                'ec_sonic_2211': feature.ec_sonic_2211,
+                'ec_sonic_2311_x': feature.ec_sonic_2311_x,
+                'ec_sonic_2311_n': feature.ec_sonic_2311_n,
+                'vs_202311': feature.vs_202311,
+                'ec_proprietary': feature.ec_proprietary
+            }
+        }
+        features_data.append(feature_dict)
+    
+    return {
+        'features': features_data,
+        'total': total_count,
+        'has_prev': has_prev,
+        'has_next': has_next
+    }
+
+
+def get_cache_generation():
+    """Return the current feature import generation (None if it can't be read)"""
+    try:
+        return ImportGeneration.current(ImportGeneration.FEATURES)
+    except Exception:
+        # Table not created yet - serve uncached rather than fail the page
+        db.session.rollback()
+        return None
+
+
+def get_synced_cache(app_config):
+    """Return the feature cache after dropping entries from older imports
+    
+    None when caching is disabled or the generation can't be read.
+    """
+    cache = get_feature_cache(app_config)
+    if cache is None:
+        return None
+    
+    generation = get_cache_generation()
+    if generation is None:
+        return None
+    
+    cache.sync_generation(generation)
+    return cache
 
 
 def feature_list_sqlalchemy(app_config):
@@ -15,79 +267,395 @@ def feature_list_sqlalchemy(app_config):
     support_filter = request.args.get('support', '')
     source_filter = request.args.get('source', '')  # community or edgecore
     
+    # Get pagination parameters
+    page_size = get_page_size(request.args.get('page_size'))
+    after_key = decode_cursor(request.args.get('after'))
+    before_key = decode_cursor(request.args.get('before'))
+    
+    current_filters = {
+        'label': label_filter,
+        'branch': branch_filter,
+        'support': support_filter,
+        'source': source_filter
+    }
+    filters = normalize_filters(label_filter, branch_filter, support_filter, source_filter)
+    
     try:
-        # Start with base query
-        query = FeatureMap.query
+        # Serve from the in-process cache unless an import happened since
+        cache = get_synced_cache(app_config)
         
-        # Apply label filter
-        if label_filter:
-            query = query.join(FeatureLabel).filter(FeatureLabel.label == label_filter)
+        page_key = ('page', filters, page_size, after_key, before_key)
+        page = cache.get(page_key) if cache else None
+        if page is None:
+            page = load_feature_page(filters, page_size, after_key, before_key)
+            if cache:
+                cache.set(page_key, page)
         
-        # Apply source filter
-        if source_filter:
-            if source_filter == 'community':
-                query = query.filter(FeatureMap.ec_proprietary.ilike('COMMUNITY'))
-            elif source_filter == 'edgecore':
-                query = query.filter(FeatureMap.ec_proprietary.ilike('EC'))
+        # Get labels and counts for the filter bar
+        facets = cache.get(('facets',)) if cache else None
+        if facets is None:
+            facets = get_filter_facets()
+            if cache:
+                cache.set(('facets',), facets)
         
-        # Apply branch filter (specific branch must have 'Support' status)
-        if branch_filter:
-            branch_column = getattr(FeatureMap, branch_filter, None)
-            if branch_column:
-                query = query.filter(branch_column == 'Support')
+        filter_branches = cache.get(('branches',)) if cache else None
+        if filter_branches is None:
+            filter_branches = get_filter_branches()
+            if cache:
+                cache.set(('branches',), filter_branches)
         
-        # Apply support status filter (any branch has this status)
-        if support_filter:
-            branch_conditions = [
-                FeatureMap.ec_sonic_2111 == support_filter,
-                FeatureMap.ec_sonic_2211 == support_filter,
-                FeatureMap.ec_sonic_2311_x == support_filter,
-                FeatureMap.ec_sonic_2311_n == support_filter,
-                FeatureMap.vs_202311 == support_filter,
-                FeatureMap.ec_proprietary == support_filter
-            ]
-            query = query.filter(or_(*branch_conditions))
+        features_data = page['features']
         
-        # Execute query and get features
-        features = query.order_by(FeatureMap.feature_key).all()
+        # Build prev/next links that keep the active filters
+        link_args = {key: value for key, value in current_filters.items() if value}
+        if page_size != DEFAULT_PAGE_SIZE:
+            link_args['page_size'] = page_size
         
-        # Get all labels for filter dropdown
-        all_labels = db.session.query(FeatureLabel.label).distinct().order_by(FeatureLabel.label).all()
-        all_labels = [label[0] for label in all_labels]
-        
-        # Convert features to format expected by template
-        features_data = []
-        for feature in features:
-            feature_dict = {
-                'feature_key': feature.feature_key,
-                'feature_description': feature.feature_n1,
-                'labels': [label.label for label in feature.labels],
-                'branches': {
-                    'ec_sonic_2111': feature.ec_sonic_2111,
-                    'ec_sonic_2211': feature.ec_sonic_2211,
-                    'ec_sonic_2311_x': feature.ec_sonic_2311_x,
-                    'ec_sonic_2311_n': feature.ec_sonic_2311_n,
-                    'vs_202311': feature.vs_202311,
-                    'ec_proprietary': feature.ec_proprietary
-                }
-            }
-            features_data.append(feature_dict)
+        pagination = {
+            'total': page['total'],
+            'page_size': page_size,
+            'prev_url': None,
+            'next_url': None
+        }
+        if features_data and page['has_prev']:
+            pagination['prev_url'] = url_for(request.endpoint, before=encode_cursor(features_data[0]['feature_key']), **link_args)
+        if features_data and page['has_next']:
+            pagination['next_url'] = url_for(request.endpoint, after=encode_cursor(features_data[-1]['feature_key']), **link_args)
         
         return render_template('feature_list.html', 
                              features=features_data,
-                             all_labels=all_labels,
-                             current_filters={
-                                 'label': label_filter,
-                                 'branch': branch_filter,
-                                 'support': support_filter,
-                                 'source': source_filter
-                             },
+                             all_labels=facets[FeatureFacet.LABEL],
+                             facets=facets,
+                             filter_branches=filter_branches,
+                             current_filters=current_filters,
+                             pagination=pagination,
                              config=app_config)
                              
     except Exception as e:
         return render_template('feature_list.html', 
                              features=[],
-                             all_labels=[],
+                             all_labels={},
+                             facets={},
+                             filter_branches=[],
                              current_filters={},
+                             pagination=None,
                              error=str(e),
-                             config=app_config)
\ No newline at end of file
+                             config=app_config)
+
+
+def get_import_state():
+    """Return the feature import generation row (None before the first import)
+    
+    Every import path - full, incremental, swap and history - bumps it,
+    including runs that only update or delete rows.
+    """
+    return db.session.get(ImportGeneration, ImportGeneration.FEATURES)
+
+
+def feature_api_sqlalchemy():
+    """Stream the feature matrix as NDJSON (one FeatureMap.to_dict() per line)
+    
+    Accepts the same label/branch/support/source filters as /feature-list.
+    Rows are read through a server-side cursor in batches so memory stays
+    flat, and the ETag/Last-Modified change whenever an import bumps the
+    feature generation.
+    """
+    filters = normalize_filters(request.args.get('label', ''), request.args.get('branch', ''),
+                                request.args.get('support', ''), request.args.get('source', ''))
+    
+    try:
+        import_state = get_import_state()
+        generation = import_state.generation if import_state else 0
+        last_import = import_state.updated_at if import_state else None
+        etag_source = '|'.join([str(generation), *filters])
+        etag = hashlib.sha1(etag_source.encode('utf-8')).hexdigest()
+        
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+            response.set_etag(etag)
+            return response
+        
+        query = apply_feature_filters(FeatureMap.query, *filters)
+        query = query.options(selectinload(FeatureMap.labels)) \
+                     .order_by(FeatureMap.feature_key) \
+                     .execution_options(stream_results=True) \
+                     .yield_per(API_STREAM_BATCH_SIZE)
+        
+        def generate():
+            for feature in query:
+                yield json.dumps(feature.to_dict()) + '\n'
+        
+        response = Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+        response.set_etag(etag)
+        if last_import:
+            response.last_modified = last_import
+        return response
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+def highlight_snippet(snippet):
+    """Escape a search snippet and turn the match markers into <mark> tags"""
+    escaped = str(escape(snippet or ''))
+    escaped = escaped.replace(search_index.HIGHLIGHT_START, '<mark>').replace(search_index.HIGHLIGHT_END, '</mark>')
+    return Markup(escaped)
+
+
+def run_search():
+    """Run the search described by the request args; returns (params, total, results)"""
+    query = request.args.get('q', '').strip()
+    doc_type = request.args.get('type', '')
+    if doc_type not in search_index.DOC_TYPES:
+        doc_type = ''
+    try:
+        page = max(1, int(request.args.get('page', 1)))
+    except (TypeError, ValueError):
+        page = 1
+    
+    params = {'q': query, 'type': doc_type, 'page': page}
+    
+    # Nothing to search until an import, create_all() or migration builds the index
+    connection = db.session.connection()
+    if not search_index.has_search_index(connection):
+        return params, 0, []
+    
+    total, results = search_index.search(connection, query, doc_type or None,
+                                         limit=SEARCH_PAGE_SIZE, offset=(page - 1) * SEARCH_PAGE_SIZE)
+    return params, total, results
+
+
+def search_sqlalchemy(app_config):
+    """Full-text search page over features and test cases"""
+    try:
+        params, total, results = run_search()
+        for result in results:
+            result['snippet'] = highlight_snippet(result['snippet'])
+        
+        link_args = {key: value for key, value in params.items() if value and key != 'page'}
+        pages = (total + SEARCH_PAGE_SIZE - 1) // SEARCH_PAGE_SIZE
+        pagination = {
+            'total': total,
+            'page': params['page'],
+            'pages': pages,
+            'prev_url': url_for(request.endpoint, page=params['page'] - 1, **link_args) if params['page'] > 1 else None,
+            'next_url': url_for(request.endpoint, page=params['page'] + 1, **link_args) if params['page'] < pages else None
+        }
+        
+        return render_template('search.html',
+                             results=results,
+                             search=params,
+                             pagination=pagination,
+                             config=app_config)
+    
+    except Exception as e:
+        db.session.rollback()
+        return render_template('search.html',
+                             results=[],
+                             search={'q': request.args.get('q', ''), 'type': '', 'page': 1},
+                             pagination=None,
+                             error=str(e),
+                             config=app_config)
+
+
+def search_api_sqlalchemy():
+    """Full-text search as JSON"""
+    try:
+        params, total, results = run_search()
+        for result in results:
+            result['snippet'] = (result['snippet'] or '').replace(search_index.HIGHLIGHT_START, '') \
+                                                       .replace(search_index.HIGHLIGHT_END, '')
+        return jsonify({
+            'query': params['q'],
+            'type': params['type'] or None,
+            'page': params['page'],
+            'page_size': SEARCH_PAGE_SIZE,
+            'total': total,
+            'results': results
+        })
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
+def get_branches():
+    """Return the branch registry ordered for display"""
+    return Branch.query.order_by(Branch.sort_order, Branch.name).all()
+
+
+def compute_branch_diff(base_branch, target_branch, status='Support'):
+    """Features that gained or lost a status between two branches
+    
+    gained: status on target but not on base; lost: the reverse. Both set
+    differences are computed in SQL with EXCEPT over s_feature_branch_status.
+    """
+    def keys_with_status(branch):
+        return select(FeatureBranchStatus.feature_key) \
+            .where(FeatureBranchStatus.branch_id == branch.branch_id,
+                   FeatureBranchStatus.status == status)
+    
+    def load(only_on, other):
+        keys = keys_with_status(only_on).except_(keys_with_status(other)).subquery()
+        other_status = aliased(FeatureBranchStatus)
+        rows = db.session.query(FeatureMap.feature_key, FeatureMap.category,
+                                FeatureMap.feature_n1, other_status.status) \
+            .join(keys, keys.c.feature_key == FeatureMap.feature_key) \
+            .outerjoin(other_status, and_(other_status.feature_key == FeatureMap.feature_key,
+                                          other_status.branch_id == other.branch_id)) \
+            .order_by(FeatureMap.feature_key).all()
+        return [{
+            'feature_key': row.feature_key,
+            'category': row.category,
+            'feature_description': row.feature_n1,
+            'other_status': row.status
+        } for row in rows]
+    
+    return {
+        'base': base_branch.to_dict(),
+        'target': target_branch.to_dict(),
+        'status': status,
+        'gained': load(target_branch, base_branch),
+        'lost': load(base_branch, target_branch)
+    }
+
+
+def get_branch_diff(app_config, base_name, target_name, status):
+    """Return the branch diff, cached per import generation
+    
+    Raises ValueError for unknown branches.
+    """
+    cache = get_synced_cache(app_config)
+    cache_key = ('branch_diff', base_name, target_name, status)
+    diff = cache.get(cache_key) if cache else None
+    if diff is None:
+        branches = {branch.name: branch for branch in
+                    Branch.query.filter(Branch.name.in_([base_name, target_name])).all()}
+        for name in (base_name, target_name):
+            if name not in branches:
+                raise ValueError(f"Unknown branch: {name}")
+        diff = compute_branch_diff(branches[base_name], branches[target_name], status)
+        if cache:
+            cache.set(cache_key, diff)
+    return diff
+
+
+def branch_diff_sqlalchemy(app_config):
+    """Branch diff page - features gained/lost between two branches"""
+    base_name = request.args.get('base', '')
+    target_name = request.args.get('target', '')
+    status = request.args.get('status', 'Support') or 'Support'
+    
+    try:
+        branches = get_branches()
+        diff = None
+        if base_name and target_name:
+            diff = get_branch_diff(app_config, base_name, target_name, status)
+        
+        return render_template('branch_diff.html',
+                             branches=branches,
+                             diff=diff,
+                             current={'base': base_name, 'target': target_name, 'status': status},
+                             config=app_config)
+    
+    except ValueError as e:
+        # Unknown branch in the query string: show the form again
+        return render_template('branch_diff.html',
+                             branches=branches,
+                             diff=None,
+                             current={'base': base_name, 'target': target_name, 'status': status},
+                             validation_error=str(e),
+                             config=app_config), 400
+    
+    except Exception as e:
+        db.session.rollback()
+        return render_template('branch_diff.html',
+                             branches=[],
+                             diff=None,
+                             current={'base': base_name, 'target': target_name, 'status': status},
+                             error=str(e),
+                             config=app_config)
+
+
+def branch_diff_api_sqlalchemy(app_config):
+    """Branch diff as JSON"""
+    base_name = request.args.get('base', '')
+    target_name = request.args.get('target', '')
+    status = request.args.get('status', 'Support') or 'Support'
+    
+    if not base_name or not target_name:
+        return jsonify({'error': 'Both base and target branches are required'}), 400
+    
+    try:
+        return jsonify(get_branch_diff(app_config, base_name, target_name, status))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 404
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
+def get_feature_history(feature_key, status='Support'):
+    """Version timeline of a feature and the first snapshot with status per branch
+    
+    Returns None for features that are not in any imported snapshot.
+    """
+    versions = FeatureHistory.query.filter_by(feature_key=feature_key) \
+        .order_by(FeatureHistory.valid_from).all()
+    if not versions:
+        return None
+    
+    first_snapshot = db.session.query(func.min(FeatureSnapshot.snapshot_date)).scalar()
+    display_names = {branch.name: branch.display_name or branch.name for branch in get_branches()}
+    first_dates = FeatureHistory.first_status_dates(feature_key, status)
+    return {
+        'feature_key': feature_key,
+        'status': status,
+        'first_snapshot': first_snapshot.isoformat() if first_snapshot else None,
+        'first_status': [{
+            'branch': column_name,
+            'display_name': display_names.get(column_name, column_name),
+            'date': first_date.isoformat() if first_date else None
+        } for column_name, first_date in first_dates.items()],
+        'versions': [version.to_dict() for version in versions]
+    }
+
+
+def feature_history_sqlalchemy(app_config):
+    """Feature history page - when a feature's branch status changed"""
+    feature_key = request.args.get('feature_key', '').strip()
+    status = request.args.get('status', 'Support') or 'Support'
+    
+    try:
+        history = get_feature_history(feature_key, status) if feature_key else None
+        return render_template('feature_history.html',
+                             history=history,
+                             current={'feature_key': feature_key, 'status': status},
+                             branch_columns=FeatureMap.BRANCH_COLUMNS,
+                             config=app_config)
+    
+    except Exception as e:
+        db.session.rollback()
+        return render_template('feature_history.html',
+                             history=None,
+                             current={'feature_key': feature_key, 'status': status},
+                             branch_columns=FeatureMap.BRANCH_COLUMNS,
+                             error=str(e),
+                             config=app_config)
+
+
+def feature_history_api_sqlalchemy():
+    """Feature history as JSON"""
+    feature_key = request.args.get('feature_key', '').strip()
+    status = request.args.get('status', 'Support') or 'Support'
+    
+    if not feature_key:
+        return jsonify({'error': 'feature_key is required'}), 400
+    
+    try:
+        history = get_feature_history(feature_key, status)
+        if history is None:
+            return jsonify({'error': f"No history for feature: {feature_key}"}), 404
+        return jsonify(history)
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
@@ -3,11 +3,9 @@
 Database Schema Reader - Extract and document database schemas
 """
 import os
-import psycopg2
-import sqlite3
-from urllib.parse import urlparse
 from dotenv import load_dotenv
 from datetime import datetime
+from config.database import DatabaseConfig
 
 # Load environment variables
 load_dotenv()
@@ -20,33 +18,12 @@ class SchemaReader:
     
     def get_database_configs(self):
         """Get all database configurations"""
-        env = os.environ.get('FLASK_ENV', 'development')
-        env_map = {
-            'development': 'DEV',
-            'production': 'PROD', 
-            'testing': 'TEST'
-        }
-        env_short = env_map.get(env, env.upper())
-        
-        configs = {}
-        for db_name in ['primary', 'analytics', 'cache']:
-            env_var = f"{db_name.upper()}_{env_short}_DB_URL"
-            db_url = os.environ.get(env_var, f"sqlite:///{db_name}_{env}.db")
-            configs[db_name] = db_url
-        
-        return configs
+        return DatabaseConfig.get_database_configs()
     
     def read_postgresql_schema(self, db_url, db_name):
         """Read PostgreSQL database schema"""
         try:
-            parsed = urlparse(db_url)
-            conn = psycopg2.connect(
-                host=parsed.hostname,
-                port=parsed.port or 5432,
-                database=parsed.path.lstrip('/'),
-                user=parsed.username,
-                password=parsed.password
-            )
+            conn = DatabaseConfig.engine_for_url(db_url).raw_connection()
             
             cursor = conn.cursor()
             
@@ -198,7 +175,7 @@ class SchemaReader:
                     'error': f'Database file {db_path} does not exist'
                 }
             
-            conn = sqlite3.connect(db_path)
+            conn = DatabaseConfig.engine_for_url(db_url).raw_connection()
             cursor = conn.cursor()
             
             # Get SQLite version
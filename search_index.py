@@ -0,0 +1,383 @@
+"""
+Full-text search index over features and test cases
+
+Documents live in s_search_document (one row per feature / test case, with
+a content hash so importers only rewrite what changed). The text index on
+top of it depends on the database:
+
+- PostgreSQL: a generated tsvector column with a GIN index
+- SQLite: an external-content FTS5 table kept in sync by triggers
+- SQLite built without FTS5: no text index, searched with LIKE
+
+register_with() ties the index to the app metadata, so db.create_all() and
+drop_all() (db_manager.py init-db / drop-db / reset-db) create and drop it
+with the other tables; migration 5b7e9c3d1f28 creates it on upgrade.
+"""
+import hashlib
+import re
+from sqlalchemy import (
+    MetaData, Table, Column, Integer, String, Text, DateTime,
+    bindparam, delete, event, func, insert, inspect, select, text, update
+)
+
+DOC_TYPE_FEATURE = 'feature'
+DOC_TYPE_TESTCASE = 'testcase'
+DOC_TYPES = (DOC_TYPE_FEATURE, DOC_TYPE_TESTCASE)
+
+# Markers wrapped around matched terms in snippets (escaped before rendering)
+HIGHLIGHT_START = '[[HL]]'
+HIGHLIGHT_END = '[[/HL]]'
+
+# Rows per executemany / IN batch when refreshing documents
+REFRESH_BATCH_SIZE = 500
+
+metadata = MetaData()
+
+search_documents = Table(
+    's_search_document', metadata,
+    Column('id', Integer, primary_key=True, autoincrement=True),
+    Column('doc_type', String(20), nullable=False),
+    Column('doc_key', String(255), nullable=False),
+    Column('title', Text),
+    Column('body', Text),
+    Column('content_hash', String(64), nullable=False),
+    Column('updated_at', DateTime, server_default=func.current_timestamp()),
+)
+
+POSTGRESQL_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS s_search_document (
+        id SERIAL PRIMARY KEY,
+        doc_type VARCHAR(20) NOT NULL,
+        doc_key VARCHAR(255) NOT NULL,
+        title TEXT,
+        body TEXT,
+        content_hash VARCHAR(64) NOT NULL,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        search_vector tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(body, '')), 'B')
+        ) STORED,
+        UNIQUE (doc_type, doc_key)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_s_search_document_vector ON s_search_document USING GIN (search_vector)",
+]
+
+SQLITE_DOCUMENT_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS s_search_document (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        doc_type VARCHAR(20) NOT NULL,
+        doc_key VARCHAR(255) NOT NULL,
+        title TEXT,
+        body TEXT,
+        content_hash VARCHAR(64) NOT NULL,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE (doc_type, doc_key)
+    )
+    """,
+]
+
+SQLITE_FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS s_search_fts USING fts5(
+        title, body, content='s_search_document', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS s_search_document_ai AFTER INSERT ON s_search_document BEGIN
+        INSERT INTO s_search_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS s_search_document_ad AFTER DELETE ON s_search_document BEGIN
+        INSERT INTO s_search_fts(s_search_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS s_search_document_au AFTER UPDATE ON s_search_document BEGIN
+        INSERT INTO s_search_fts(s_search_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+        INSERT INTO s_search_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+]
+
+
+# The GIN index and the FTS5 table and triggers go with their tables
+POSTGRESQL_DROP_DDL = [
+    "DROP TABLE IF EXISTS s_search_document",
+]
+
+SQLITE_DROP_DDL = [
+    "DROP TRIGGER IF EXISTS s_search_document_ai",
+    "DROP TRIGGER IF EXISTS s_search_document_ad",
+    "DROP TRIGGER IF EXISTS s_search_document_au",
+    "DROP TABLE IF EXISTS s_search_fts",
+    "DROP TABLE IF EXISTS s_search_document",
+]
+
+
+def is_postgresql(connection):
+    """True if the connection talks to PostgreSQL"""
+    return connection.dialect.name == 'postgresql'
+
+
+def has_fts5(connection):
+    """True if this SQLite build includes the FTS5 extension"""
+    return bool(connection.execute(text("SELECT sqlite_compileoption_used('ENABLE_FTS5')")).scalar())
+
+
+def has_fts_table(connection):
+    """True if the SQLite FTS5 index table exists (else search falls back to LIKE)"""
+    return connection.execute(text(
+        "SELECT count(*) FROM sqlite_master WHERE type = 'table' AND name = 's_search_fts'"
+    )).scalar() > 0
+
+
+def ensure_search_index(connection):
+    """Create the document table and its text index if they don't exist"""
+    if is_postgresql(connection):
+        statements = POSTGRESQL_DDL
+    elif has_fts5(connection):
+        statements = SQLITE_DOCUMENT_DDL + SQLITE_FTS_DDL
+    else:
+        statements = SQLITE_DOCUMENT_DDL
+    for statement in statements:
+        connection.execute(text(statement))
+
+
+def drop_search_index(connection):
+    """Drop the document table and its text index if they exist"""
+    statements = POSTGRESQL_DROP_DDL if is_postgresql(connection) else SQLITE_DROP_DDL
+    for statement in statements:
+        connection.execute(text(statement))
+
+
+def has_search_index(connection):
+    """True if the document table exists (no import or migration has created it otherwise)"""
+    return inspect(connection).has_table('s_search_document')
+
+
+def register_with(metadata):
+    """Create / drop the search index whenever metadata.create_all() / drop_all() runs"""
+    event.listen(metadata, 'after_create', lambda target, connection, **kw: ensure_search_index(connection))
+    event.listen(metadata, 'before_drop', lambda target, connection, **kw: drop_search_index(connection))
+
+
+def content_hash(title, body):
+    """Stable hash of a document's indexed text"""
+    return hashlib.sha256(f"{title or ''}\x00{body or ''}".encode('utf-8')).hexdigest()
+
+
+def join_text(*parts):
+    """Join the non-empty parts of a document body"""
+    return '\n'.join(str(part) for part in parts if part)
+
+
+def refresh_documents(connection, doc_type, documents):
+    """Bring the index for doc_type in line with documents
+
+    documents is {doc_key: (title, body)} for every current row of that type.
+    Only new keys are inserted, changed ones updated and vanished ones
+    deleted. Returns {'inserted': n, 'updated': n, 'deleted': n}.
+    """
+    existing = dict(connection.execute(
+        select(search_documents.c.doc_key, search_documents.c.content_hash)
+        .where(search_documents.c.doc_type == doc_type)
+    ).all())
+
+    inserts, updates = [], []
+    for doc_key, (title, body) in documents.items():
+        digest = content_hash(title, body)
+        if doc_key not in existing:
+            inserts.append({'doc_type': doc_type, 'doc_key': doc_key, 'title': title,
+                            'body': body, 'content_hash': digest})
+        elif existing[doc_key] != digest:
+            updates.append({'b_doc_key': doc_key, 'title': title, 'body': body, 'content_hash': digest})
+    deleted_keys = [doc_key for doc_key in existing if doc_key not in documents]
+
+    for start in range(0, len(inserts), REFRESH_BATCH_SIZE):
+        connection.execute(insert(search_documents), inserts[start:start + REFRESH_BATCH_SIZE])
+
+    if updates:
+        statement = update(search_documents) \
+            .where(search_documents.c.doc_type == doc_type,
+                   search_documents.c.doc_key == bindparam('b_doc_key')) \
+            .values(title=bindparam('title'), body=bindparam('body'),
+                    content_hash=bindparam('content_hash'), updated_at=func.current_timestamp())
+        for start in range(0, len(updates), REFRESH_BATCH_SIZE):
+            connection.execute(statement, updates[start:start + REFRESH_BATCH_SIZE])
+
+    for start in range(0, len(deleted_keys), REFRESH_BATCH_SIZE):
+        connection.execute(
+            delete(search_documents)
+            .where(search_documents.c.doc_type == doc_type,
+                   search_documents.c.doc_key.in_(deleted_keys[start:start + REFRESH_BATCH_SIZE]))
+        )
+
+    return {'inserted': len(inserts), 'updated': len(updates), 'deleted': len(deleted_keys)}
+
+
+def collect_feature_documents(connection):
+    """Build {feature_key: (title, body)} from s_feature_map and s_feature_label"""
+    labels = {}
+    for feature_key, label in connection.execute(
+            text("SELECT feature_key, label FROM s_feature_label ORDER BY feature_key, label")):
+        labels.setdefault(feature_key, []).append(label)
+
+    documents = {}
+    for row in connection.execute(
+            text("SELECT feature_key, category, feature_n1, component FROM s_feature_map")):
+        title = row.feature_n1 or row.feature_key
+        body = join_text(row.feature_key, row.category, row.component, ' '.join(labels.get(row.feature_key, [])))
+        documents[row.feature_key] = (title, body)
+    return documents
+
+
+def collect_testcase_documents(connection):
+    """Build {test_case_id: (title, body)} from s_test_case"""
+    documents = {}
+    for row in connection.execute(
+            text("SELECT test_case_id, test_case_name, description, step, validation FROM s_test_case")):
+        title = row.test_case_name or row.test_case_id
+        body = join_text(row.description, row.step, row.validation)
+        documents[row.test_case_id] = (title, body)
+    return documents
+
+
+def refresh_feature_documents(connection):
+    """Refresh the index for features (runs in the caller's transaction)"""
+    ensure_search_index(connection)
+    return refresh_documents(connection, DOC_TYPE_FEATURE, collect_feature_documents(connection))
+
+
+def refresh_testcase_documents(connection):
+    """Refresh the index for test cases (runs in the caller's transaction)"""
+    ensure_search_index(connection)
+    return refresh_documents(connection, DOC_TYPE_TESTCASE, collect_testcase_documents(connection))
+
+
+def sqlite_match_query(query):
+    """Quote each term so user input can't break FTS5 query syntax"""
+    terms = [term.replace('"', '""') for term in query.split()]
+    return ' '.join(f'"{term}"' for term in terms if term)
+
+
+def like_pattern(term):
+    """Case-insensitive LIKE pattern matching term anywhere (wildcards escaped)"""
+    escaped = term.lower().replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f"%{escaped}%"
+
+
+def like_snippet(body, terms, words=24):
+    """Up to words words of body around the first match, terms wrapped in highlight markers"""
+    tokens = (body or '').split()
+    lowered = [token.lower() for token in tokens]
+    first = next((index for index, token in enumerate(lowered) if any(term in token for term in terms)), 0)
+    start = max(0, first - words // 2)
+    snippet = ' '.join(tokens[start:start + words])
+    pattern = re.compile('|'.join(re.escape(term) for term in terms), re.IGNORECASE)
+    snippet = pattern.sub(lambda match: f"{HIGHLIGHT_START}{match.group(0)}{HIGHLIGHT_END}", snippet)
+    if start > 0:
+        snippet = '...' + snippet
+    if start + words < len(tokens):
+        snippet += '...'
+    return snippet
+
+
+def like_search(connection, terms, type_clause, params):
+    """Unindexed fallback: every term must appear in the title or body
+
+    Documents whose title contains more of the terms rank first.
+    Returns (total, results) like search().
+    """
+    terms = [term.lower() for term in terms]
+    conditions = []
+    title_hits = []
+    for index, term in enumerate(terms):
+        params[f'term_{index}'] = like_pattern(term)
+        conditions.append(f"(lower(coalesce(d.title, '')) LIKE :term_{index} ESCAPE '\\' "
+                          f"OR lower(coalesce(d.body, '')) LIKE :term_{index} ESCAPE '\\')")
+        title_hits.append(f"CASE WHEN lower(coalesce(d.title, '')) LIKE :term_{index} ESCAPE '\\' "
+                          f"THEN 1 ELSE 0 END")
+    where = ' AND '.join(conditions)
+    total = connection.execute(text(
+        f"SELECT count(*) FROM s_search_document d WHERE {where} {type_clause}"
+    ), params).scalar()
+    rows = connection.execute(text(f"""
+        SELECT d.doc_type, d.doc_key, d.title, d.body, {' + '.join(title_hits)} AS rank
+        FROM s_search_document d
+        WHERE {where} {type_clause}
+        ORDER BY rank DESC, d.doc_type, d.doc_key
+        LIMIT :limit OFFSET :offset
+    """), params).all()
+    return total, [{
+        'doc_type': row.doc_type,
+        'doc_key': row.doc_key,
+        'title': row.title,
+        'snippet': like_snippet(row.body, terms),
+        'rank': float(row.rank or 0)
+    } for row in rows]
+
+
+def search(connection, query, doc_type=None, limit=20, offset=0):
+    """Ranked full-text search
+
+    Returns (total, results) where results is a list of dicts with
+    doc_type, doc_key, title, snippet and rank (higher is better).
+    """
+    query = (query or '').strip()
+    if not query:
+        return 0, []
+
+    params = {'query': query, 'limit': limit, 'offset': offset,
+              'start': HIGHLIGHT_START, 'end': HIGHLIGHT_END}
+    type_clause = ''
+    if doc_type:
+        type_clause = 'AND d.doc_type = :doc_type'
+        params['doc_type'] = doc_type
+
+    if is_postgresql(connection):
+        match = "d.search_vector @@ websearch_to_tsquery('english', :query)"
+        total = connection.execute(text(
+            f"SELECT count(*) FROM s_search_document d WHERE {match} {type_clause}"
+        ), params).scalar()
+        rows = connection.execute(text(f"""
+            SELECT d.doc_type, d.doc_key, d.title,
+                   ts_headline('english', coalesce(d.body, ''), websearch_to_tsquery('english', :query),
+                               'StartSel=' || :start || ', StopSel=' || :end || ', MaxFragments=1, MaxWords=30') AS snippet,
+                   ts_rank_cd(d.search_vector, websearch_to_tsquery('english', :query)) AS rank
+            FROM s_search_document d
+            WHERE {match} {type_clause}
+            ORDER BY rank DESC, d.doc_type, d.doc_key
+            LIMIT :limit OFFSET :offset
+        """), params).all()
+    elif not has_fts_table(connection):
+        return like_search(connection, query.split(), type_clause, params)
+    else:
+        params['query'] = sqlite_match_query(query)
+        if not params['query']:
+            return 0, []
+        total = connection.execute(text(f"""
+            SELECT count(*) FROM s_search_fts JOIN s_search_document d ON d.id = s_search_fts.rowid
+            WHERE s_search_fts MATCH :query {type_clause}
+        """), params).scalar()
+        rows = connection.execute(text(f"""
+            SELECT d.doc_type, d.doc_key, d.title,
+                   snippet(s_search_fts, 1, :start, :end, '...', 24) AS snippet,
+                   -bm25(s_search_fts, 10.0, 1.0) AS rank
+            FROM s_search_fts JOIN s_search_document d ON d.id = s_search_fts.rowid
+            WHERE s_search_fts MATCH :query {type_clause}
+            ORDER BY rank DESC, d.doc_type, d.doc_key
+            LIMIT :limit OFFSET :offset
+        """), params).all()
+
+    results = [{
+        'doc_type': row.doc_type,
+        'doc_key': row.doc_key,
+        'title': row.title,
+        'snippet': row.snippet,
+        'rank': float(row.rank or 0)
+    } for row in rows]
+    return total, results
@@ -0,0 +1,217 @@
+"""
+Shadow-table swap for feature imports
+
+The import loads s_feature_map, s_feature_label and s_feature_branch_status
+into *_staging copies, validates them, and then renames them over the live
+tables in one short transaction. Readers see either the old or the new
+data, never an empty or half-loaded table.
+
+- PostgreSQL: staging tables get their indexes before the swap; the swap
+  renames tables, indexes and constraints and adds the foreign keys as
+  NOT VALID (they were already checked on the staging tables), so it is
+  independent of the number of rows. validate_foreign_keys() then
+  validates them without blocking readers.
+- SQLite (development/tests): SQLite cannot rename indexes, so they are
+  created inside the swap transaction after the old tables are dropped.
+"""
+from sqlalchemy import (
+    MetaData, Table, Column, ForeignKeyConstraint, Index,
+    func, inspect, select, text
+)
+from sqlalchemy.sql.visitors import replacement_traverse
+from models import FeatureMap, FeatureLabel, Branch, FeatureBranchStatus
+
+STAGING_SUFFIX = '_staging'
+OLD_SUFFIX = '_old'
+
+# Tables swapped together, parents first
+SWAP_TABLES = (FeatureMap.__table__, FeatureLabel.__table__, FeatureBranchStatus.__table__)
+
+
+def is_postgresql(connection):
+    """True if the connection talks to PostgreSQL"""
+    return connection.dialect.name == 'postgresql'
+
+
+def staging_name(name):
+    """Name of the staging copy of a table, index or constraint"""
+    return f"{name}{STAGING_SUFFIX}"
+
+
+def pk_name(table_name):
+    """PostgreSQL's default primary key constraint name"""
+    return f"{table_name}_pkey"
+
+
+def fk_name(table_name, constraint):
+    """PostgreSQL's default foreign key constraint name"""
+    return constraint.name or f"{table_name}_{'_'.join(constraint.column_keys)}_fkey"
+
+
+def build_staging_tables(connection):
+    """Define the staging copies of SWAP_TABLES (columns and primary keys)
+
+    Returns {live table name: staging Table}. On SQLite the foreign keys
+    are declared against the live names, so they are correct once the
+    staging tables are renamed; PostgreSQL gets them during the swap.
+    """
+    metadata = MetaData()
+    staging = {}
+    for table in SWAP_TABLES:
+        columns = [Column(column.name, column.type, primary_key=column.primary_key,
+                          nullable=column.nullable, autoincrement=False)
+                   for column in table.columns]
+        constraints = []
+        if not is_postgresql(connection):
+            constraints = [ForeignKeyConstraint(constraint.column_keys,
+                                                [element.column for element in constraint.elements])
+                           for constraint in table.foreign_key_constraints]
+        staging[table.name] = Table(staging_name(table.name), metadata, *columns, *constraints)
+    return staging
+
+
+def staging_index(index, table, staging_table, name):
+    """Copy of index on staging_table (plain and functional indexes)"""
+    def to_staging(element):
+        if isinstance(element, Column) and element.table is table:
+            return staging_table.c[element.name]
+        return None
+
+    expressions = [replacement_traverse(expression, {}, to_staging) for expression in index.expressions]
+    return Index(name, *expressions, unique=index.unique)
+
+
+def create_staging_tables(connection):
+    """Drop leftovers of an earlier run and create empty staging tables"""
+    drop_staging_tables(connection)
+    staging = build_staging_tables(connection)
+    for table in SWAP_TABLES:
+        staging[table.name].create(connection)
+    return staging
+
+
+def create_staging_indexes(connection, staging):
+    """Index the loaded staging tables (PostgreSQL only, see module docstring)"""
+    if not is_postgresql(connection):
+        return
+    for table in SWAP_TABLES:
+        for index in table.indexes:
+            staging_index(index, table, staging[table.name], staging_name(index.name)).create(connection)
+
+
+def copy_registry_statuses(connection, staging, skip_branch_ids=()):
+    """Carry over statuses of branches without a FeatureMap column
+
+    Rows of registry-only branches are kept for features that still exist,
+    except for skip_branch_ids - the branches whose column was in this
+    import's sheet and whose rows were already written to staging.
+    Returns the number of rows copied.
+    """
+    live = FeatureBranchStatus.__table__
+    if live.name not in inspect(connection).get_table_names():
+        return 0
+    target = staging[live.name]
+    feature_keys = select(staging[FeatureMap.__tablename__].c.feature_key)
+    column_branches = select(Branch.branch_id).where(Branch.name.in_(FeatureMap.BRANCH_COLUMNS))
+    result = connection.execute(
+        target.insert().from_select(
+            ['feature_key', 'branch_id', 'status'],
+            select(live.c.feature_key, live.c.branch_id, live.c.status)
+            .where(live.c.branch_id.notin_(column_branches), live.c.branch_id.notin_(list(skip_branch_ids or ())),
+                   live.c.feature_key.in_(feature_keys))
+        )
+    )
+    return max(result.rowcount or 0, 0)
+
+
+def validate_staging(connection, staging, expected_counts):
+    """Check row counts and foreign keys of the loaded staging tables
+
+    expected_counts is {live table name: rows written}. Returns a list
+    of problems (empty when the staging tables can be swapped in).
+    """
+    problems = []
+    for name, expected in expected_counts.items():
+        actual = connection.execute(select(func.count()).select_from(staging[name])).scalar()
+        if actual != expected:
+            problems.append(f"{staging[name].name}: {actual} rows, expected {expected}")
+
+    if not expected_counts.get(FeatureMap.__tablename__):
+        problems.append(f"{staging[FeatureMap.__tablename__].name} is empty; refusing to swap")
+
+    for table in SWAP_TABLES:
+        child = staging[table.name]
+        for constraint in table.foreign_key_constraints:
+            parent_name = constraint.referred_table.name
+            parent = staging.get(parent_name, constraint.referred_table)
+            conditions = [child.c[element.parent.name] == parent.c[element.column.name]
+                          for element in constraint.elements]
+            orphans = connection.execute(
+                select(func.count()).select_from(child)
+                .where(~select(1).select_from(parent).where(*conditions).exists())
+            ).scalar()
+            if orphans:
+                problems.append(f"{child.name}: {orphans} rows without a matching {parent.name} row")
+    return problems
+
+
+def swap_staging_tables(connection, staging):
+    """Rename the staging tables over the live ones (caller's transaction)
+
+    On SQLite the caller must already have written in this transaction
+    (pysqlite only opens one implicitly before DML), otherwise each DDL
+    statement would autocommit.
+    """
+    postgresql = is_postgresql(connection)
+    if not postgresql:
+        # Keep REFERENCES clauses pointing at the names, not the renamed tables
+        connection.execute(text("PRAGMA legacy_alter_table = ON"))
+
+    existing = set(inspect(connection).get_table_names())
+    for table in SWAP_TABLES:
+        if table.name in existing:
+            connection.execute(text(f"ALTER TABLE {table.name} RENAME TO {table.name}{OLD_SUFFIX}"))
+        connection.execute(text(f"ALTER TABLE {staging[table.name].name} RENAME TO {table.name}"))
+
+    # Children first, they hold the foreign keys to the old parents
+    for table in reversed(SWAP_TABLES):
+        if table.name in existing:
+            connection.execute(text(f"DROP TABLE {table.name}{OLD_SUFFIX}"))
+
+    if postgresql:
+        for table in SWAP_TABLES:
+            connection.execute(text(
+                f"ALTER TABLE {table.name} RENAME CONSTRAINT {pk_name(staging_name(table.name))} TO {pk_name(table.name)}"
+            ))
+            for index in table.indexes:
+                connection.execute(text(f"ALTER INDEX {staging_name(index.name)} RENAME TO {index.name}"))
+            for constraint in table.foreign_key_constraints:
+                columns = ', '.join(constraint.column_keys)
+                referred = ', '.join(element.column.name for element in constraint.elements)
+                connection.execute(text(
+                    f"ALTER TABLE {table.name} ADD CONSTRAINT {fk_name(table.name, constraint)} "
+                    f"FOREIGN KEY ({columns}) REFERENCES {constraint.referred_table.name} ({referred}) NOT VALID"
+                ))
+    else:
+        connection.execute(text("PRAGMA legacy_alter_table = OFF"))
+        for table in SWAP_TABLES:
+            for index in table.indexes:
+                index.create(connection)
+
+
+def validate_foreign_keys(connection):
+    """Validate the NOT VALID foreign keys added by the swap (PostgreSQL)"""
+    if not is_postgresql(connection):
+        return
+    for table in SWAP_TABLES:
+        for constraint in table.foreign_key_constraints:
+            connection.execute(text(f"ALTER TABLE {table.name} VALIDATE CONSTRAINT {fk_name(table.name, constraint)}"))
+
+
+def drop_staging_tables(connection):
+    """Drop staging tables (and old tables of an interrupted swap) if present"""
+    existing = set(inspect(connection).get_table_names())
+    for table in reversed(SWAP_TABLES):
+        for name in (staging_name(table.name), f"{table.name}{OLD_SUFFIX}"):
+            if name in existing:
+                connection.execute(text(f"DROP TABLE {name}"))
@@ -0,0 +1,548 @@
+#!/usr/bin/env python3
+"""
+Tests for feature_importer.py
+"""
+import datetime
+import json
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from click.testing import CliRunner
+import benchmark_feature_normalization
+import db_manager
+import excel_loader
+import feature_importer
+from app import create_app
+from feature_cache import feature_matrix_cache
+from feature_importer import SQLAlchemyFeatureImporter, EXCEL_COLUMNS
+from models.base import db
+from models import (
+    FeatureMap, FeatureLabel, FeatureFacet, FeatureHistory, ImportLedger, ImportGeneration,
+    Branch, FeatureBranchStatus
+)
+from routes_sqlalchemy import apply_feature_filters
+from sqlalchemy import inspect
+
+FEATURE_ROWS = [
+    {'Feature_Key': 'lag_fallback', 'Category': 'L2', 'Feature N1': 'LACP Fallback',
+     'EC_SONiC_2111': 'O', 'EC_SONiC_2211': 'x', 'EC SONiC 2311.X': ' D ',
+     'EC Proprietary': 'Community', 'Labels': 'community, lag,lacp'},
+    {'Feature_Key': None, 'Category': 'L3', 'Feature N1': 'BGP / EVPN (Type 5)',
+     'EC_SONiC_2111': 'N/A', 'VS_202311': 'Support', 'EC Proprietary': 'EC', 'Labels': None},
+    {'Feature_Key': ' vxlan ', 'Category': 'Overlay', 'Feature N1': 'VXLAN',
+     'EC_SONiC_2211': 'O', 'Component': 'SWSS', 'Labels': ' , evpn ,'},
+    {'Feature_Key': None, 'Category': None, 'Feature N1': 'No category'},
+]
+
+GOLDEN_FILE = os.path.join(os.path.dirname(__file__), 'data', 'EC_SONiC_Feature.20250627.xlsx')
+
+EDGE_CASE_ROWS = [
+    {'Feature_Key': '  ', 'Category': 'L2 ', 'Feature N1': 'a--b  c!!', 'EC_SONiC_2111': ' o', 'Labels': ' , x ,, y,x'},
+    {'Feature_Key': 'nan', 'Category': '__', 'Feature N1': '__', 'EC_SONiC_2111': 'n/a', 'Labels': 'NULL'},
+    {'Feature_Key': np.nan, 'Category': 'Überl', 'Feature N1': 'ça va', 'EC_SONiC_2211': 'Supported'},
+    {'Feature_Key': None, 'Category': 5, 'Feature N1': 1.5, 'EC_SONiC_2211': 'd',
+     'EC Proprietary': datetime.datetime(2025, 1, 1)},
+    {'Feature_Key': 'k', 'Category': 'None', 'Feature N1': 'x', 'Component': '  '},
+]
+
+
+@pytest.fixture
+def feature_file(tmp_path):
+    """Small feature_map workbook exercising the normalization rules"""
+    path = tmp_path / 'EC_SONiC_Feature.20250101.xlsx'
+    pd.DataFrame(FEATURE_ROWS).to_excel(path, sheet_name='feature_map', index=False)
+    return path
+
+
+def run_import(tmp_path, monkeypatch, path, db_path=None, **kwargs):
+    """Import path into a SQLite database (fresh unless db_path is given) and return its contents"""
+    db_path = db_path or tmp_path / f"import_{len(list(tmp_path.glob('import_*.db')))}.db"
+    monkeypatch.setenv('PRIMARY_TEST_DB_URL', f"sqlite:///{db_path}")
+    monkeypatch.chdir(tmp_path)
+
+    importer = SQLAlchemyFeatureImporter('testing', **kwargs)
+    with importer.create_app().app_context():
+        db.create_all()
+    assert importer.import_features(str(path))
+
+    with importer.app.app_context():
+        features = {feature.feature_key: {column: getattr(feature, column) for column in
+                                          ('category', 'feature_n1', 'ec_sonic_2111', 'ec_sonic_2211',
+                                           'ec_sonic_2311_x', 'vs_202311', 'ec_proprietary', 'component')}
+                    for feature in FeatureMap.query.all()}
+        labels = sorted((label.feature_key, label.label) for label in FeatureLabel.query.all())
+    return importer, features, labels
+
+
+def process_rows(importer, df):
+    """Reference output: process_feature_row applied row by row"""
+    results = (importer.process_feature_row(row) for _, row in df.iterrows())
+    return [result for result in results if result is not None]
+
+
+@pytest.mark.parametrize('variant', ['as_is', 'feature_n1', 'edge_cases'])
+def test_normalize_features_matches_process_feature_row(variant):
+    if variant == 'edge_cases':
+        df = pd.DataFrame(EDGE_CASE_ROWS)
+    else:
+        df = pd.read_excel(GOLDEN_FILE, sheet_name='feature_map')
+        if variant == 'feature_n1':
+            # Older sheets name the description column "Feature N1"
+            df = df.rename(columns={'Feature': 'Feature N1'})
+
+    importer = SQLAlchemyFeatureImporter()
+    expected = process_rows(importer, df)
+
+    assert expected
+    assert importer.normalize_features(df) == expected
+
+
+def test_bulk_import_matches_row_import(tmp_path, monkeypatch, feature_file):
+    _, row_features, row_labels = run_import(tmp_path, monkeypatch, feature_file)
+    importer, bulk_features, bulk_labels = run_import(tmp_path, monkeypatch, feature_file,
+                                                      bulk=True, batch_size=2)
+
+    assert bulk_features == row_features
+    assert bulk_labels == row_labels
+    assert set(bulk_features) == {'lag_fallback', 'L3_BGP_EVPN_TYPE_5', 'vxlan'}
+    assert bulk_features['lag_fallback']['ec_sonic_2311_x'] == 'Under Development'
+    assert bulk_features['L3_BGP_EVPN_TYPE_5']['ec_sonic_2111'] is None
+    assert importer.stats['features_inserted'] == 3
+    assert importer.stats['labels_inserted'] == 4
+    assert importer.stats['elapsed_seconds'] > 0
+
+
+def test_bulk_import_skips_duplicate_keys(tmp_path, monkeypatch):
+    path = tmp_path / 'duplicates.xlsx'
+    pd.DataFrame([
+        {'Feature_Key': 'sfp', 'Category': 'System', 'Feature N1': 'SFP', 'Labels': 'a, b, a'},
+        {'Feature_Key': 'sfp', 'Category': 'System', 'Feature N1': 'SFP tuning', 'Labels': 'c'},
+        {'Feature_Key': 'lldp', 'Category': 'L2', 'Feature N1': 'LLDP'},
+    ]).to_excel(path, sheet_name='feature_map', index=False)
+
+    for bulk in (True, False):
+        importer, features, labels = run_import(tmp_path, monkeypatch, path, bulk=bulk, allow_duplicates=True)
+
+        assert set(features) == {'sfp', 'lldp'}
+        assert features['sfp']['feature_n1'] == 'SFP'
+        assert labels == [('sfp', 'a'), ('sfp', 'b')]
+        assert len(importer.stats['errors']) == 1
+
+
+def test_command_line_exit_codes(tmp_path, monkeypatch, feature_file):
+    """Failed validation, imports and benchmark mismatches exit non-zero"""
+    monkeypatch.setenv('PRIMARY_TEST_DB_URL', f"sqlite:///{tmp_path / 'cli.db'}")
+    monkeypatch.chdir(tmp_path)
+    with SQLAlchemyFeatureImporter('testing').create_app().app_context():
+        db.create_all()
+    runner = CliRunner()
+
+    def run(command, *args):
+        return runner.invoke(command, list(args)).exit_code
+
+    duplicate_file = tmp_path / 'duplicates.xlsx'
+    pd.DataFrame([FEATURE_ROWS[0], FEATURE_ROWS[0]]).to_excel(duplicate_file, sheet_name='feature_map', index=False)
+
+    assert run(feature_importer.main, '--env', 'testing', '--file', str(feature_file)) == 0
+    assert run(feature_importer.main, '--env', 'testing', '--file', str(duplicate_file), '--force') == 1
+    assert run(feature_importer.main, '--env', 'testing', '--file', str(duplicate_file), '--dry-run') == 1
+    assert run(feature_importer.main, '--env', 'testing', '--file', str(tmp_path / 'missing.xlsx')) == 1
+    assert run(feature_importer.main, '--incremental', '--swap') == 1
+
+    benchmark_args = ('--file', str(feature_file), '--rows', '10', '--repeat', '1')
+    assert run(benchmark_feature_normalization.main, *benchmark_args) == 0
+    monkeypatch.setattr(SQLAlchemyFeatureImporter, 'normalize_features', lambda self, df: [])
+    assert run(benchmark_feature_normalization.main, *benchmark_args) == 1
+
+
+def test_validation_rejects_bad_file_before_writing(tmp_path, monkeypatch, feature_file):
+    db_path = tmp_path / 'validation.db'
+    run_import(tmp_path, monkeypatch, feature_file, db_path=db_path)
+
+    path = tmp_path / 'bad.xlsx'
+    pd.DataFrame([
+        {'Feature_Key': 'sfp', 'Category': 'System', 'Feature N1': 'SFP', 'EC_SONiC_2111': 'V'},
+        {'Feature_Key': 'sfp', 'Category': 'System', 'Feature N1': 'SFP tuning'},
+        {'Feature_Key': 'L2_LLDP', 'Category': 'L2', 'Feature N1': 'LLDP'},
+        {'Feature_Key': None, 'Category': 'L2', 'Feature N1': 'lldp'},
+        {'Feature_Key': 'long', 'Category': 'x' * 101, 'Feature N1': 'Long', 'Labels': 'ok, ' + 'y' * 101},
+        {'Feature_Key': None, 'Category': None, 'Feature N1': None, 'Component': 'SWSS'},
+    ]).to_excel(path, sheet_name='feature_map', index=False)
+
+    report_path = tmp_path / 'report.json'
+    importer = SQLAlchemyFeatureImporter('testing', bulk=True, report_path=str(report_path))
+    assert not importer.import_features(str(path))
+
+    report = json.loads(report_path.read_text())
+    assert not report['valid']
+    assert report['errors'] == 4
+    assert [(issue['row'], issue['type'], issue['severity']) for issue in report['issues']] == [
+        (2, 'unknown_support_value', 'warning'),
+        (3, 'duplicate_key', 'error'),
+        (5, 'key_collision', 'error'),
+        (6, 'value_too_long', 'error'),
+        (6, 'value_too_long', 'error'),
+        (7, 'missing_key', 'warning'),
+    ]
+    assert report['issues'][3]['column'] == 'Category'
+
+    # The live tables still hold the previous import
+    with importer.app.app_context():
+        assert {feature.feature_key for feature in FeatureMap.query} == {'lag_fallback', 'L3_BGP_EVPN_TYPE_5', 'vxlan'}
+
+
+def test_incremental_import_writes_only_changes(tmp_path, monkeypatch, feature_file):
+    db_path = tmp_path / 'incremental.db'
+    _, features, labels = run_import(tmp_path, monkeypatch, feature_file, db_path=db_path, bulk=True)
+
+    df = pd.read_excel(feature_file, sheet_name='feature_map')
+    df.loc[0, 'EC_SONiC_2111'] = 'X'              # lag_fallback changed
+    df.loc[0, 'Labels'] = 'community, lacp, mlag'  # lag -> mlag
+    df = df.drop(index=2)                          # vxlan removed
+    df = pd.concat([df, pd.DataFrame([{'Feature_Key': 'lldp', 'Category': 'L2',
+                                       'Feature N1': 'LLDP', 'Labels': 'lldp'}])])
+    changed_file = tmp_path / 'changed.xlsx'
+    df.to_excel(changed_file, sheet_name='feature_map', index=False)
+
+    importer, new_features, new_labels = run_import(tmp_path, monkeypatch, changed_file,
+                                                    db_path=db_path, incremental=True)
+
+    assert set(new_features) == {'lag_fallback', 'L3_BGP_EVPN_TYPE_5', 'lldp'}
+    assert new_features['lag_fallback']['ec_sonic_2111'] == 'Not Support'
+    assert new_features['L3_BGP_EVPN_TYPE_5'] == features['L3_BGP_EVPN_TYPE_5']
+    assert new_labels == [('lag_fallback', 'community'), ('lag_fallback', 'lacp'),
+                          ('lag_fallback', 'mlag'), ('lldp', 'lldp')]
+    assert {key: importer.stats[key] for key in ('features_inserted', 'features_updated', 'features_unchanged',
+                                                 'features_deleted', 'labels_inserted', 'labels_deleted')} == {
+        'features_inserted': 1, 'features_updated': 1, 'features_unchanged': 1,
+        'features_deleted': 1, 'labels_inserted': 2, 'labels_deleted': 2,
+    }
+
+    # Re-running the same sheet changes nothing
+    importer, _, _ = run_import(tmp_path, monkeypatch, changed_file, db_path=db_path,
+                                incremental=True, force=True)
+    assert importer.stats['features_unchanged'] == 3
+    assert importer.stats['features_updated'] == importer.stats['labels_inserted'] == 0
+
+
+def test_incremental_import_rebuilds_only_changed_keys(tmp_path, monkeypatch, feature_file):
+    db_path = tmp_path / 'incremental.db'
+    run_import(tmp_path, monkeypatch, feature_file, db_path=db_path, bulk=True)
+
+    rebuilt = []
+    rebuild = FeatureBranchStatus.rebuild.__func__
+    monkeypatch.setattr(FeatureBranchStatus, 'rebuild', classmethod(
+        lambda cls, *args, **kwargs: rebuilt.append(kwargs.get('feature_keys')) or rebuild(cls, *args, **kwargs)))
+
+    df = pd.read_excel(feature_file, sheet_name='feature_map')
+    df.loc[0, 'EC_SONiC_2111'] = 'X'  # lag_fallback changed
+    changed_file = tmp_path / 'changed.xlsx'
+    df.to_excel(changed_file, sheet_name='feature_map', index=False)
+    importer, _, _ = run_import(tmp_path, monkeypatch, changed_file, db_path=db_path, incremental=True)
+
+    assert rebuilt == [['lag_fallback']]
+    with importer.app.app_context():
+        statuses = {(status.feature_key, status.branch.name): status.status for status in FeatureBranchStatus.query}
+        generation = ImportGeneration.current(ImportGeneration.FEATURES)
+    assert statuses[('lag_fallback', 'ec_sonic_2111')] == 'Not Support'
+    assert statuses[('vxlan', 'ec_sonic_2211')] == 'Support'
+
+    # A no-op run leaves the derived tables and the generation alone
+    monkeypatch.setattr(FeatureFacet, 'rebuild', lambda: pytest.fail('facets rebuilt on a no-op run'))
+    importer, _, _ = run_import(tmp_path, monkeypatch, changed_file, db_path=db_path, incremental=True, force=True)
+    assert not importer.has_changes()
+    assert rebuilt == [['lag_fallback']]
+    with importer.app.app_context():
+        assert ImportGeneration.current(ImportGeneration.FEATURES) == generation
+        assert ImportLedger.query.count() == 3
+
+
+def test_swap_import_replaces_tables_atomically(tmp_path, monkeypatch, feature_file):
+    db_path = tmp_path / 'swap.db'
+    _, bulk_features, bulk_labels = run_import(tmp_path, monkeypatch, feature_file, bulk=True)
+
+    # First swap onto an empty database, then a second one over live data
+    for _ in range(2):
+        importer, features, labels = run_import(tmp_path, monkeypatch, feature_file, db_path=db_path,
+                                                swap=True, force=True)
+        assert features == bulk_features
+        assert labels == bulk_labels
+
+    with importer.app.app_context():
+        tables = set(inspect(db.engine).get_table_names())
+        indexes = {name for (name,) in db.session.execute(db.text(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL"))}
+    assert not {name for name in tables if name.endswith(('_staging', '_old'))}
+    # The swapped-in tables carry the indexes the /feature-list filters use
+    assert {'ix_s_feature_label_label_feature_key', 'ix_s_feature_map_lower_ec_proprietary',
+            'ix_s_feature_branch_status_branch_status', 'ix_s_feature_branch_status_status'} <= indexes
+    assert {name for name in indexes if name.startswith('ix_s_feature_map_')} == {'ix_s_feature_map_lower_ec_proprietary'}
+
+
+def test_failed_swap_leaves_live_tables_untouched(tmp_path, monkeypatch, feature_file):
+    db_path = tmp_path / 'swap.db'
+    _, features, labels = run_import(tmp_path, monkeypatch, feature_file, db_path=db_path, bulk=True)
+
+    changed_file = tmp_path / 'changed.xlsx'
+    pd.DataFrame([{'Feature_Key': 'lldp', 'Category': 'L2', 'Feature N1': 'LLDP'}]) \
+        .to_excel(changed_file, sheet_name='feature_map', index=False)
+
+    def fail_rebuild():
+        raise RuntimeError('facet rebuild failed')
+
+    monkeypatch.setattr(FeatureFacet, 'rebuild', fail_rebuild)
+    importer = SQLAlchemyFeatureImporter('testing', swap=True)
+    assert not importer.import_features(str(changed_file))
+
+    with importer.app.app_context():
+        assert {feature.feature_key for feature in FeatureMap.query.all()} == set(features)
+        assert FeatureLabel.query.count() == len(labels)
+        assert not [name for name in inspect(db.engine).get_table_names() if name.endswith(('_staging', '_old'))]
+
+
+@pytest.mark.parametrize('mode', [{}, {'bulk': True}, {'incremental': True}, {'swap': True}])
+def test_registered_branch_is_imported_and_filterable(tmp_path, monkeypatch, mode):
+    """A branch added only to s_branch is read from its excel_column and filtered like the others"""
+    db_path = tmp_path / 'registry.db'
+    monkeypatch.setenv('PRIMARY_TEST_DB_URL', f"sqlite:///{db_path}")
+    monkeypatch.chdir(tmp_path)
+    with SQLAlchemyFeatureImporter('testing').create_app().app_context():
+        db.create_all()
+        Branch.ensure_defaults()
+        db.session.add(Branch(name='ec_sonic_2411', display_name='EC 2411', excel_column='EC SONiC 2411',
+                              sort_order=len(Branch.DEFAULT_BRANCHES)))
+        db.session.commit()
+
+    rows = [dict(row) for row in FEATURE_ROWS]
+    rows[0]['EC SONiC 2411'] = 'O'
+    rows[1]['EC SONiC 2411'] = 'X'
+    rows[2]['EC SONiC 2411'] = 'D'
+    path = tmp_path / 'registry.xlsx'
+    pd.DataFrame(rows).to_excel(path, sheet_name='feature_map', index=False)
+    importer, _, _ = run_import(tmp_path, monkeypatch, path, db_path=db_path, **mode)
+
+    def filtered(*filters):
+        return {feature.feature_key for feature in apply_feature_filters(FeatureMap.query, *filters)}
+
+    with importer.app.app_context():
+        assert filtered('', 'ec_sonic_2411', '', '') == {'lag_fallback'}
+        assert filtered('', '', 'Under Development', '') == {'lag_fallback', 'vxlan'}
+        facets = FeatureFacet.load()
+        assert facets['branch:ec_sonic_2411'] == {'Not Support': 1, 'Support': 1, 'Under Development': 1}
+        assert facets[FeatureFacet.SUPPORT]['Under Development'] == 2
+
+    feature_matrix_cache.clear()
+    page = create_app('testing').test_client().get('/feature-list?branch=ec_sonic_2411').get_data(as_text=True)
+    assert '1 features found' in page
+    assert '<option value="ec_sonic_2411" selected>EC 2411 (1)</option>' in page
+
+
+def test_sync_branches_rebuilds_facets_and_bumps_generation(tmp_path, monkeypatch, feature_file):
+    """Cached pages and ETags follow a manual branch sync like an import"""
+    importer, _, _ = run_import(tmp_path, monkeypatch, feature_file)
+    monkeypatch.setenv('FLASK_ENV', 'testing')  # restored after sync-branches sets it
+    with importer.app.app_context():
+        db.session.get(FeatureMap, 'vxlan').ec_sonic_2111 = 'Support'
+        db.session.commit()
+        generation = db.session.get(ImportGeneration, ImportGeneration.FEATURES).generation
+
+    result = CliRunner().invoke(db_manager.cli, ['sync-branches', '--env', 'testing'])
+
+    assert result.exit_code == 0, result.output
+    with importer.app.app_context():
+        assert db.session.get(ImportGeneration, ImportGeneration.FEATURES).generation == generation + 1
+        assert FeatureFacet.load()['branch:ec_sonic_2111'] == {'Support': 2}
+
+
+def test_unchanged_file_is_skipped_unless_forced(tmp_path, monkeypatch, feature_file):
+    db_path = tmp_path / 'ledger.db'
+    run_import(tmp_path, monkeypatch, feature_file, db_path=db_path, bulk=True)
+
+    importer, features, _ = run_import(tmp_path, monkeypatch, feature_file, db_path=db_path, bulk=True)
+    assert importer.stats['skipped'].startswith('file unchanged')
+    assert importer.stats['features_processed'] == 0
+    assert len(features) == 3
+
+    # Same sheet contents in a different file are skipped after parsing
+    copy = tmp_path / 'copy.xlsx'
+    pd.read_excel(feature_file, sheet_name='feature_map').to_excel(copy, sheet_name='feature_map', index=False)
+    importer, _, _ = run_import(tmp_path, monkeypatch, copy, db_path=db_path, incremental=True)
+    assert importer.stats['skipped'].startswith('sheet contents unchanged')
+
+    importer, _, _ = run_import(tmp_path, monkeypatch, feature_file, db_path=db_path, incremental=True, force=True)
+    assert importer.stats['skipped'] is None
+    assert importer.stats['features_unchanged'] == 3
+
+    with importer.app.app_context():
+        entries = ImportLedger.query.order_by(ImportLedger.id).all()
+        assert len(entries) == 2
+        assert entries[-1].row_count == len(FEATURE_ROWS)
+        assert entries[-1].file_sha256 == importer.file_fingerprint(str(feature_file))['file_sha256']
+
+
+def test_multi_sheet_import_parses_sheets_in_workers(tmp_path, monkeypatch, feature_file):
+    platform_rows = [
+        {'Feature_Key': 'pfc_wd', 'Category': 'QoS', 'Feature N1': 'PFC Watchdog', 'VS_202311': 'O', 'Labels': 'qos'},
+        {'Feature_Key': 'vxlan', 'Category': 'Overlay', 'Feature N1': 'VXLAN again'},
+    ]
+    with pd.ExcelWriter(feature_file, mode='a') as writer:
+        pd.DataFrame(platform_rows).to_excel(writer, sheet_name='platform', index=False)
+
+    db_path = tmp_path / 'sheets.db'
+    run_import(tmp_path, monkeypatch, feature_file, db_path=db_path, bulk=True)
+    importer, features, labels = run_import(tmp_path, monkeypatch, feature_file, db_path=db_path, bulk=True,
+                                            sheets=['feature_map', 'platform'], workers=2,
+                                            allow_duplicates=True)
+
+    # A different sheet selection of the same file is not skipped by the ledger
+    assert importer.stats['skipped'] is None
+    assert set(features) == {'lag_fallback', 'L3_BGP_EVPN_TYPE_5', 'vxlan', 'pfc_wd'}
+    assert features['vxlan']['feature_n1'] == 'VXLAN'
+    assert features['pfc_wd']['vs_202311'] == 'Support'
+    assert ('pfc_wd', 'qos') in labels
+    assert importer.stats['errors'] == ['Feature vxlan: duplicate key, skipped']
+    assert importer.stats['validation']['counts'] == {'missing_key': 1, 'duplicate_key': 1}
+
+    with importer.app.app_context():
+        assert ImportLedger.latest('features').sheet_names == 'feature_map,platform'
+
+
+@pytest.mark.skipif(not excel_loader.HAS_PARQUET, reason='the parsed-sheet cache needs pyarrow')
+def test_excel_loader_caches_parsed_sheet(tmp_path, feature_file):
+    df, from_cache = excel_loader.load_sheet(str(feature_file), 'feature_map', EXCEL_COLUMNS)
+    assert not from_cache
+    assert list(df.columns) == list(pd.DataFrame(FEATURE_ROWS).columns)
+
+    cached, from_cache = excel_loader.load_sheet(str(feature_file), 'feature_map', EXCEL_COLUMNS)
+    assert from_cache
+    pd.testing.assert_frame_equal(cached, df)
+
+    # Only the requested columns are read
+    subset, _ = excel_loader.load_sheet(str(feature_file), 'feature_map', ['Feature_Key', 'Missing'])
+    assert list(subset.columns) == ['Feature_Key']
+
+    # A new version of the file misses the cache and drops the old entries
+    old_files = set(os.listdir(tmp_path / excel_loader.CACHE_DIR_NAME))
+    pd.DataFrame(FEATURE_ROWS[:1]).to_excel(feature_file, sheet_name='feature_map', index=False)
+    df, from_cache = excel_loader.load_sheet(str(feature_file), 'feature_map', EXCEL_COLUMNS)
+    assert not from_cache
+    assert len(df) == 1
+    assert not old_files & set(os.listdir(tmp_path / excel_loader.CACHE_DIR_NAME))
+
+
+def test_excel_loader_never_loads_pickle(tmp_path, monkeypatch, feature_file):
+    """Without pyarrow sheets are re-parsed; a planted pickle is neither written nor read"""
+    monkeypatch.setattr(excel_loader, 'HAS_PARQUET', False)
+    file_hash = excel_loader.file_sha256(str(feature_file))
+    prefix = (f"{excel_loader.cache_prefix(str(feature_file), file_hash)}."
+              f"{excel_loader.sheet_cache_key('feature_map', EXCEL_COLUMNS)}")
+    os.makedirs(os.path.dirname(prefix), exist_ok=True)
+    pd.DataFrame({'Feature_Key': ['planted']}).to_pickle(f"{prefix}.pkl")
+
+    for _ in range(2):
+        df, from_cache = excel_loader.load_sheet(str(feature_file), 'feature_map', EXCEL_COLUMNS)
+        assert not from_cache
+        assert len(df) == len(FEATURE_ROWS)
+    assert os.listdir(tmp_path / excel_loader.CACHE_DIR_NAME) == [os.path.basename(f"{prefix}.pkl")]
+
+
+def count_rows(df, sheet_name):
+    """load_sheets transform (module-level so worker processes can unpickle it)"""
+    return len(df)
+
+
+def test_excel_loader_loads_sheets_in_parallel(tmp_path, feature_file):
+    with pd.ExcelWriter(feature_file, mode='a') as writer:
+        pd.DataFrame(FEATURE_ROWS[:2]).to_excel(writer, sheet_name='second', index=False)
+
+    progress = []
+    sheets = excel_loader.load_sheets(str(feature_file), ['feature_map', 'second'], EXCEL_COLUMNS, workers=2,
+                                      transform=count_rows, progress=lambda *args: progress.append(args))
+    assert sheets == {'feature_map': (len(FEATURE_ROWS), False), 'second': (2, False)}
+    assert sorted(done for done, total, *_ in progress) == [1, 2]
+
+    # Cached sheets come back from the cache (with pyarrow), in-process with one worker
+    sheets = excel_loader.load_sheets(str(feature_file), ['feature_map', 'second'], EXCEL_COLUMNS, workers=1)
+    assert [from_cache for _, from_cache in sheets.values()] == [excel_loader.HAS_PARQUET] * 2
+
+
+def test_history_import_versions_snapshots(tmp_path, monkeypatch):
+    snapshots = {
+        'data/archieve/EC_SONiC_Feature.20250101.xlsx': [
+            {'Feature_Key': 'lldp', 'Category': 'L2', 'Feature N1': 'LLDP', 'EC SONiC 2311.N': 'X'},
+            {'Feature_Key': 'sfp', 'Category': 'System', 'Feature N1': 'SFP', 'Labels': 'optics'},
+        ],
+        'data/archieve/EC_SONiC_Feature.20250201.xlsx': [
+            {'Feature_Key': 'lldp', 'Category': 'L2', 'Feature N1': 'LLDP', 'EC SONiC 2311.N': 'D'},
+            {'Feature_Key': 'sfp', 'Category': 'System', 'Feature N1': 'SFP', 'Labels': 'optics'},
+        ],
+        # Superseded by the copy in data/
+        'data/archieve/EC_SONiC_Feature.20250301.xlsx': [
+            {'Feature_Key': 'stale', 'Category': 'L2', 'Feature N1': 'Stale'},
+        ],
+        'data/EC_SONiC_Feature.20250301.xlsx': [
+            {'Feature_Key': 'lldp', 'Category': 'L2', 'Feature N1': 'LLDP', 'EC SONiC 2311.N': 'O'},
+        ],
+        'data/EC_SONiC_Feature.20250401.xlsx': [
+            {'Feature_Key': 'lldp', 'Category': 'L2', 'Feature N1': 'LLDP', 'EC SONiC 2311.N': 'O'},
+            {'Feature_Key': 'sfp', 'Category': 'System', 'Feature N1': 'SFP', 'Labels': 'optics'},
+        ],
+        # Unusable snapshot: reported and skipped
+        'data/EC_SONiC_Feature.20250501.xlsx': [{'Feature_Key': 'lldp', 'Category': 'L2', 'Feature': 'LLDP'}],
+    }
+    for name, rows in snapshots.items():
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        pd.DataFrame(rows).to_excel(tmp_path / name, sheet_name='feature_map', index=False)
+    monkeypatch.setenv('PRIMARY_TEST_DB_URL', f"sqlite:///{tmp_path / 'history.db'}")
+    monkeypatch.chdir(tmp_path)
+
+    importer = SQLAlchemyFeatureImporter('testing')
+    with importer.create_app().app_context():
+        db.create_all()
+    assert importer.import_history(workers=2)
+    assert importer.stats['snapshots_loaded'] == 4
+    assert len(importer.stats['errors']) == 1
+
+    with importer.app.app_context():
+        versions = [(row.feature_key, str(row.valid_from), row.valid_to and str(row.valid_to), row.ec_sonic_2311_n)
+                    for row in FeatureHistory.query.order_by(FeatureHistory.feature_key, FeatureHistory.valid_from)]
+        first_support = FeatureHistory.first_status_dates('lldp')
+        assert db.session.get(ImportGeneration, ImportGeneration.FEATURES).generation == 1
+
+    assert versions == [
+        ('lldp', '2025-01-01', '2025-02-01', 'Not Support'),
+        ('lldp', '2025-02-01', '2025-03-01', 'Under Development'),
+        ('lldp', '2025-03-01', None, 'Support'),
+        ('sfp', '2025-01-01', '2025-03-01', None),
+        ('sfp', '2025-04-01', None, None),
+    ]
+    assert first_support['ec_sonic_2311_n'] == datetime.date(2025, 3, 1)
+    assert first_support['ec_sonic_2111'] is None
+
+    from app import create_app
+    client = create_app('testing').test_client()
+    response = client.get('/api/feature-history?feature_key=lldp')
+    assert response.status_code == 200
+    first_status = {entry['branch']: entry['date'] for entry in response.get_json()['first_status']}
+    assert first_status['ec_sonic_2311_n'] == '2025-03-01'
+    assert client.get('/api/feature-history?feature_key=missing').status_code == 404
+    assert b'2025-03-01' in client.get('/feature-history?feature_key=lldp').data
+
+
+def test_progress_output_modes(tmp_path, monkeypatch, capsys, feature_file):
+    run_import(tmp_path, monkeypatch, feature_file)
+    assert 'Feature processed' not in capsys.readouterr().out
+
+    run_import(tmp_path, monkeypatch, feature_file, verbose=True)
+    assert capsys.readouterr().out.count('✅ Feature processed') == 3
+
+    run_import(tmp_path, monkeypatch, feature_file, bulk=True, batch_size=2, log_format='json')
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines() if line.startswith('{')]
+    records = [record for record in records if record['event'] == 'batch']
+    assert [(record['phase'], record['rows'], record['done']) for record in records] == [
+        ('s_feature_map', 2, 2), ('s_feature_map', 1, 3),
+        ('s_feature_label', 2, 2), ('s_feature_label', 2, 4),
+    ]
+    assert records[-1]['total'] == 4
+    assert records[-1]['eta_seconds'] == 0
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Tests for the /feature-list route
+"""
+import gzip
+import types
+import zlib
+import pytest
+from sqlalchemy import event
+from app import create_app
+from models.base import db
+from models import FeatureMap, FeatureLabel, Branch, FeatureBranchStatus, FeatureFacet, ImportGeneration
+from routes_sqlalchemy import apply_feature_filters
+from feature_cache import feature_matrix_cache, TTLCache
+import http_cache
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """Flask app backed by an in-memory SQLite database"""
+    monkeypatch.setenv('PRIMARY_TEST_DB_URL', 'sqlite:///:memory:')
+    monkeypatch.chdir(tmp_path)  # keep requests.log out of the repo
+    app = create_app('testing')
+    feature_matrix_cache.clear()
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def seed_features(count):
+    """Insert count features with two labels each"""
+    for i in range(count):
+        feature_key = f"FEATURE_{i:05d}"
+        db.session.add(FeatureMap(feature_key=feature_key, category='L2',
+                                  feature_n1=f"Feature {i}",
+                                  ec_sonic_2111='Support' if i % 20 == 0 else 'Not Support',
+                                  ec_sonic_2211='Under Development' if i % 50 == 0 else None,
+                                  ec_proprietary='COMMUNITY' if i % 20 == 0 else 'EC'))
+        db.session.add(FeatureLabel(feature_key=feature_key, label='community'))
+        db.session.add(FeatureLabel(feature_key=feature_key, label=f"label_{i % 7}"))
+    db.session.commit()
+
+
+def count_statements(app, url):
+    """Return the number of SQL statements issued while serving url"""
+    statements = []
+    
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        response = app.test_client().get(url)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+    
+    assert response.status_code == 200
+    assert b'Database Error' not in response.data
+    return len(statements)
+
+
+def test_feature_list_statement_count_is_constant(app):
+    """Labels must be loaded in bulk, not with one SELECT per rendered feature"""
+    app.config['FEATURE_CACHE_ENABLED'] = False
+    seed_features(1000)
+    
+    small_page = count_statements(app, '/feature-list?page_size=5')
+    full_page = count_statements(app, '/feature-list?page_size=500')
+    filtered_page = count_statements(app, '/feature-list?page_size=500&label=community')
+    
+    assert full_page == small_page
+    assert filtered_page == small_page
+
+
+def test_feature_list_pages_with_cursor(app):
+    """The next link continues exactly where the previous page stopped"""
+    seed_features(12)
+    client = app.test_client()
+    
+    first = client.get('/feature-list?page_size=10').get_data(as_text=True)
+    assert '12 features found' in first
+    assert 'FEATURE_00009' in first and 'FEATURE_00010' not in first
+    
+    next_url = None
+    for chunk in first.split('href="')[1:]:
+        url = chunk.split('"', 1)[0].replace('&amp;', '&')
+        if 'after=' in url:
+            next_url = url
+    assert next_url is not None
+    
+    second = client.get(next_url).get_data(as_text=True)
+    assert 'FEATURE_00010' in second and 'FEATURE_00011' in second
+    assert 'FEATURE_00009' not in second
+
+
+def test_feature_list_cache_invalidated_by_import_generation(app):
+    """Cached pages are reused until an import bumps the generation"""
+    seed_features(3)
+    client = app.test_client()
+    
+    assert '3 features found' in client.get('/feature-list').get_data(as_text=True)
+    
+    # New rows without a generation bump are not visible yet (served from cache)
+    db.session.add(FeatureMap(feature_key='FEATURE_NEW'))
+    db.session.commit()
+    assert count_statements(app, '/feature-list') == 1
+    assert 'FEATURE_NEW' not in client.get('/feature-list').get_data(as_text=True)
+    
+    # Committing an import generation invalidates the cache immediately
+    ImportGeneration.bump(ImportGeneration.FEATURES)
+    db.session.commit()
+    page = client.get('/feature-list').get_data(as_text=True)
+    assert '4 features found' in page
+    assert 'FEATURE_NEW' in page
+
+
+def test_feature_api_etag_follows_import_generation(app):
+    """/api/features answers 304 until an import - including updates and deletes - lands"""
+    seed_features(3)
+    ImportGeneration.bump(ImportGeneration.FEATURES)
+    db.session.commit()
+    client = app.test_client()
+    
+    def fetch(etag=None):
+        headers = {'If-None-Match': etag} if etag else {}
+        response = client.get('/api/features', headers=headers)
+        response.get_data()  # drain the stream so its request context closes
+        return response
+    
+    first = fetch()
+    assert first.status_code == 200
+    assert len(first.get_data(as_text=True).splitlines()) == 3
+    assert first.last_modified is not None
+    etag = first.headers['ETag'].strip('"')
+    assert fetch(etag).status_code == 304
+    
+    # Each importer write commits together with a generation bump
+    changes = [
+        lambda: db.session.add(FeatureMap(feature_key='FEATURE_NEW')),
+        lambda: setattr(db.session.get(FeatureMap, 'FEATURE_00001'), 'ec_sonic_2111', 'Support'),
+        lambda: db.session.delete(db.session.get(FeatureMap, 'FEATURE_00002')),
+    ]
+    for change in changes:
+        change()
+        ImportGeneration.bump(ImportGeneration.FEATURES)
+        db.session.commit()
+        
+        response = fetch(etag)
+        assert response.status_code == 200
+        new_etag = response.headers['ETag'].strip('"')
+        assert new_etag != etag
+        assert fetch(new_etag).status_code == 304
+        etag = new_etag
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    
+    expired = TTLCache(maxsize=2, ttl=-1)
+    expired.set('a', 1)
+    assert expired.get('a') is None
+
+
+def test_facet_counts_match_filtered_results(app):
+    """Every count shown in the filter bar equals the rows that filter returns"""
+    seed_features(200)
+    Branch.ensure_defaults()
+    FeatureBranchStatus.rebuild()
+    FeatureFacet.rebuild()
+    db.session.commit()
+    
+    client = app.test_client()
+    facets = FeatureFacet.load()
+    
+    def filtered_count(*filters):
+        return apply_feature_filters(FeatureMap.query, *filters).order_by(None).count()
+    
+    assert facets[FeatureFacet.LABEL]
+    for label, count in facets[FeatureFacet.LABEL].items():
+        assert filtered_count(label, '', '', '') == count, label
+    
+    # The branch filter selects the 'Support' status of one branch
+    for branch in Branch.query.all():
+        count = facets.get(FeatureFacet.branch_facet(branch.name), {}).get('Support', 0)
+        assert filtered_count('', branch.name, '', '') == count, branch.name
+    
+    assert facets[FeatureFacet.SUPPORT]
+    for status, count in facets[FeatureFacet.SUPPORT].items():
+        assert filtered_count('', '', status, '') == count, status
+    
+    for source, value in (('community', 'COMMUNITY'), ('edgecore', 'EC')):
+        count = facets[FeatureFacet.SOURCE][value]
+        assert filtered_count('', '', '', source) == count
+        assert f"{count} features found" in client.get(f"/feature-list?source={source}").get_data(as_text=True)
+
+
+def test_branch_diff_lists_gained_and_lost_features(app):
+    """/api/branch-diff returns the set differences between two branches"""
+    statuses = {
+        'BOTH': ('Support', 'Support'),
+        'GAINED': ('Not Support', 'Support'),
+        'NEW_ON_TARGET': (None, 'Support'),
+        'LOST': ('Support', 'Under Development'),
+        'NEITHER': ('Not Support', 'Not Support'),
+    }
+    for feature_key, (base, target) in statuses.items():
+        db.session.add(FeatureMap(feature_key=feature_key, category='L2', feature_n1=feature_key.title(),
+                                  ec_sonic_2111=base, ec_sonic_2211=target))
+    Branch.ensure_defaults()
+    FeatureBranchStatus.rebuild()
+    db.session.commit()
+    client = app.test_client()
+    
+    diff = client.get('/api/branch-diff?base=ec_sonic_2111&target=ec_sonic_2211').get_json()
+    assert diff['base']['name'] == 'ec_sonic_2111' and diff['target']['name'] == 'ec_sonic_2211'
+    assert diff['status'] == 'Support'
+    assert [(row['feature_key'], row['other_status']) for row in diff['gained']] == [
+        ('GAINED', 'Not Support'), ('NEW_ON_TARGET', None)]
+    assert [(row['feature_key'], row['other_status']) for row in diff['lost']] == [('LOST', 'Under Development')]
+    assert diff['lost'][0]['feature_description'] == 'Lost'
+    
+    # Swapping the branches swaps gained and lost; other statuses diff the same way
+    reverse = client.get('/api/branch-diff?base=ec_sonic_2211&target=ec_sonic_2111').get_json()
+    assert [row['feature_key'] for row in reverse['gained']] == ['LOST']
+    assert [row['feature_key'] for row in reverse['lost']] == ['GAINED', 'NEW_ON_TARGET']
+    not_support = client.get('/api/branch-diff?base=ec_sonic_2111&target=ec_sonic_2211&status=Not+Support')
+    assert [row['feature_key'] for row in not_support.get_json()['lost']] == ['GAINED']
+    
+    page = client.get('/branch-diff?base=ec_sonic_2111&target=ec_sonic_2211').get_data(as_text=True)
+    assert 'GAINED' in page and 'LOST' in page and 'NEITHER' not in page
+    
+    assert client.get('/api/branch-diff?base=ec_sonic_2111&target=nope').status_code == 404
+    response = client.get('/branch-diff?base=ec_sonic_2111&target=nope')
+    page = response.get_data(as_text=True)
+    assert response.status_code == 400
+    assert 'Unknown branch: nope' in page and 'Database Error' not in page
+    assert '<option value="ec_sonic_2111" selected>' in page
+    assert client.get('/api/branch-diff?base=ec_sonic_2111').status_code == 400
+
+
+@pytest.mark.parametrize('accept, brotli_installed, encoding', [
+    ('gzip, deflate', False, 'gzip'),
+    ('br, gzip', False, 'gzip'),   # no brotli module: gzip is the fallback
+    ('br', False, None),
+    ('br, gzip', True, 'br'),
+    ('gzip;q=1.0, br;q=0.5', True, 'gzip'),
+    ('identity', True, None),
+])
+def test_responses_negotiate_compression(app, monkeypatch, accept, brotli_installed, encoding):
+    """HTML bodies are compressed with the best accepted encoding and always vary on it"""
+    fake_brotli = types.SimpleNamespace(compress=lambda data, quality: b'br:' + zlib.compress(data),
+                                        decompress=lambda data: zlib.decompress(data[3:]))
+    monkeypatch.setattr(http_cache, 'brotli', fake_brotli if brotli_installed else None)
+    seed_features(20)
+    client = app.test_client()
+    
+    plain = client.get('/feature-list', headers={'Accept-Encoding': 'identity'})
+    response = client.get('/feature-list', headers={'Accept-Encoding': accept})
+    
+    assert 'Accept-Encoding' in response.vary
+    assert response.content_encoding == encoding
+    decompress = {'gzip': gzip.decompress, 'br': fake_brotli.decompress, None: bytes}[encoding]
+    assert decompress(response.get_data()) == plain.get_data()
+    if encoding:
+        assert len(response.get_data()) < len(plain.get_data())
+
+
+def test_small_and_conditional_responses_are_not_compressed(app):
+    client = app.test_client()
+    
+    # Below COMPRESS_MIN_SIZE
+    small = client.get('/api/search?q=', headers={'Accept-Encoding': 'gzip'})
+    assert small.status_code == 200 and small.is_json
+    assert small.content_encoding is None
+    assert 'Accept-Encoding' in small.vary
+    
+    # Conditional pages keep a weak ETag when compressed and answer 304 without a body
+    page = client.get('/about', headers={'Accept-Encoding': 'gzip'})
+    assert page.content_encoding == 'gzip'
+    etag, weak = page.get_etag()
+    assert weak
+    not_modified = client.get('/about', headers={'Accept-Encoding': 'gzip', 'If-None-Match': f'W/"{etag}"'})
+    assert not_modified.status_code == 304
+    assert not_modified.content_encoding is None and not not_modified.get_data()
+    assert 'Accept-Encoding' in not_modified.vary
+
+
+def query_plan(query):
+    """Return SQLite's EXPLAIN QUERY PLAN details for an ORM query"""
+    sql = str(query.statement.compile(db.engine, compile_kwargs={'literal_binds': True}))
+    rows = db.session.execute(db.text(f"EXPLAIN QUERY PLAN {sql}")).all()
+    return ' | '.join(row[-1] for row in rows)
+
+
+@pytest.mark.parametrize('filters, table, index_name', [
+    (('community', '', '', ''), 's_feature_label', 'ix_s_feature_label_label_feature_key'),
+    (('', '', '', 'community'), 's_feature_map', 'ix_s_feature_map_lower_ec_proprietary'),
+    # either composite (branch_id, status) / (status, branch_id) index will do
+    (('', 'ec_sonic_2111', '', ''), 's_feature_branch_status', 'ix_s_feature_branch_status_'),
+    (('', '', 'Under Development', ''), 's_feature_branch_status', 'ix_s_feature_branch_status_status'),
+])
+def test_feature_filters_use_indexes(app, filters, table, index_name):
+    """Each /feature-list filter is served by its index, not a table scan"""
+    seed_features(200)
+    Branch.ensure_defaults()
+    FeatureBranchStatus.rebuild()
+    db.session.commit()
+    db.session.execute(db.text('ANALYZE'))
+    
+    plan = query_plan(apply_feature_filters(FeatureMap.query, *filters))
+    assert index_name in plan
+    assert f"SCAN {table}" not in plan
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Tests for the Alembic migrations (flask db upgrade)
+"""
+import os
+import pytest
+from flask_migrate import downgrade, upgrade
+from sqlalchemy import inspect
+from app import create_app
+from models.base import db
+from models import FeatureMap, FeatureLabel, Branch, FeatureBranchStatus
+from routes_sqlalchemy import apply_feature_filters, compute_branch_diff
+
+MIGRATIONS = os.path.join(os.path.dirname(__file__), 'migrations')
+
+
+def schema(engine):
+    """{table: (columns, indexes)} without the Alembic bookkeeping table"""
+    inspector = inspect(engine)
+    return {table: (sorted(column['name'] for column in inspector.get_columns(table)),
+                    sorted(index['name'] for index in inspector.get_indexes(table)))
+            for table in inspector.get_table_names() if table != 'alembic_version'}
+
+
+@pytest.fixture
+def make_app(tmp_path, monkeypatch):
+    """Build an app on a new SQLite file database"""
+    monkeypatch.chdir(tmp_path)  # keep requests.log out of the repo
+
+    def make(name):
+        monkeypatch.setenv('PRIMARY_TEST_DB_URL', f"sqlite:///{tmp_path / name}.db")
+        return create_app('testing')
+    return make
+
+
+@pytest.mark.filterwarnings('ignore:Skipped unsupported reflection')
+@pytest.mark.parametrize('start', ['empty', 'baseline', 'create_all'])
+def test_upgrade_reaches_the_model_schema(make_app, start):
+    expected_app = make_app('expected')
+    with expected_app.app_context():
+        db.create_all()
+        expected = schema(db.engine)
+
+    app = make_app(start)
+    with app.app_context():
+        if start == 'baseline':
+            # The schema from before migrations existed, with data
+            db.metadata.create_all(db.engine, tables=[FeatureMap.__table__, FeatureLabel.__table__])
+            db.session.add_all([
+                FeatureMap(feature_key='lag_fallback', ec_sonic_2111='Support', ec_sonic_2211='Support'),
+                FeatureMap(feature_key='vxlan', ec_sonic_2111='Not Support', ec_sonic_2211='Support'),
+            ])
+            db.session.commit()
+        elif start == 'create_all':
+            db.create_all()
+
+        upgrade(directory=MIGRATIONS)
+        assert schema(db.engine) == expected
+        upgrade(directory=MIGRATIONS)  # already at head: no-op
+
+        assert [branch.name for branch in Branch.query.order_by(Branch.sort_order)] == [
+            name for name, _, _ in Branch.DEFAULT_BRANCHES]
+
+        if start == 'baseline':
+            # The branch filters read the backfilled statuses without a re-import
+            assert FeatureBranchStatus.query.count() == 4
+            assert [feature.feature_key for feature in apply_feature_filters(
+                FeatureMap.query, branch_filter='ec_sonic_2111')] == ['lag_fallback']
+            assert apply_feature_filters(FeatureMap.query, support_filter='Not Support').count() == 1
+            diff = compute_branch_diff(Branch.query.filter_by(name='ec_sonic_2111').one(),
+                                       Branch.query.filter_by(name='ec_sonic_2211').one())
+            assert [feature['feature_key'] for feature in diff['gained']] == ['vxlan']
+
+            assert FeatureMap.query.count() == 2
+            downgrade(directory=MIGRATIONS, revision='base')
+            assert set(inspect(db.engine).get_table_names()) == {'alembic_version', 's_feature_map', 's_feature_label'}
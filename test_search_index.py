@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Tests for the full-text search index (search_index.py)
+"""
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, text
+import search_index
+from app import create_app
+from feature_importer import SQLAlchemyFeatureImporter
+from models.base import db
+
+DOCUMENTS = {
+    'lag_fallback': ('LACP Fallback', 'lag_fallback L2 community portchannel'),
+    'vxlan': ('VXLAN', 'vxlan Overlay SWSS evpn'),
+    'bgp_100%': ('BGP Unnumbered', 'bgp_100% L3 routing'),
+}
+
+
+@pytest.fixture
+def connection():
+    """Connection to an in-memory SQLite database, rolled back afterwards"""
+    engine = create_engine('sqlite://')
+    with engine.connect() as connection:
+        yield connection
+    engine.dispose()
+
+
+def found(connection, query, doc_type=None):
+    """doc_keys returned by a search, best match first"""
+    _, results = search_index.search(connection, query, doc_type)
+    return [result['doc_key'] for result in results]
+
+
+def test_fts5_index_matches_names_and_labels_and_follows_updates(connection):
+    search_index.ensure_search_index(connection)
+    assert search_index.has_fts_table(connection)
+    search_index.refresh_documents(connection, search_index.DOC_TYPE_FEATURE, DOCUMENTS)
+
+    assert found(connection, 'fallback') == ['lag_fallback']  # feature name
+    assert found(connection, 'portchannel') == ['lag_fallback']  # label
+    assert found(connection, 'VXLAN evpn') == ['vxlan']
+    assert found(connection, 'portchannel', search_index.DOC_TYPE_TESTCASE) == []
+    total, results = search_index.search(connection, 'evpn')
+    assert total == 1
+    assert f"{search_index.HIGHLIGHT_START}evpn{search_index.HIGHLIGHT_END}" in results[0]['snippet']
+
+    # The triggers keep s_search_fts in step with updates and deletes
+    changed = dict(DOCUMENTS, lag_fallback=('LACP Fallback', 'lag_fallback L2 community mlag'))
+    del changed['vxlan']
+    stats = search_index.refresh_documents(connection, search_index.DOC_TYPE_FEATURE, changed)
+    assert stats == {'inserted': 0, 'updated': 1, 'deleted': 1}
+    assert found(connection, 'portchannel') == []
+    assert found(connection, 'mlag') == ['lag_fallback']
+    assert found(connection, 'evpn') == []
+    assert connection.execute(text("SELECT count(*) FROM s_search_fts")).scalar() == len(changed)
+
+
+def test_like_fallback_without_fts5(connection, monkeypatch):
+    monkeypatch.setattr(search_index, 'has_fts5', lambda connection: False)
+    search_index.ensure_search_index(connection)
+    assert not search_index.has_fts_table(connection)
+    search_index.refresh_documents(connection, search_index.DOC_TYPE_FEATURE, DOCUMENTS)
+
+    assert found(connection, 'Fallback') == ['lag_fallback']
+    assert found(connection, 'portchannel') == ['lag_fallback']
+    assert found(connection, 'vxlan EVPN') == ['vxlan']
+    assert found(connection, 'portchannel evpn') == []
+    assert found(connection, '100%') == ['bgp_100%']
+    assert found(connection, '%') == ['bgp_100%']  # wildcards are matched literally
+
+    # Title matches rank above body-only matches
+    assert found(connection, 'l2')[0] == 'lag_fallback'
+    documents = dict(DOCUMENTS, l2_title=('L2 Features', 'summary'))
+    search_index.refresh_documents(connection, search_index.DOC_TYPE_FEATURE, documents)
+    assert found(connection, 'l2') == ['l2_title', 'lag_fallback']
+
+    _, results = search_index.search(connection, 'portchannel')
+    assert f"{search_index.HIGHLIGHT_START}portchannel{search_index.HIGHLIGHT_END}" in results[0]['snippet']
+
+
+class RecordingConnection:
+    """Stand-in for a PostgreSQL connection that records the SQL it is given"""
+
+    class dialect:
+        name = 'postgresql'
+
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, statement, params=None):
+        self.statements.append((str(statement), params))
+        return self
+
+    def scalar(self):
+        return 0
+
+    def all(self):
+        return []
+
+
+def test_postgresql_uses_tsvector_and_gin_index():
+    connection = RecordingConnection()
+    search_index.ensure_search_index(connection)
+    ddl = ' '.join(statement for statement, _ in connection.statements)
+    assert 'search_vector tsvector GENERATED ALWAYS' in ddl
+    assert 'USING GIN (search_vector)' in ddl
+
+    connection.statements.clear()
+    assert search_index.search(connection, 'lacp fallback', search_index.DOC_TYPE_FEATURE) == (0, [])
+    (count_sql, params), (search_sql, _) = connection.statements
+    assert "search_vector @@ websearch_to_tsquery('english', :query)" in count_sql
+    assert 'ts_rank_cd' in search_sql and 'd.doc_type = :doc_type' in search_sql
+    assert params['query'] == 'lacp fallback'
+
+
+def test_feature_import_keeps_index_in_sync(tmp_path, monkeypatch):
+    monkeypatch.setenv('PRIMARY_TEST_DB_URL', f"sqlite:///{tmp_path / 'search.db'}")
+    monkeypatch.chdir(tmp_path)
+
+    def import_rows(rows, **kwargs):
+        path = tmp_path / f"features_{len(list(tmp_path.glob('features_*.xlsx')))}.xlsx"
+        pd.DataFrame(rows).to_excel(path, sheet_name='feature_map', index=False)
+        importer = SQLAlchemyFeatureImporter('testing', **kwargs)
+        with importer.create_app().app_context():
+            db.create_all()
+        assert importer.import_features(str(path))
+        with importer.app.app_context():
+            connection = db.session.connection()
+            return {query: found(connection, query) for query in ('fallback', 'portchannel', 'mlag', 'evpn')}
+
+    rows = [
+        {'Feature_Key': 'lag_fallback', 'Category': 'L2', 'Feature N1': 'LACP Fallback', 'Labels': 'lag, portchannel'},
+        {'Feature_Key': 'vxlan', 'Category': 'Overlay', 'Feature N1': 'VXLAN', 'Labels': 'evpn'},
+    ]
+    assert import_rows(rows) == {'fallback': ['lag_fallback'], 'portchannel': ['lag_fallback'],
+                                 'mlag': [], 'evpn': ['vxlan']}
+
+    rows[0]['Labels'] = 'lag, mlag'
+    assert import_rows(rows[:1], incremental=True) == {'fallback': ['lag_fallback'], 'portchannel': [],
+                                                       'mlag': ['lag_fallback'], 'evpn': []}
+
+
+def test_create_all_and_drop_all_manage_the_index(tmp_path, monkeypatch):
+    """db_manager.py init-db / drop-db / reset-db build and remove the index with the other tables"""
+    monkeypatch.setenv('PRIMARY_TEST_DB_URL', 'sqlite:///:memory:')
+    monkeypatch.chdir(tmp_path)  # keep requests.log out of the repo
+    app = create_app('testing')
+    client = app.test_client()
+
+    with app.app_context():
+        db.create_all()
+        connection = db.session.connection()
+        assert search_index.has_search_index(connection) and search_index.has_fts_table(connection)
+        search_index.refresh_documents(connection, search_index.DOC_TYPE_FEATURE, DOCUMENTS)
+        db.session.commit()
+    assert client.get('/api/search?q=portchannel').get_json()['total'] == 1
+
+    with app.app_context():
+        db.drop_all()
+        remaining = db.session.execute(text(
+            "SELECT name FROM sqlite_master WHERE name LIKE 's_search%'")).scalars().all()
+        assert remaining == []
+
+    # A database without the index searches nothing instead of failing
+    response = client.get('/api/search?q=portchannel')
+    assert response.status_code == 200
+    assert response.get_json()['total'] == 0
+    page = client.get('/search?q=portchannel').get_data(as_text=True)
+    assert 'no such table' not in page
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Tests for testcase_importer.py
+"""
+import math
+import pandas as pd
+import psycopg2
+import psycopg2.extras
+import pytest
+import testcase_importer
+from testcase_importer import TESTCASE_FIELDS
+
+SHEET_ROWS = [
+    {'Testcase ID': 'LAG-001', 'Testcase Name': 'LACP fallback', 'Description': ' Bring up the LAG ',
+     'Step': '1. shut\n2. no shut', 'Topology': 't0', 'Pytest Mark': 'lag', 'Validation': 'up',
+     'Traffic Pattern': None, 'Project / Customer': 'ACME', 'Time': 30, 'Note': 'nan',
+     'Features (labels)': 'lag, lacp,lag'},
+    {'Testcase ID': None, 'Testcase Name': 'VXLAN: EVPN type-5', 'Description': None,
+     'Features (labels)': ' , evpn ,'},
+    {'Testcase ID': None, 'Testcase Name': None, 'Description': 'no name'},
+]
+
+# Headers of another sheet naming the same fields with other COLUMN_MAPPINGS aliases
+ALIASES = {
+    'Testcase ID': 'Test ID', 'Testcase Name': 'Name', 'Description': 'Desc', 'Step': 'Procedure',
+    'Topology': 'Test Topology', 'Pytest Mark': 'Markers', 'Validation': 'Expected Result',
+    'Traffic Pattern': 'Traffic', 'Project / Customer': 'Customer', 'Time': 'Duration',
+    'Note': 'Comments', 'Features (labels)': 'Tags',
+}
+
+
+class FakeCursor:
+    """Cursor of a FakeConnection: runs the statements TestCaseImporter sends"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.result = []
+
+    def execute(self, sql, params=None):
+        self.write(sql, [params] if params is not None else [])
+
+    def write(self, sql, rows):
+        sql = ' '.join(sql.split())
+        database = self.connection
+        database.statements.append(sql)
+        if database.fail_on and any(database.fail_on in row for row in rows):
+            raise psycopg2.DataError(f"bad value in {database.fail_on}")
+
+        if sql == 'SELECT COUNT(*) FROM s_test_case_label':
+            self.result = [(len(database.labels),)]
+        elif sql == 'SELECT COUNT(*) FROM s_test_case':
+            self.result = [(len(database.testcases),)]
+        elif sql == 'DELETE FROM s_test_case_label':
+            database.labels.clear()
+        elif sql == 'DELETE FROM s_test_case':
+            database.testcases.clear()
+        elif sql == f"SELECT {', '.join(TESTCASE_FIELDS)} FROM s_test_case":
+            self.result = list(database.testcases.values())
+        elif sql == 'SELECT test_case_id, label FROM s_test_case_label':
+            self.result = list(database.labels)
+        elif sql.startswith('DELETE FROM s_test_case_label AS l USING (VALUES %s)'):
+            for pair in rows:
+                database.labels.pop(tuple(pair), None)
+        elif sql == 'DELETE FROM s_test_case WHERE test_case_id = ANY(%s)':
+            for test_case_id in rows[0][0]:
+                if any(key[0] == test_case_id for key in database.labels):
+                    raise psycopg2.IntegrityError(f"test case {test_case_id} still has labels")
+                database.testcases.pop(test_case_id, None)
+        elif sql.startswith('UPDATE s_test_case_label AS l SET test_case_name'):
+            for test_case_id, test_case_name in rows:
+                for key in database.labels:
+                    if key[0] == test_case_id:
+                        database.labels[key] = test_case_name
+        elif sql.startswith('INSERT INTO s_test_case ') and 'ON CONFLICT (test_case_id) DO UPDATE' in sql:
+            for row in rows:
+                database.testcases[row[0]] = tuple(row)
+        elif sql.startswith('INSERT INTO s_test_case_label '):
+            for test_case_id, test_case_name, label in rows:
+                if (test_case_id, label) in database.labels:
+                    raise psycopg2.IntegrityError(f"duplicate label {test_case_id}/{label}")
+                database.labels[(test_case_id, label)] = test_case_name
+        elif sql.startswith('INSERT INTO s_test_case '):
+            for row in rows:
+                if row[0] in database.testcases:
+                    raise psycopg2.IntegrityError(f"duplicate test case {row[0]}")
+                database.testcases[row[0]] = tuple(row)
+        else:
+            raise AssertionError(f"unexpected statement: {sql}")
+
+    def fetchone(self):
+        return self.result[0]
+
+    def fetchall(self):
+        return list(self.result)
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    """Stand-in for a psycopg2 connection holding s_test_case and s_test_case_label
+
+    Rows written since the last commit are dropped again by rollback();
+    fail_on makes any statement whose rows contain that value fail.
+    """
+
+    def __init__(self):
+        self.testcases = {}  # test_case_id -> row in TESTCASE_FIELDS order
+        self.labels = {}  # (test_case_id, label) -> test_case_name
+        self.committed = ({}, {})
+        self.statements = []
+        self.fail_on = None
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.committed = (dict(self.testcases), dict(self.labels))
+
+    def rollback(self):
+        self.testcases, self.labels = dict(self.committed[0]), dict(self.committed[1])
+
+    def close(self):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def fake_execute_values(monkeypatch):
+    """execute_values hands each page of rows to the FakeCursor unexpanded"""
+    def execute_values(cursor, sql, argslist, template=None, page_size=100):
+        for start in range(0, len(argslist), page_size):
+            cursor.write(sql, argslist[start:start + page_size])
+    monkeypatch.setattr(psycopg2.extras, 'execute_values', execute_values)
+
+
+def sample_rows(count, prefix='tc'):
+    """Normalized (testcase_data, labels) rows with one to three labels each"""
+    rows = []
+    for index in range(count):
+        testcase_data = dict.fromkeys(TESTCASE_FIELDS)
+        testcase_data.update(test_case_id=f'{prefix}_{index:03d}', test_case_name=f'Test case {index}',
+                             topology='t0' if index % 2 else None, time=str(index))
+        rows.append((testcase_data, [f'label_{label}' for label in range(index % 3 + 1)]))
+    return rows
+
+
+def import_rows(rows, connection=None, clear_data=True, **kwargs):
+    """Run import_testcases on already normalized rows against a FakeConnection"""
+    importer = testcase_importer.TestCaseImporter(**kwargs)
+    importer.db_conn = connection or FakeConnection()
+    importer.load_testcases = lambda *args: rows
+    importer.refresh_search_index = lambda: None
+    success = importer.import_testcases('testcases.xlsx', clear_data=clear_data)
+    return importer, success
+
+
+def test_aliased_headers_normalize_to_the_same_rows(monkeypatch):
+    importer = testcase_importer.TestCaseImporter()
+    df = pd.DataFrame(SHEET_ROWS)
+    aliased = df.rename(columns=ALIASES)
+    expected = importer.normalize_rows(df)
+
+    assert [testcase_data['test_case_id'] for testcase_data, _ in expected] == [
+        'LAG-001', 'vxlan_evpn_type-5', 'testcase_0002']
+    assert expected[0][0]['description'] == 'Bring up the LAG'
+    assert expected[0][0]['note'] is None
+    assert expected[0][1] == ['lag', 'lacp']
+    assert importer.normalize_rows(aliased) == expected
+
+    # With several aliases of a field present, the first one in COLUMN_MAPPINGS wins
+    both = aliased.assign(**{'Testcase ID': ['LAG-002', None, None]})
+    assert importer.compile_column_plan(both.columns)['ambiguous'] == {'test_case_id': ['Testcase ID', 'Test ID']}
+    assert importer.normalize_rows(both)[0][0]['test_case_id'] == 'LAG-002'
+
+    # The row-by-row path resolves the headers once per sheet, not per row
+    plan = importer.compile_column_plan(aliased.columns)
+    assert plan['unmatched'] == []
+    compiled = []
+    monkeypatch.setattr(importer, 'compile_column_plan', lambda columns: compiled.append(columns))
+    assert [importer.process_testcase_row(row, index, plan) for index, row in aliased.iterrows()] == expected
+    assert compiled == []
+
+
+@pytest.mark.parametrize('batch_size', [1, 4, 10, 25])
+def test_bulk_insert_matches_row_by_row(batch_size):
+    rows = sample_rows(10)
+    row_importer, _ = import_rows(rows)
+    importer, success = import_rows(rows, bulk=True, batch_size=batch_size)
+
+    assert success
+    assert importer.db_conn.committed == row_importer.db_conn.committed
+    assert len(importer.db_conn.testcases) == 10
+    assert len(importer.db_conn.labels) == 19
+    assert importer.db_conn.testcases['tc_001'] == (
+        'tc_001', 'Test case 1', None, None, 't0', None, None, None, None, '1', None)
+    for key in ('testcases_inserted', 'labels_processed', 'labels_inserted'):
+        assert importer.stats[key] == row_importer.stats[key]
+    assert importer.stats['errors'] == []
+
+    # One INSERT for the test cases and one for the labels per batch
+    inserts = [sql for sql in importer.db_conn.statements if sql.startswith('INSERT')]
+    assert len(inserts) == 2 * math.ceil(10 / batch_size)
+
+
+def test_failed_bulk_batch_rolls_back_the_import():
+    connection = FakeConnection()
+    import_rows(sample_rows(3, prefix='old'), connection)
+
+    connection.fail_on = 'tc_006'  # in the second batch
+    written = len(connection.statements)
+    importer, success = import_rows(sample_rows(10), connection, clear_data=False, bulk=True, batch_size=4)
+
+    assert not success
+    assert importer.stats['errors'] == ['Bulk insert: bad value in tc_006']
+    assert [sql.split(' (')[0] for sql in connection.statements[written:]] == [
+        'INSERT INTO s_test_case', 'INSERT INTO s_test_case_label', 'INSERT INTO s_test_case']
+    # The first batch was written but is rolled back with the failed one
+    assert sorted(connection.testcases) == ['old_000', 'old_001', 'old_002']
+    assert {test_case_id for test_case_id, _ in connection.labels} == {'old_000', 'old_001', 'old_002'}
+
+
+def test_incremental_import_writes_only_changes():
+    connection = FakeConnection()
+    import_rows(sample_rows(6), connection, bulk=True)
+
+    rows = sample_rows(6)
+    rows[0][0]['description'] = 'Changed'  # tc_000 changed
+    rows[0][1].append('mlag')
+    rows[1][0]['test_case_name'] = 'Renamed'  # tc_001 changed, its labels take the new name
+    del rows[2]  # tc_002 removed with its three labels
+    rows[3][1].remove('label_1')  # tc_004 unchanged, one label dropped
+    rows.append(sample_rows(11)[10])  # tc_010 added with two labels
+    importer, success = import_rows(rows, connection, incremental=True, batch_size=2)
+
+    assert success
+    assert {key: importer.stats[key] for key in ('testcases_inserted', 'testcases_updated', 'testcases_unchanged',
+                                                 'testcases_deleted', 'labels_inserted', 'labels_deleted')} == {
+        'testcases_inserted': 1, 'testcases_updated': 2, 'testcases_unchanged': 3,
+        'testcases_deleted': 1, 'labels_inserted': 3, 'labels_deleted': 4,
+    }
+    # The tables end up as a full import of the new sheet would leave them
+    assert connection.committed == import_rows(rows, bulk=True)[0].db_conn.committed
+    assert connection.labels[('tc_001', 'label_1')] == 'Renamed'
+    upserted = [sql for sql in connection.statements if 'ON CONFLICT' in sql]
+    assert len(upserted) == 2  # three changed or new rows in batches of two
+
+    # Re-running the same sheet changes nothing
+    connection.statements.clear()
+    importer, success = import_rows(rows, connection, incremental=True, batch_size=2)
+
+    assert success
+    assert importer.stats['testcases_unchanged'] == 6
+    assert not importer.has_changes()
+    assert all(sql.startswith('SELECT') for sql in connection.statements)
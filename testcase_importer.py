@@ -5,51 +5,88 @@ Reads ESTS Test Case Excel files and imports data to ESTS_Dev database
 """
 import os
 import sys
+import contextlib
+import hashlib
 import pandas as pd
-import psycopg2
+import psycopg2.extras
 import re
+import time
 from datetime import datetime
 from dotenv import load_dotenv
-from urllib.parse import urlparse
+from config.database import DatabaseConfig
+import excel_loader
+import import_progress
+import search_index
 
 # Load environment variables
 load_dotenv()
 
+# Test cases per INSERT in bulk mode
+DEFAULT_BATCH_SIZE = 1000
+
+TESTCASE_FIELDS = ['test_case_id', 'test_case_name', 'description', 'step', 'topology',
+                   'pytest_mark', 'validation', 'traffic_pattern', 'project_customer', 'time', 'note']
+
 class TestCaseImporter:
     """Import ESTS test cases from Excel to database"""
     
-    def __init__(self):
+    # Map Excel columns to database fields - try multiple possible column names
+    COLUMN_MAPPINGS = {
+        'test_case_id': ['Testcase ID', 'Test ID', 'ID', 'TestcaseID', 'TestID'],
+        'test_case_name': ['Testcase Name', 'Test Name', 'Name', 'TestcaseName', 'TestName', 'Testcase'],
+        'description': ['Description', 'Desc', 'Brief'],
+        'step': ['Step', 'Steps', 'Test Steps', 'Procedure'],
+        'topology': ['Topology', 'Topo', 'Test Topology'],
+        'pytest_mark': ['Pytest Mark', 'PyTest Mark', 'Mark', 'Markers'],
+        'validation': ['Validation', 'Validate', 'Expected Result', 'Result'],
+        'traffic_pattern': ['Traffic Pattern', 'Traffic', 'Pattern'],
+        'project_customer': ['Project / Customer', 'Project/Customer', 'Project', 'Customer'],
+        'time': ['Time', 'Duration', 'Execution Time'],
+        'note': ['Note', 'Notes', 'Comment', 'Comments'],
+        'labels': ['Features (labels)', 'New Features (labels)', 'Features', 'Labels', 'Tags']
+    }
+    
+    def __init__(self, sheets=None, workers=None, verbose=False, log_format='text', bulk=False,
+                 incremental=False, batch_size=DEFAULT_BATCH_SIZE):
         self.db_conn = None
+        self.engine = None
+        self.sheets = list(sheets) if sheets else None  # exact sheet names; None picks one sheet by name
+        self.workers = workers
+        self.verbose = verbose
+        self.log_format = log_format
+        self.log_stream = None  # JSON log records (default: stdout)
+        self.bulk = bulk
+        self.incremental = incremental
+        self.batch_size = batch_size
         self.stats = {
             'testcases_processed': 0,
             'testcases_inserted': 0,
+            'testcases_updated': 0,
+            'testcases_unchanged': 0,
+            'testcases_deleted': 0,
             'labels_processed': 0,
             'labels_inserted': 0,
+            'labels_deleted': 0,
+            'elapsed_seconds': None,
             'errors': []
         }
     
     def connect_database(self):
-        """Connect to PostgreSQL database"""
+        """Connect to PostgreSQL database (a connection from the shared pool)"""
         try:
             # Get database URL
             env = os.environ.get('FLASK_ENV', 'development')
-            env_short = 'DEV' if env == 'development' else 'PROD' if env == 'production' else 'TEST'
-            db_url = os.environ.get(f'PRIMARY_{env_short}_DB_URL')
+            db_url = DatabaseConfig.get_database_url('primary', env)
             
-            if not db_url:
-                raise Exception(f"Database URL not found for environment: {env}")
+            if not DatabaseConfig.is_postgresql(db_url):
+                raise Exception(f"PostgreSQL database URL not found for environment: {env}")
             
-            # Parse URL and connect
-            parsed = urlparse(db_url)
-            self.db_conn = psycopg2.connect(
-                host=parsed.hostname,
-                port=parsed.port or 5432,
-                database=parsed.path.lstrip('/'),
-                user=parsed.username,
-                password=parsed.password
-            )
+            # psycopg2 connection checked out of the pooled engine
+            self.engine = DatabaseConfig.get_engine('primary', env)
+            self.db_conn = self.engine.raw_connection()
             
-            print(f"✅ Connected to database: {parsed.hostname}:{parsed.port}/{parsed.path.lstrip('/')}")
+            url = self.engine.url
+            print(f"✅ Connected to database: {url.host}:{url.port}/{url.database}")
             
         except Exception as e:
             print(f"❌ Database connection failed: {e}")
@@ -97,9 +134,9 @@ class TestCaseImporter:
             print(f"📖 Reading Excel file: {filepath}")
             print(f"📊 Target sheet: '{sheet_name}'")
             
-            # Check if sheet exists
-            excel_file = pd.ExcelFile(filepath)
-            available_sheets = excel_file.sheet_names
+            # Check if sheet exists (sheet names and parsed sheets are cached by file hash)
+            file_hash = excel_loader.file_sha256(filepath)
+            available_sheets = excel_loader.sheet_names(filepath, file_hash)
             
             # Try to find the correct sheet
             target_sheet = None
@@ -123,14 +160,11 @@ class TestCaseImporter:
                     target_sheet = available_sheets[0]
                     print(f"⚠️  Using first available sheet: '{target_sheet}'")
             
-            # Read the sheet
-            df = pd.read_excel(filepath, sheet_name=target_sheet)
-            print(f"📊 Loaded {len(df)} rows from '{target_sheet}' sheet")
-            
-            # Display column information
-            print("📋 Available columns:")
-            for i, col in enumerate(df.columns):
-                print(f"   {i+1:2d}. {col}")
+            # Read the mapped columns of the sheet
+            columns = [column for names in self.COLUMN_MAPPINGS.values() for column in names]
+            df, from_cache = excel_loader.load_sheet(filepath, target_sheet, columns, file_hash)
+            source = " (parsed-sheet cache)" if from_cache else ""
+            print(f"📊 Loaded {len(df)} rows from '{target_sheet}' sheet{source}")
             
             return df, target_sheet
             
@@ -164,35 +198,46 @@ class TestCaseImporter:
             # Generate from row index
             return f"testcase_{row_index:04d}"
     
-    def process_testcase_row(self, row, row_index):
-        """Process a single test case row and return normalized data"""
-        # Map Excel columns to database fields - try multiple possible column names
-        column_mappings = {
-            'test_case_id': ['Testcase ID', 'Test ID', 'ID', 'TestcaseID', 'TestID'],
-            'test_case_name': ['Testcase Name', 'Test Name', 'Name', 'TestcaseName', 'TestName', 'Testcase'],
-            'description': ['Description', 'Desc', 'Brief'],
-            'step': ['Step', 'Steps', 'Test Steps', 'Procedure'],
-            'topology': ['Topology', 'Topo', 'Test Topology'],
-            'pytest_mark': ['Pytest Mark', 'PyTest Mark', 'Mark', 'Markers'],
-            'validation': ['Validation', 'Validate', 'Expected Result', 'Result'],
-            'traffic_pattern': ['Traffic Pattern', 'Traffic', 'Pattern'],
-            'project_customer': ['Project / Customer', 'Project/Customer', 'Project', 'Customer'],
-            'time': ['Time', 'Duration', 'Execution Time'],
-            'note': ['Note', 'Notes', 'Comment', 'Comments'],
-            'labels': ['Features (labels)', 'New Features (labels)', 'Features', 'Labels', 'Tags']
-        }
+    def compile_column_plan(self, columns):
+        """Resolve the sheet headers to database fields once per sheet
         
-        def find_column_value(field_name):
-            """Find value from row using multiple possible column names"""
-            possible_columns = column_mappings.get(field_name, [field_name])
-            for col_name in possible_columns:
-                if col_name in row.index:
-                    return self.clean_value(row.get(col_name))
-            return None
-        
-        # Get and clean values
-        test_case_id = find_column_value('test_case_id')
-        test_case_name = find_column_value('test_case_name')
+        Each field takes the first of its COLUMN_MAPPINGS aliases present in
+        the sheet. Returns {'columns': {field: header}, 'unmatched': [fields
+        without a header], 'ambiguous': {field: [all aliases present]}}.
+        """
+        headers = set(columns)
+        plan = {'columns': {}, 'unmatched': [], 'ambiguous': {}}
+        for field, aliases in self.COLUMN_MAPPINGS.items():
+            present = [alias for alias in aliases if alias in headers]
+            if not present:
+                plan['unmatched'].append(field)
+                continue
+            plan['columns'][field] = present[0]
+            if len(present) > 1:
+                plan['ambiguous'][field] = present
+        return plan
+    
+    def report_column_plan(self, plan, sheet_name=None):
+        """Print the header -> field mapping and any unmatched or ambiguous fields"""
+        sheet = f" for '{sheet_name}'" if sheet_name else ""
+        print(f"📋 Column plan{sheet}:")
+        for field, header in plan['columns'].items():
+            print(f"   {field:<16} <- {header}")
+        if plan['unmatched']:
+            print(f"⚠️  No column found for: {', '.join(plan['unmatched'])}")
+        for field, headers in plan['ambiguous'].items():
+            print(f"⚠️  Several columns for {field}: {', '.join(headers)} (using '{headers[0]}')")
+    
+    def clean_column(self, series):
+        """clean_value for a whole column"""
+        text = series.astype(object).astype(str).str.strip()
+        empty = series.isna() | (text == '') | text.str.lower().isin(['nan', 'none', 'null'])
+        return text.where(~empty, None)
+    
+    def build_testcase(self, values, row_index):
+        """Build (testcase_data, labels) from cleaned {field: value}; None if the row is empty"""
+        test_case_id = values.get('test_case_id')
+        test_case_name = values.get('test_case_name')
         
         # Generate test_case_id if missing
         if not test_case_id:
@@ -206,30 +251,101 @@ class TestCaseImporter:
         testcase_data = {
             'test_case_id': test_case_id,
             'test_case_name': test_case_name,
-            'description': find_column_value('description'),
-            'step': find_column_value('step'),
-            'topology': find_column_value('topology'),
-            'pytest_mark': find_column_value('pytest_mark'),
-            'validation': find_column_value('validation'),
-            'traffic_pattern': find_column_value('traffic_pattern'),
-            'project_customer': find_column_value('project_customer'),
-            'time': find_column_value('time'),
-            'note': find_column_value('note')
+            'description': values.get('description'),
+            'step': values.get('step'),
+            'topology': values.get('topology'),
+            'pytest_mark': values.get('pytest_mark'),
+            'validation': values.get('validation'),
+            'traffic_pattern': values.get('traffic_pattern'),
+            'project_customer': values.get('project_customer'),
+            'time': values.get('time'),
+            'note': values.get('note')
         }
         
-        # Process labels (try multiple label columns and combine)
+        # Process labels (split by comma, clean and dedupe)
         labels = []
-        for label_field in ['labels']:
-            labels_raw = find_column_value(label_field)
-            if labels_raw:
-                # Split by comma and clean each label
-                for label in str(labels_raw).split(','):
-                    cleaned_label = label.strip()
-                    if cleaned_label and cleaned_label not in labels:
-                        labels.append(cleaned_label)
+        labels_raw = values.get('labels')
+        if labels_raw:
+            for label in str(labels_raw).split(','):
+                cleaned_label = label.strip()
+                if cleaned_label and cleaned_label not in labels:
+                    labels.append(cleaned_label)
         
         return testcase_data, labels
     
+    def process_testcase_row(self, row, row_index, plan=None):
+        """Process a single test case row and return normalized data
+        
+        plan is the sheet's compile_column_plan(); without it the headers
+        are resolved again for this row.
+        """
+        plan = plan or self.compile_column_plan(row.index)
+        values = {field: self.clean_value(row.get(header)) for field, header in plan['columns'].items()}
+        return self.build_testcase(values, row_index)
+    
+    def normalize_rows(self, df, plan=None):
+        """Normalize every row of a sheet, dropping rows without a test case ID
+        
+        The sheet is projected onto the planned columns and cleaned column by
+        column, so the alias lists are resolved once per sheet, not per row.
+        """
+        plan = plan or self.compile_column_plan(df.columns)
+        frame = pd.DataFrame({field: self.clean_column(df[header]) for field, header in plan['columns'].items()},
+                             index=df.index)
+        
+        rows = []
+        for index, values in zip(frame.index, frame.to_dict('records')):
+            result = self.build_testcase(values, index)
+            if result is not None and result[0]['test_case_id']:
+                rows.append(result)
+        return rows
+    
+    def load_testcases(self, filepath, sheet_name="ESTS testcase"):
+        """Read and normalize the test case sheet(s)
+        
+        With self.sheets, every listed sheet is parsed and normalized in a
+        worker process (each sheet may use its own column names). Returns
+        the normalized rows in sheet order, or None if the file can't be read.
+        """
+        if not self.sheets:
+            df, _ = self.read_excel_data(filepath, sheet_name)
+            if df is None:
+                return None
+            self.stats['testcases_processed'] += len(df)
+            # Display the header -> field mapping used for the sheet
+            plan = self.compile_column_plan(df.columns)
+            self.report_column_plan(plan)
+            return self.normalize_rows(df, plan)
+        
+        try:
+            print(f"📖 Reading Excel file: {filepath}")
+            print(f"⚡ Parsing {len(self.sheets)} sheets with up to {self.workers or os.cpu_count()} workers")
+            columns = [column for names in self.COLUMN_MAPPINGS.values() for column in names]
+            
+            def report(done, total, sheet, result, from_cache):
+                source = " (parsed-sheet cache)" if from_cache else ""
+                print(f"📊 [{done}/{total}] '{sheet}': {result[0]} rows, {len(result[2])} test cases{source}")
+                self.report_column_plan(result[1], sheet)
+            
+            sheets = excel_loader.load_sheets(filepath, self.sheets, columns, workers=self.workers,
+                                              transform=normalize_testcase_sheet, progress=report)
+        except Exception as e:
+            print(f"❌ Error reading Excel file: {e}")
+            return None
+        
+        rows, seen = [], set()
+        for sheet in self.sheets:
+            (row_count, _, sheet_rows), _ = sheets[sheet]
+            self.stats['testcases_processed'] += row_count
+            for testcase_data, labels in sheet_rows:
+                if testcase_data['test_case_id'] in seen:
+                    self.stats['errors'].append(f"Test case {testcase_data['test_case_id']}: "
+                                                f"duplicate ID in sheet '{sheet}', skipped")
+                    continue
+                seen.add(testcase_data['test_case_id'])
+                rows.append((testcase_data, labels))
+        return rows
+    
     def clear_existing_testcase_data(self):
         """Clear existing data from test case tables"""
         try:
@@ -293,12 +409,14 @@ class TestCaseImporter:
             
             self.stats['testcases_inserted'] += 1
             cursor.close()
-            print(f"✅ Test case inserted: {testcase_data['test_case_id']}")
+            if self.verbose:
+                print(f"✅ Test case inserted: {testcase_data['test_case_id']}")
             return True
             
         except Exception as e:
             self.stats['errors'].append(f"Test case {testcase_data['test_case_id']}: {e}")
-            print(f"❌ Error inserting test case {testcase_data['test_case_id']}: {e}")
+            if self.verbose:
+                print(f"❌ Error inserting test case {testcase_data['test_case_id']}: {e}")
             return False
     
     def insert_testcase_labels(self, test_case_id, test_case_name, labels):
@@ -319,74 +437,283 @@ class TestCaseImporter:
                 self.stats['labels_inserted'] += 1
             
             cursor.close()
-            print(f"✅ Labels inserted for {test_case_id}: {', '.join(labels)}")
+            if self.verbose:
+                print(f"✅ Labels inserted for {test_case_id}: {', '.join(labels)}")
             
         except Exception as e:
             self.stats['errors'].append(f"Labels for {test_case_id}: {e}")
-            print(f"❌ Error inserting labels for {test_case_id}: {e}")
+            if self.verbose:
+                print(f"❌ Error inserting labels for {test_case_id}: {e}")
+    
+    def unique_testcases(self, rows):
+        """Keep the first row of each test case ID, reporting the others
+        
+        A duplicate ID would fail a whole batch on the primary key; names
+        that normalize to the same generated ID end up here too.
+        """
+        unique_rows, seen = [], set()
+        for testcase_data, labels in rows:
+            if testcase_data['test_case_id'] in seen:
+                self.stats['errors'].append(f"Test case {testcase_data['test_case_id']}: duplicate ID, skipped")
+                continue
+            seen.add(testcase_data['test_case_id'])
+            unique_rows.append((testcase_data, labels))
+        return unique_rows
+    
+    def bulk_insert_testcases(self, rows):
+        """Insert test cases and their labels with two statements per batch
+        
+        Each batch is one multi-row INSERT into s_test_case and one into
+        s_test_case_label (psycopg2 execute_values), instead of a round trip
+        per test case and per label. A failed batch rolls back the import.
+        """
+        testcase_sql = f"INSERT INTO s_test_case ({', '.join(TESTCASE_FIELDS)}, created_at) VALUES %s"
+        testcase_template = f"({', '.join(['%s'] * len(TESTCASE_FIELDS))}, CURRENT_TIMESTAMP)"
+        label_sql = "INSERT INTO s_test_case_label (test_case_id, test_case_name, label, created_at) VALUES %s"
+        label_template = "(%s, %s, %s, CURRENT_TIMESTAMP)"
+        
+        unique_rows = self.unique_testcases(rows)
+        
+        print(f"📦 Bulk inserting {len(unique_rows)} test cases (batch size {self.batch_size})...")
+        progress = import_progress.ImportProgress('s_test_case', len(unique_rows), self.log_format, self.verbose,
+                                                  record_rows=self.batch_size, log_stream=self.log_stream)
+        cursor = self.db_conn.cursor()
+        try:
+            for start in range(0, len(unique_rows), self.batch_size):
+                batch = unique_rows[start:start + self.batch_size]
+                testcase_values = [tuple(testcase_data[field] for field in TESTCASE_FIELDS)
+                                   for testcase_data, _ in batch]
+                label_values = [(testcase_data['test_case_id'], testcase_data['test_case_name'], label)
+                                for testcase_data, labels in batch for label in labels]
+                
+                psycopg2.extras.execute_values(cursor, testcase_sql, testcase_values,
+                                               template=testcase_template, page_size=len(testcase_values))
+                if label_values:
+                    psycopg2.extras.execute_values(cursor, label_sql, label_values,
+                                                   template=label_template, page_size=len(label_values))
+                
+                self.stats['testcases_inserted'] += len(testcase_values)
+                self.stats['labels_processed'] += len(label_values)
+                self.stats['labels_inserted'] += len(label_values)
+                progress.update(len(batch))
+        except Exception as e:
+            self.stats['errors'].append(f"Bulk insert: {e}")
+            print(f"❌ Bulk insert failed: {e}")
+            self.db_conn.rollback()
+            return False
+        finally:
+            cursor.close()
+            progress.finish()
+        
+        return True
+    
+    def testcase_hash(self, values):
+        """Content hash of a test case row's fields (labels are diffed separately)"""
+        payload = '\x1f'.join('\x00' if values[field] is None else str(values[field])
+                               for field in TESTCASE_FIELDS)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def incremental_import_testcases(self, rows):
+        """Write only the differences between the sheet and the database
+        
+        New test case IDs are inserted and changed ones (by content hash)
+        updated in one INSERT ... ON CONFLICT (test_case_id) DO UPDATE per
+        batch; IDs missing from the sheet are deleted and label sets are
+        diffed per test case. Unchanged rows are not touched.
+        """
+        unique_rows = self.unique_testcases(rows)
+        update_fields = [field for field in TESTCASE_FIELDS if field != 'test_case_id']
+        upsert_sql = (f"INSERT INTO s_test_case ({', '.join(TESTCASE_FIELDS)}, created_at) VALUES %s "
+                      f"ON CONFLICT (test_case_id) DO UPDATE SET "
+                      f"{', '.join(f'{field} = EXCLUDED.{field}' for field in update_fields)}")
+        upsert_template = f"({', '.join(['%s'] * len(TESTCASE_FIELDS))}, CURRENT_TIMESTAMP)"
+        
+        cursor = self.db_conn.cursor()
+        try:
+            cursor.execute(f"SELECT {', '.join(TESTCASE_FIELDS)} FROM s_test_case")
+            existing = {row[0]: self.testcase_hash(dict(zip(TESTCASE_FIELDS, row))) for row in cursor.fetchall()}
+            cursor.execute("SELECT test_case_id, label FROM s_test_case_label")
+            existing_labels = set(cursor.fetchall())
+            
+            upserts, renamed = [], []
+            for testcase_data, _ in unique_rows:
+                previous = existing.get(testcase_data['test_case_id'])
+                if previous is None:
+                    self.stats['testcases_inserted'] += 1
+                elif previous != self.testcase_hash(testcase_data):
+                    self.stats['testcases_updated'] += 1
+                    renamed.append((testcase_data['test_case_id'], testcase_data['test_case_name']))
+                else:
+                    self.stats['testcases_unchanged'] += 1
+                    continue
+                upserts.append(tuple(testcase_data[field] for field in TESTCASE_FIELDS))
+            
+            incoming_ids = {testcase_data['test_case_id'] for testcase_data, _ in unique_rows}
+            removed_ids = [test_case_id for test_case_id in existing if test_case_id not in incoming_ids]
+            
+            wanted_labels = {(testcase_data['test_case_id'], label): testcase_data['test_case_name']
+                             for testcase_data, labels in unique_rows for label in labels}
+            label_inserts = [(test_case_id, name, label) for (test_case_id, label), name in wanted_labels.items()
+                             if (test_case_id, label) not in existing_labels]
+            label_deletes = [pair for pair in existing_labels if pair not in wanted_labels]
+            self.stats['labels_processed'] += len(wanted_labels)
+            
+            print(f"🔁 Incremental: {self.stats['testcases_inserted']} new, "
+                  f"{self.stats['testcases_updated']} changed, {len(removed_ids)} removed, "
+                  f"{self.stats['testcases_unchanged']} unchanged test cases; "
+                  f"+{len(label_inserts)}/-{len(label_deletes)} labels")
+            
+            progress = import_progress.ImportProgress('s_test_case', len(upserts), self.log_format, self.verbose,
+                                                      record_rows=self.batch_size, log_stream=self.log_stream)
+            # Labels first (foreign key), then test cases, then new labels
+            for start in range(0, len(label_deletes), self.batch_size):
+                psycopg2.extras.execute_values(
+                    cursor,
+                    "DELETE FROM s_test_case_label AS l USING (VALUES %s) AS d (test_case_id, label) "
+                    "WHERE l.test_case_id = d.test_case_id AND l.label = d.label",
+                    label_deletes[start:start + self.batch_size], page_size=self.batch_size
+                )
+            for start in range(0, len(removed_ids), self.batch_size):
+                cursor.execute("DELETE FROM s_test_case WHERE test_case_id = ANY(%s)",
+                               (removed_ids[start:start + self.batch_size],))
+            for start in range(0, len(upserts), self.batch_size):
+                batch = upserts[start:start + self.batch_size]
+                psycopg2.extras.execute_values(cursor, upsert_sql, batch, template=upsert_template,
+                                               page_size=len(batch))
+                progress.update(len(batch))
+            progress.finish()
+            for start in range(0, len(label_inserts), self.batch_size):
+                psycopg2.extras.execute_values(
+                    cursor,
+                    "INSERT INTO s_test_case_label (test_case_id, test_case_name, label, created_at) VALUES %s",
+                    label_inserts[start:start + self.batch_size], template="(%s, %s, %s, CURRENT_TIMESTAMP)",
+                    page_size=self.batch_size
+                )
+            # Kept labels carry the test case name too
+            for start in range(0, len(renamed), self.batch_size):
+                psycopg2.extras.execute_values(
+                    cursor,
+                    "UPDATE s_test_case_label AS l SET test_case_name = r.test_case_name "
+                    "FROM (VALUES %s) AS r (test_case_id, test_case_name) "
+                    "WHERE l.test_case_id = r.test_case_id AND l.test_case_name IS DISTINCT FROM r.test_case_name",
+                    renamed[start:start + self.batch_size], page_size=self.batch_size
+                )
+        except Exception as e:
+            self.stats['errors'].append(f"Incremental import: {e}")
+            print(f"❌ Incremental import failed: {e}")
+            self.db_conn.rollback()
+            return False
+        finally:
+            cursor.close()
+        
+        self.stats['testcases_deleted'] += len(removed_ids)
+        self.stats['labels_inserted'] += len(label_inserts)
+        self.stats['labels_deleted'] += len(label_deletes)
+        return True
+    
+    def has_changes(self):
+        """Whether the import wrote anything"""
+        return any(self.stats[key] for key in ('testcases_inserted', 'testcases_updated', 'testcases_deleted',
+                                               'labels_inserted', 'labels_deleted'))
     
     def import_testcases(self, filepath, sheet_name="ESTS testcase", clear_data=True):
         """Main import process"""
         print("🚀 Starting ESTS Test Case import process")
         print("="*60)
         
+        # Read and normalize all sheets (before clearing, so a bad file leaves the tables alone)
+        rows = self.load_testcases(filepath, sheet_name)
+        if rows is None:
+            return False
+        
         # Clear existing data first (if requested)
-        if clear_data:
+        if self.incremental:
+            print("🔁 Incremental mode - only changed rows will be written")
+        elif clear_data:
             if not self.clear_existing_testcase_data():
                 print("❌ Failed to clear existing test case data. Aborting import.")
                 return False
         else:
             print("⚠️  Skipping data clearing - will append to existing data")
         
-        # Read Excel data
-        df, actual_sheet = self.read_excel_data(filepath, sheet_name)
-        if df is None:
-            return False
-        
-        # Process each row
-        print(f"\n📝 Processing {len(df)} test case rows...")
+        # Write all test cases in one transaction
+        print(f"\n📝 Writing {len(rows)} test cases...")
+        started = time.perf_counter()
         
-        for index, row in df.iterrows():
-            self.stats['testcases_processed'] += 1
-            
-            # Process the row
-            result = self.process_testcase_row(row, index)
-            if result is None:
-                continue
-            
-            testcase_data, labels = result
-            
-            # Skip empty rows
-            if not testcase_data['test_case_id']:
-                continue
-            
-            # Insert test case
-            if self.insert_testcase(testcase_data):
-                # Insert labels
-                if labels:
-                    self.stats['labels_processed'] += len(labels)
-                    self.insert_testcase_labels(
-                        testcase_data['test_case_id'], 
-                        testcase_data['test_case_name'], 
-                        labels
-                    )
+        if self.incremental:
+            if not self.incremental_import_testcases(rows):
+                return False
+        elif self.bulk:
+            if not self.bulk_insert_testcases(rows):
+                return False
+        else:
+            progress = import_progress.ImportProgress('s_test_case', len(rows), self.log_format, self.verbose,
+                                                      log_stream=self.log_stream)
+            for testcase_data, labels in rows:
+                progress.update()
+                # Insert test case
+                if self.insert_testcase(testcase_data):
+                    # Insert labels
+                    if labels:
+                        self.stats['labels_processed'] += len(labels)
+                        self.insert_testcase_labels(
+                            testcase_data['test_case_id'], 
+                            testcase_data['test_case_name'], 
+                            labels
+                        )
+            progress.finish()
         
         # Commit all changes
         self.db_conn.commit()
+        self.stats['elapsed_seconds'] = time.perf_counter() - started
         print("\n✅ All changes committed to database")
         
+        # An unchanged sheet leaves the search documents as they are
+        if self.has_changes():
+            self.refresh_search_index()
+        
         return True
     
+    def refresh_search_index(self):
+        """Update the full-text search documents for changed test cases"""
+        try:
+            with self.engine.begin() as connection:
+                search_stats = search_index.refresh_testcase_documents(connection)
+            print(f"🔎 Search index: {search_stats['inserted']} added, "
+                  f"{search_stats['updated']} updated, {search_stats['deleted']} removed")
+        except Exception as e:
+            self.stats['errors'].append(f"Search index: {e}")
+            print(f"⚠️  Search index not refreshed: {e}")
+    
+    def log_summary(self, success):
+        """Final JSON log record with the import statistics"""
+        record = {key: value for key, value in self.stats.items() if key != 'errors'}
+        import_progress.emit_record(dict(event='summary', success=success, **record,
+                                         errors=len(self.stats['errors']),
+                                         error_details=self.stats['errors'][:10]), self.log_stream)
+    
     def print_summary(self):
         """Print import summary"""
         print("\n📊 Import Summary")
         print("="*60)
         print(f"📝 Test cases processed: {self.stats['testcases_processed']}")
         print(f"➕ Test cases inserted: {self.stats['testcases_inserted']}")
+        if self.incremental:
+            print(f"🔄 Test cases updated: {self.stats['testcases_updated']}")
+            print(f"⏸️  Test cases unchanged: {self.stats['testcases_unchanged']}")
+            print(f"🗑️  Test cases deleted: {self.stats['testcases_deleted']}")
         print(f"🏷️  Labels processed: {self.stats['labels_processed']}")
         print(f"➕ Labels inserted: {self.stats['labels_inserted']}")
+        if self.incremental:
+            print(f"🗑️  Labels deleted: {self.stats['labels_deleted']}")
         print(f"❌ Errors: {len(self.stats['errors'])}")
         
+        elapsed = self.stats['elapsed_seconds']
+        if elapsed:
+            rows = sum(self.stats[key] for key in ('testcases_inserted', 'testcases_updated', 'testcases_deleted',
+                                                   'labels_inserted', 'labels_deleted'))
+            print(f"⏱️  Write time: {elapsed:.2f}s ({rows / elapsed:,.0f} rows/sec)")
+        
         if self.stats['errors']:
             print(f"\n⚠️  Error Details:")
             for error in self.stats['errors'][:10]:  # Show first 10 errors
@@ -395,11 +722,20 @@ class TestCaseImporter:
                 print(f"   ... and {len(self.stats['errors']) - 10} more errors")
     
     def close(self):
-        """Close database connection"""
+        """Return the database connection to the pool"""
         if self.db_conn:
             self.db_conn.close()
             print("🔌 Database connection closed")
 
+def normalize_testcase_sheet(df, sheet_name):
+    """Normalize one parsed sheet (runs in a worker process)
+    
+    Returns (row count, column plan, normalized rows).
+    """
+    importer = TestCaseImporter()
+    plan = importer.compile_column_plan(df.columns)
+    return len(df), plan, importer.normalize_rows(df, plan)
+
 def main():
     """Main function"""
     import argparse
@@ -410,12 +746,35 @@ def main():
     parser.add_argument('--sheet', default='ESTS testcase', help='Sheet name to read (default: "ESTS testcase")')
     parser.add_argument('--dry-run', action='store_true', help='Preview data without importing')
     parser.add_argument('--no-clear', action='store_true', help='Do not clear existing data before import')
+    parser.add_argument('--sheets', help='Comma-separated exact sheet names to import together (parsed in parallel)')
+    parser.add_argument('--workers', type=int, help='Worker processes for --sheets (default: CPU count)')
+    parser.add_argument('--bulk', action='store_true',
+                        help='Insert test cases and labels with one statement each per batch instead of row by row')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Upsert by test case ID: only insert/update/delete rows that changed (implies --no-clear)')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f'Test cases per batch with --bulk/--incremental (default: {DEFAULT_BATCH_SIZE})')
+    parser.add_argument('--verbose', '-v', action='store_true', help='Print a line per test case instead of a progress bar')
+    parser.add_argument('--log-format', choices=import_progress.LOG_FORMATS, default='text',
+                        help='json: one JSON record per written batch and a summary on stdout, other output on stderr')
     
     args = parser.parse_args()
     
     # Create importer
-    importer = TestCaseImporter()
+    sheets = [sheet.strip() for sheet in args.sheets.split(',') if sheet.strip()] if args.sheets else None
+    importer = TestCaseImporter(sheets=sheets, workers=args.workers, verbose=args.verbose,
+                                log_format=args.log_format, bulk=args.bulk,
+                                incremental=args.incremental, batch_size=args.batch_size)
     
+    # JSON records keep stdout; everything else goes to stderr
+    if args.log_format == 'json':
+        importer.log_stream = sys.stdout
+        with contextlib.redirect_stdout(sys.stderr):
+            return run_import(importer, args)
+    return run_import(importer, args)
+
+def run_import(importer, args):
+    """Run the import selected on the command line; returns the exit code"""
     try:
         # Connect to database (skip in dry-run mode)
         if not args.dry_run and not importer.connect_database():
@@ -431,16 +790,28 @@ def main():
             print("❌ No Excel file found")
             return 1
         
-        if args.dry_run:
+        if args.dry_run and importer.sheets:
+            print("🔍 DRY RUN MODE - No data will be imported")
+            rows = importer.load_testcases(excel_file)
+            if rows is not None:
+                print(f"✅ Would import {len(rows)} test cases from {len(importer.sheets)} sheets")
+                print("\n📋 Preview of first 3 test cases:")
+                for testcase_data, labels in rows[:3]:
+                    print(f"   {testcase_data['test_case_id']} ({len(labels)} labels)")
+                    print(f"      Name: {testcase_data['test_case_name']}")
+            return 0
+        elif args.dry_run:
             print("🔍 DRY RUN MODE - No data will be imported")
             df, sheet_name = importer.read_excel_data(excel_file, args.sheet)
             if df is not None:
+                plan = importer.compile_column_plan(df.columns)
+                importer.report_column_plan(plan)
                 print(f"✅ Would process {len(df)} test case rows from sheet '{sheet_name}'")
                 
                 # Preview first few rows
                 print("\n📋 Preview of first 3 rows:")
                 for index, row in df.head(3).iterrows():
-                    result = importer.process_testcase_row(row, index)
+                    result = importer.process_testcase_row(row, index, plan)
                     if result:
                         testcase_data, labels = result
                         print(f"   Row {index+1}: {testcase_data['test_case_id']} ({len(labels)} labels)")
@@ -454,6 +825,8 @@ def main():
             # Import test cases
             clear_data = not args.no_clear
             success = importer.import_testcases(excel_file, args.sheet, clear_data)
+            if importer.log_format == 'json':
+                importer.log_summary(success)
             
             if success:
                 importer.print_summary()